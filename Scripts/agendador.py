@@ -0,0 +1,274 @@
+import json
+import argparse
+from datetime import datetime
+from hashlib import sha1
+from os import makedirs, replace
+from os.path import join, dirname, abspath, exists
+from time import time, sleep
+from typing import Dict, List, Optional
+
+try:
+    from .dowtrend import Dowtrend
+    from .calendario import ultimo_pregao, proximo_fechamento, FUSO_B3
+except ImportError:
+    from dowtrend import Dowtrend
+    from calendario import ultimo_pregao, proximo_fechamento, FUSO_B3
+
+import logging
+
+CAMINHO_ESTADO = join(dirname(dirname(abspath(__file__))), 'data', 'agendador.json')
+
+class AgendadorAtualizacao:
+    """
+    Atualiza apenas o que mudou desde a última execução, considerando o calendário de pregões da B3.
+
+    O agendador guarda em `data/agendador.json`, para cada ticker, o último pregão verificado, a data da
+    última cotação armazenada e os retornos calculados; e, para cada amostra, a composição e o pregão
+    dos resultados salvos. A cada execução:
+
+    - tickers já verificados no último pregão encerrado (`calendario.ultimo_pregao`) não são consultados;
+      tickers sem a cotação desse pregão (ex.: negociação suspensa) são consultados de novo no máximo uma
+      vez a cada `espera_retentativa` segundos;
+    - uma amostra só é salva novamente se a sua composição mudou ou se o retorno de algum ticker mudou;
+    - as amostras são atendidas em ordem de prioridade (por padrão, das menores para as maiores), de modo
+      que os índices pequenos ficam prontos antes da lista completa de empresas listadas.
+
+    Quando nada mudou, uma execução apenas lê o arquivo de estado e a composição das amostras em cache,
+    sem acessar o `yfinance`.
+
+    **Atributos:**
+    - `amostras` (List[Dowtrend]): Uma instância de `Dowtrend` para cada amostra, na ordem de prioridade.
+    - `lote` (Optional[int]): Tamanho dos lotes repassado a `Dowtrend.processar_tickers`.
+    - `concorrencia` (Optional[int]): Quantidade de threads repassada a `Dowtrend.processar_tickers`.
+    - `espera_retentativa` (float): Intervalo mínimo, em segundos, entre duas consultas a um ticker sem a cotação do último pregão.
+    - `caminho` (str): Caminho do arquivo de estado.
+
+    **Métodos:**
+    - `pendencias(self, agora=None)`: Calcula, sem baixar nada, os tickers e as amostras que precisam ser atualizados.
+    - `executar(self, agora=None)`: Atualiza os tickers pendentes e salva as amostras que mudaram.
+    - `executar_continuamente(self, intervalo: float = 900)`: Executa o agendador indefinidamente, dormindo enquanto não há pregão novo.
+    """
+
+    def __init__(self, amostras: List[str], prioridades: Optional[Dict[str, int]] = None, lote: Optional[int] = None,
+                 concorrencia: Optional[int] = None, espera_retentativa: float = 60 * 60, caminho: str = CAMINHO_ESTADO):
+        """
+        Inicializa o agendador.
+
+        :param amostras: Tipos de amostra, como 'empresas_listadas' ou 'indice:IDIV'.
+        :param prioridades: Prioridade de cada amostra (menor valor é atendido primeiro); amostras sem prioridade
+            são ordenadas pela quantidade de tickers, depois das que possuem prioridade.
+        :param lote: Tamanho dos lotes de download (modo em lotes).
+        :param concorrencia: Quantidade de downloads simultâneos (modo concorrente).
+        :param espera_retentativa: Intervalo mínimo, em segundos, entre duas consultas a um ticker sem a cotação do último pregão.
+        :param caminho: Caminho do arquivo de estado.
+        """
+        self.amostras = [Dowtrend(type_amostra=type_amostra) for type_amostra in amostras]
+        self.prioridades = prioridades or {}
+        self.lote = lote
+        self.concorrencia = concorrencia
+        self.espera_retentativa = espera_retentativa
+        self.caminho = caminho
+        self._estado = self._ler()
+
+    def _ler(self) -> Dict[str, Dict]:
+        """
+        Lê o arquivo de estado; um arquivo ausente ou corrompido equivale a nunca ter executado.
+
+        :return: Dicionário com as chaves `tickers` e `amostras`.
+        """
+        if exists(self.caminho):
+            try:
+                with open(self.caminho, 'r') as json_file:
+                    return json.load(json_file)
+            except (OSError, json.JSONDecodeError) as e:
+                logging.error(f"Erro ao ler o estado do agendador {self.caminho}: {e}")
+        return {'tickers': {}, 'amostras': {}}
+
+    def _gravar(self) -> None:
+        """
+        Grava o arquivo de estado de forma atômica.
+        """
+        makedirs(dirname(self.caminho), exist_ok=True)
+        with open(self.caminho + '.tmp', 'w') as json_file:
+            json.dump(self._estado, json_file)
+        replace(self.caminho + '.tmp', self.caminho)
+
+    def _ticker_pendente(self, ticker: str, pregao: str, agora: float, vivacidade) -> bool:
+        """
+        Indica se um ticker precisa ser consultado para o pregão `pregao`.
+
+        :param ticker: Código do ativo (ticker).
+        :param pregao: Último pregão encerrado ('AAAA-MM-DD').
+        :param agora: Horário atual (segundos desde a época).
+        :param vivacidade: Registro de vivacidade; tickers sem cotações dentro da espera não são consultados.
+        :return: `True` se o ticker deve ser atualizado.
+        """
+        entrada = self._estado['tickers'].get(ticker)
+        if entrada is None:
+            return True
+        if vivacidade.ignorar(ticker):
+            return False
+        if entrada['sessao'] < pregao:
+            return True
+        return (entrada['pregao'] or '') < pregao and agora - entrada['verificado_em'] >= self.espera_retentativa
+
+    def _ordenar(self, composicoes: Dict[str, List[str]]) -> List[Dowtrend]:
+        """
+        Ordena as amostras cuja composição foi obtida por prioridade explícita e, em seguida, pela quantidade de tickers.
+        """
+        obtidas = [dowtrend for dowtrend in self.amostras if dowtrend.type_amostra in composicoes]
+        return sorted(obtidas, key=lambda dowtrend: (
+            self.prioridades.get(dowtrend.type_amostra, float('inf')), len(composicoes[dowtrend.type_amostra])))
+
+    def pendencias(self, agora: Optional[datetime] = None) -> Dict:
+        """
+        Calcula, sem baixar cotações, os tickers e as amostras que precisam ser atualizados.
+
+        A composição de cada amostra é lida novamente do cache do universo; uma amostra cuja composição não
+        pode ser obtida fica de fora apenas deste ciclo.
+
+        :param agora: Momento de referência (padrão: agora).
+        :return: Dicionário com o último pregão encerrado (`pregao`), o momento de referência em segundos desde a
+            época (`instante`), as amostras em ordem de prioridade (`ordem`), as composições (`composicoes`), os
+            tickers pendentes de cada amostra (`tickers`) e as amostras cuja composição mudou (`composicao_alterada`).
+        """
+        pregao = ultimo_pregao(agora).isoformat()
+        instante = (agora or datetime.now(FUSO_B3)).timestamp()
+        composicoes = {}
+        for dowtrend in self.amostras:
+            # A composição é resolvida de novo a cada ciclo (pelo cache do universo), para que o modo contínuo
+            # perceba mudanças nas carteiras dos índices
+            dowtrend._amostra = None
+            try:
+                composicoes[dowtrend.type_amostra] = dowtrend._obter_amostra()
+            except Exception as e:
+                logging.error(f"Erro ao obter a amostra {dowtrend.type_amostra}; amostra ignorada neste ciclo: {e}")
+
+        ordem = self._ordenar(composicoes)
+        vivacidade = ordem[0].vivacidade if ordem else None
+        pendentes, vistos, alteradas = {}, set(), []
+        for dowtrend in ordem:
+            tickers = composicoes[dowtrend.type_amostra]
+            if self._estado['amostras'].get(dowtrend.type_amostra, {}).get('composicao') != self._assinatura(tickers):
+                alteradas.append(dowtrend.type_amostra)
+            pendentes[dowtrend.type_amostra] = [ticker for ticker in dict.fromkeys(tickers)
+                                                if ticker not in vistos and self._ticker_pendente(ticker, pregao, instante, vivacidade)]
+            vistos.update(tickers)
+        return {'pregao': pregao, 'instante': instante, 'ordem': [dowtrend.type_amostra for dowtrend in ordem], 'composicoes': composicoes,
+                'tickers': pendentes, 'composicao_alterada': alteradas}
+
+    def _assinatura(self, tickers: List[str]) -> str:
+        """
+        Calcula uma assinatura da composição de uma amostra, independente da ordem dos tickers.
+        """
+        return sha1('\n'.join(sorted(tickers)).encode()).hexdigest()
+
+    def executar(self, agora: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Atualiza os tickers pendentes e salva as amostras que mudaram, em ordem de prioridade.
+
+        Os tickers de cada amostra são processados antes de passar para a próxima; um ticker presente em
+        várias amostras é processado uma única vez. O estado é gravado depois de cada amostra, de modo que
+        uma execução interrompida não repete o trabalho já feito.
+
+        :param agora: Momento de referência (padrão: agora).
+        :return: Relatório com o último pregão, a quantidade de tickers atualizados e de amostras salvas.
+        """
+        plano = self.pendencias(agora)
+        por_tipo = {dowtrend.type_amostra: dowtrend for dowtrend in self.amostras}
+        relatorio = {'pregao': plano['pregao'], 'tickers_atualizados': 0, 'amostras_salvas': 0}
+        if not plano['ordem']:
+            return relatorio
+
+        processador = por_tipo[plano['ordem'][0]]
+        alterados = set()
+        for type_amostra in plano['ordem']:
+            pendentes = plano['tickers'][type_amostra]
+            if pendentes:
+                logging.info(f"Amostra {type_amostra}: {len(pendentes)} tickers sem o pregão de {plano['pregao']}.")
+                try:
+                    resultados = processador.processar_tickers(pendentes, lote=self.lote, concorrencia=self.concorrencia)
+                finally:
+                    processador.vivacidade.salvar()
+                alterados.update(self._registrar_tickers(processador, resultados, plano['pregao'], plano['instante']))
+                relatorio['tickers_atualizados'] += len(pendentes)
+
+            tickers = plano['composicoes'][type_amostra]
+            estado_amostra = self._estado['amostras'].get(type_amostra)
+            if estado_amostra is None or type_amostra in plano['composicao_alterada'] or alterados.intersection(tickers):
+                if por_tipo[type_amostra].save_data({ticker: self._estado['tickers'][ticker]['dados'] for ticker in tickers}):
+                    self._estado['amostras'][type_amostra] = {'composicao': self._assinatura(tickers), 'pregao': plano['pregao'], 'salvo_em': time()}
+                    relatorio['amostras_salvas'] += 1
+            self._gravar()
+
+        logging.info(f"Agendador: pregão {relatorio['pregao']}, {relatorio['tickers_atualizados']} tickers atualizados, "
+                     f"{relatorio['amostras_salvas']} amostras salvas.")
+        return relatorio
+
+    def _registrar_tickers(self, processador: Dowtrend, resultados: Dict[str, Dict[str, float]], pregao: str,
+                           instante: float) -> List[str]:
+        """
+        Registra no estado os tickers processados e retorna os que tiveram os retornos alterados.
+
+        :param processador: Instância de `Dowtrend` usada no processamento (para ler o histórico local).
+        :param resultados: Retornos calculados de cada ticker.
+        :param pregao: Último pregão encerrado ('AAAA-MM-DD').
+        :param instante: Momento de referência da execução (segundos desde a época), o mesmo usado por `pendencias`.
+        :return: Tickers cujos retornos mudaram em relação ao estado anterior.
+        """
+        alterados = []
+        for ticker, dados in resultados.items():
+            anterior = self._estado['tickers'].get(ticker)
+            serie = processador.historico.ler(ticker)
+            self._estado['tickers'][ticker] = {
+                'sessao': pregao,
+                'pregao': serie.index[-1].strftime('%Y-%m-%d') if serie is not None and not serie.empty else None,
+                'verificado_em': instante,
+                'dados': dados
+            }
+            # `nan` é diferente de si mesmo, por isso a comparação é feita pela representação em JSON
+            if anterior is None or json.dumps(anterior['dados']) != json.dumps(dados):
+                alterados.append(ticker)
+        return alterados
+
+    def executar_continuamente(self, intervalo: float = 15 * 60) -> None:
+        """
+        Executa o agendador indefinidamente.
+
+        Depois de cada execução, dorme até o encerramento do próximo pregão, acordando no máximo a cada
+        `intervalo` segundos para conferir mudanças na composição das amostras e tickers a reconsultar.
+
+        :param intervalo: Tempo máximo, em segundos, entre duas execuções.
+        """
+        while True:
+            try:
+                self.executar()
+            except Exception as e:
+                logging.error(f"Erro na execução do agendador: {e}")
+            espera = min(intervalo, max(0.0, proximo_fechamento().timestamp() - time()))
+            sleep(max(espera, 1.0))
+
+def main() -> None:
+    """
+    Executa o agendador para todos os índices do `INDICES` e as empresas listadas, uma única vez
+    (para uso com o cron) ou continuamente (`--continuo`).
+    """
+    try:
+        from .download_indices import INDICES
+    except ImportError:
+        from download_indices import INDICES
+
+    parser = argparse.ArgumentParser(description='Atualiza apenas os tickers e amostras que mudaram.')
+    parser.add_argument('--continuo', action='store_true', help='Executa indefinidamente, aguardando os próximos pregões.')
+    parser.add_argument('--intervalo', type=float, default=15 * 60, help='Tempo máximo, em segundos, entre duas execuções.')
+    parser.add_argument('--lote', type=int, default=50, help='Quantidade de tickers por requisição.')
+    args = parser.parse_args()
+
+    agendador = AgendadorAtualizacao([f'indice:{indice}' for indice in INDICES] + ['empresas_listadas'], lote=args.lote)
+    if args.continuo:
+        agendador.executar_continuamente(args.intervalo)
+    else:
+        agendador.executar()
+
+if __name__ == '__main__':
+    main()
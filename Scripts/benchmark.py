@@ -0,0 +1,516 @@
+import sys
+import json
+import argparse
+import subprocess
+import tracemalloc
+from datetime import datetime
+from os import makedirs, listdir
+from os.path import join, dirname, abspath, exists
+from tempfile import TemporaryDirectory
+from threading import Lock
+from time import perf_counter, sleep
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame, Timestamp, bdate_range, concat
+
+try:
+    from .dowtrend import Dowtrend
+    from .historico import HistoricoPrecos
+    from .universo import CacheUniverso
+    from .snapshots import ArmazemResultados
+    from .retornos import PERIODOS
+except ImportError:
+    from dowtrend import Dowtrend
+    from historico import HistoricoPrecos
+    from universo import CacheUniverso
+    from snapshots import ArmazemResultados
+    from retornos import PERIODOS
+
+import logging
+
+DIRETORIO_BENCHMARKS = join(dirname(dirname(abspath(__file__))), 'data', 'benchmarks')
+
+# Tamanhos de universo medidos por padrão
+TAMANHOS = [20, 200, 2000]
+
+# Quantidade de tickers por requisição no estágio em lotes (mesmo valor dos scripts de download)
+LOTE = 50
+
+# Pregões retidos na primeira carga, simulando os dias que surgem entre duas execuções
+PREGOES_NOVOS = 5
+
+# Módulos cuja importação é medida a partir de um processo novo
+MODULOS_IMPORTACAO = ['consulta', 'dowtrend', 'graficos']
+
+# Módulos pesados que a consulta rápida (`consulta`) nunca deve importar
+MODULOS_PESADOS = ['pandas', 'numpy', 'yfinance', 'requests', 'matplotlib']
+
+# Código executado em cada processo novo: importa o módulo e informa o tempo e os módulos pesados carregados
+_CODIGO_IMPORTACAO = '''
+import sys, json, time
+inicio = time.perf_counter()
+import {modulo}
+duracao = time.perf_counter() - inicio
+print(json.dumps({{'segundos': duracao, 'pesados': [m for m in {pesados!r} if m in sys.modules]}}))
+'''
+
+def gerar_mercado(n_tickers: int, pregoes: int = 1500, lacunas: float = 0.01, deslistados: float = 0.05,
+                  fim: str = '2024-12-30', semente: int = 0) -> Dict[str, DataFrame]:
+    """
+    Gera um mercado sintético com cotações OHLC diárias para `n_tickers` tickers.
+
+    Os preços seguem um passeio aleatório geométrico. Cada ticker perde aleatoriamente uma fração
+    `lacunas` dos pregões (dias sem negociação) e uma fração `deslistados` dos tickers deixa de ser
+    negociada no meio do histórico; metade destes não possui cotação nenhuma, como um código
+    cancelado que continua na composição da amostra.
+
+    :param n_tickers: Quantidade de tickers do mercado.
+    :param pregoes: Quantidade de pregões do histórico completo.
+    :param lacunas: Fração dos pregões removida de cada ticker.
+    :param deslistados: Fração dos tickers deslistados.
+    :param fim: Data do último pregão.
+    :param semente: Semente do gerador aleatório, para mercados reproduzíveis.
+    :return: Dicionário `{ticker: DataFrame}` com as colunas do `yfinance` (Open, High, Low, Close, Adj Close, Volume).
+    """
+    rng = np.random.default_rng(semente)
+    datas = bdate_range(end=fim, periods=pregoes)
+    mercado = {}
+    for i in range(n_tickers):
+        ticker = f'S{i:04d}{3 + i % 2}'
+        fechamento = 10 * np.exp(np.cumsum(rng.normal(0.0002, 0.02, pregoes)))
+        abertura = fechamento * np.exp(rng.normal(0, 0.005, pregoes))
+        amplitude = np.abs(rng.normal(0, 0.01, pregoes))
+        df = DataFrame({
+            'Open': abertura,
+            'High': np.maximum(abertura, fechamento) * (1 + amplitude),
+            'Low': np.minimum(abertura, fechamento) * (1 - amplitude),
+            'Close': fechamento,
+            'Adj Close': fechamento * 0.95,
+            'Volume': rng.integers(1_000, 1_000_000, pregoes)
+        }, index=datas)
+        df = df[rng.random(pregoes) >= lacunas]
+        if rng.random() < deslistados:
+            df = df.iloc[:0] if rng.random() < 0.5 else df.iloc[:int(len(df) * rng.uniform(0.2, 0.9))]
+        mercado[ticker] = df
+    return mercado
+
+class FonteSintetica:
+    """
+    Substituto local do `yfinance` que responde com as cotações de um mercado sintético.
+
+    Pode ser usado como `fonte` (`Ticker.history`) e `fonte_lote` (`yfinance.download`) do `HistoricoPrecos`.
+    As respostas só incluem os pregões até `corte`, de modo que avançar o corte simula os pregões novos que
+    surgem entre duas execuções. Também pode simular falhas de rede: falhas transitórias, que deixam de
+    ocorrer depois de algumas tentativas, e falhas permanentes, que ocorrem em todas as requisições.
+
+    **Atributos:**
+    - `mercado` (Dict[str, DataFrame]): Cotações de cada ticker, geradas por `gerar_mercado`.
+    - `corte` (Timestamp): Último pregão visível nas respostas.
+    - `latencia` (float): Espera, em segundos, simulada a cada requisição.
+    - `falhas` (Dict[str, int]): Quantidade de falhas transitórias que ainda faltam para cada ticker.
+    - `falhas_permanentes` (Set[str]): Tickers cujas requisições sempre falham.
+    - `requisicoes` (int): Quantidade de requisições respondidas.
+    - `erros` (int): Quantidade de falhas simuladas.
+    """
+
+    def __init__(self, mercado: Dict[str, DataFrame], corte: Optional[Timestamp] = None, latencia: float = 0.0,
+                 falhas: Optional[Dict[str, int]] = None, falhas_permanentes: Optional[Iterable[str]] = None):
+        """
+        :param mercado: Cotações de cada ticker, geradas por `gerar_mercado`.
+        :param corte: Último pregão visível nas respostas (padrão: sem corte).
+        :param latencia: Espera, em segundos, simulada a cada requisição.
+        :param falhas: Quantidade de requisições que falham para cada ticker antes da primeira resposta.
+        :param falhas_permanentes: Tickers cujas requisições sempre falham.
+        """
+        self.mercado = mercado
+        self.corte = corte or Timestamp.max
+        self.latencia = latencia
+        self.falhas = dict(falhas or {})
+        self.falhas_permanentes = set(falhas_permanentes or ())
+        self.requisicoes = 0
+        self.erros = 0
+        self._trava = Lock()
+
+    def _responder(self, simbolos: List[str]) -> None:
+        """
+        Conta a requisição, simula a latência e lança `ConnectionError` se algum símbolo deve falhar.
+        """
+        with self._trava:
+            self.requisicoes += 1
+            tickers = [simbolo[:-len('.SA')] for simbolo in simbolos]
+            falhando = [ticker for ticker in tickers if ticker in self.falhas_permanentes or self.falhas.get(ticker, 0) > 0]
+            for ticker in falhando:
+                if ticker in self.falhas:
+                    self.falhas[ticker] -= 1
+            self.erros += bool(falhando)
+        if self.latencia:
+            sleep(self.latencia)
+        if falhando:
+            raise ConnectionError(f"Falha simulada ao baixar {', '.join(falhando)}")
+
+    def _cotacoes(self, simbolo: str, period: Optional[str] = None, start: Optional[str] = None) -> DataFrame:
+        """
+        Retorna as cotações de um símbolo dentro do intervalo pedido.
+        """
+        df = self.mercado.get(simbolo[:-len('.SA')])
+        if df is None or df.empty:
+            return DataFrame()
+        return df.loc[Timestamp(start or df.index[0]):self.corte]
+
+    def __call__(self, simbolo: str, period: Optional[str] = None, start: Optional[str] = None) -> DataFrame:
+        """
+        Responde como `baixar_historico`: um DataFrame com colunas simples, vazio para símbolos sem cotação.
+        """
+        self._responder([simbolo])
+        return self._cotacoes(simbolo, period, start)
+
+    def lote(self, simbolos: List[str], period: Optional[str] = None, start: Optional[str] = None) -> DataFrame:
+        """
+        Responde como `baixar_lote`: colunas MultiIndex (`Price`, `Ticker`) com todos os símbolos alinhados nas mesmas datas.
+        """
+        self._responder(simbolos)
+        cotacoes = {simbolo: self._cotacoes(simbolo, period, start) for simbolo in simbolos}
+        cotacoes = {simbolo: df for simbolo, df in cotacoes.items() if not df.empty}
+        if not cotacoes:
+            return DataFrame()
+        df = concat(cotacoes, axis=1, names=['Ticker', 'Price'], sort=True).swaplevel(axis=1).sort_index(axis=1)
+        return df
+
+class _RespostaCsv:
+    """
+    Resposta HTTP mínima (`status_code`, `text`, `headers`) devolvida pelo `UniversoSintetico`.
+    """
+
+    def __init__(self, texto: str):
+        self.status_code = 200
+        self.text = texto
+        self.headers = {'ETag': f'"{hash(texto)}"'}
+
+class UniversoSintetico:
+    """
+    Substituto local dos arquivos CSV de composição das amostras, usado como `fonte` do `CacheUniverso`.
+
+    Responde a qualquer URL com o CSV de um índice (coluna `Código`) contendo os tickers do mercado sintético.
+    """
+
+    def __init__(self, tickers: List[str]):
+        """
+        :param tickers: Tickers que compõem a amostra sintética.
+        """
+        self.texto = DataFrame({'Código': tickers}).to_csv(index=False)
+
+    def __call__(self, url: str, headers: Optional[Dict[str, str]] = None) -> _RespostaCsv:
+        return _RespostaCsv(self.texto)
+
+def _dowtrend_sintetico(diretorio: str, mercado: Dict[str, DataFrame], fonte: FonteSintetica) -> Dowtrend:
+    """
+    Cria um `Dowtrend` que lê e grava tudo em `diretorio` e usa as fontes sintéticas em vez da rede.
+
+    :param diretorio: Diretório temporário da medição.
+    :param mercado: Mercado sintético.
+    :param fonte: Fonte de cotações sintética.
+    :return: Instância de `Dowtrend` da amostra 'indice:SINT'.
+    """
+    dowtrend = Dowtrend(type_amostra='indice:SINT')
+    dowtrend.file_path = join(diretorio, 'indice_SINT.json')
+    dowtrend.historico = HistoricoPrecos(join(diretorio, 'historico'), fonte=fonte, fonte_lote=fonte.lote, espera_base=0)
+    dowtrend.universo = CacheUniverso(join(diretorio, 'universo'), fonte=UniversoSintetico(list(mercado)))
+    dowtrend.resultados = ArmazemResultados(join(diretorio, 'resultados', 'indice_SINT'))
+    return dowtrend
+
+def _etapas(dowtrend: Dowtrend, fonte: FonteSintetica, repeticoes: int) -> List[Tuple[str, Callable[[], Tuple[List[float], int]]]]:
+    """
+    Define as etapas medidas, na ordem em que são executadas.
+
+    Cada etapa é uma função sem argumentos que retorna as latências de cada operação (em segundos) e a
+    quantidade de tickers processados. As etapas dependem das anteriores (ex.: a atualização incremental
+    parte do histórico gravado na carga completa).
+
+    :param dowtrend: Instância de `Dowtrend` sintética.
+    :param fonte: Fonte de cotações usada pelo `dowtrend`.
+    :param repeticoes: Quantidade de repetições das etapas de gravação e leitura dos resultados.
+    :return: Lista de tuplas `(nome, função)`.
+    """
+    corte_final = max((df.index[-1] for df in fonte.mercado.values() if not df.empty), default=Timestamp.max)
+    datas = bdate_range(end=corte_final, periods=PREGOES_NOVOS + 1)
+    estado = {}
+
+    def cronometrar(funcao: Callable, itens) -> List[float]:
+        latencias = []
+        for item in itens:
+            inicio = perf_counter()
+            funcao(item)
+            latencias.append(perf_counter() - inicio)
+        return latencias
+
+    def amostra():
+        inicio = perf_counter()
+        tickers = dowtrend._obter_amostra()
+        return [perf_counter() - inicio], len(tickers)
+
+    def carga_completa():
+        fonte.corte = datas[0]
+        tickers = dowtrend._obter_amostra()
+        return cronometrar(lambda ticker: dowtrend._obter_serie_temporal(ticker), tickers), len(tickers)
+
+    def atualizacao_incremental():
+        fonte.corte = corte_final
+        tickers = dowtrend._obter_amostra()
+        return cronometrar(lambda ticker: dowtrend._obter_serie_temporal(ticker), tickers), len(tickers)
+
+    def calcular_retorno():
+        tickers = dowtrend._obter_amostra()
+        series = {ticker: dowtrend._obter_serie_temporal(ticker, atualizar=False) for ticker in tickers}
+
+        def calcular(ticker):
+            df = series[ticker]
+            if not df.empty:
+                for periodo in PERIODOS:
+                    dowtrend._obter_ultimo_valor(dowtrend._calcular_retorno(df, periodo))
+
+        return cronometrar(calcular, tickers), len(tickers)
+
+    def processar_dados_ticker():
+        tickers = dowtrend._obter_amostra()
+        latencias = []
+        data = {}
+        for ticker in tickers:
+            inicio = perf_counter()
+            data[ticker] = dowtrend.processar_dados_ticker(ticker)
+            latencias.append(perf_counter() - inicio)
+        estado['data'] = data
+        return latencias, len(tickers)
+
+    def processar_lote():
+        tickers = dowtrend._obter_amostra()
+        lotes = [tickers[i:i + LOTE] for i in range(0, len(tickers), LOTE)]
+        return cronometrar(dowtrend.processar_lote, lotes), len(tickers)
+
+    def save_data():
+        return cronometrar(lambda _: dowtrend.save_data(estado['data']), range(repeticoes)), len(estado['data']) * repeticoes
+
+    def read_data_json():
+        return cronometrar(lambda _: dowtrend.read_data('json'), range(repeticoes)), len(estado['data']) * repeticoes
+
+    def read_data_dataframe():
+        return cronometrar(lambda _: dowtrend.read_data('DataFrame'), range(repeticoes)), len(estado['data']) * repeticoes
+
+    return [
+        ('amostra', amostra),
+        ('serie_temporal_completa', carga_completa),
+        ('serie_temporal_incremental', atualizacao_incremental),
+        ('calcular_retorno', calcular_retorno),
+        ('processar_dados_ticker', processar_dados_ticker),
+        ('processar_lote', processar_lote),
+        ('save_data', save_data),
+        ('read_data_json', read_data_json),
+        ('read_data_dataframe', read_data_dataframe),
+    ]
+
+def _executar(mercado: Dict[str, DataFrame], latencia: float, repeticoes: int, memoria: bool) -> Dict[str, Dict[str, float]]:
+    """
+    Executa todas as etapas em um diretório temporário novo.
+
+    :param mercado: Mercado sintético.
+    :param latencia: Latência simulada de cada requisição, em segundos.
+    :param repeticoes: Quantidade de repetições das etapas de gravação e leitura.
+    :param memoria: Se `True`, mede apenas o pico de memória de cada etapa (com `tracemalloc`); senão, os tempos.
+    :return: Dicionário `{etapa: métricas}`.
+    """
+    resultado = {}
+    with TemporaryDirectory() as diretorio:
+        fonte = FonteSintetica(mercado, latencia=latencia)
+        dowtrend = _dowtrend_sintetico(diretorio, mercado, fonte)
+        for nome, etapa in _etapas(dowtrend, fonte, repeticoes):
+            if memoria:
+                tracemalloc.start()
+                etapa()
+                resultado[nome] = {'pico_memoria_mib': tracemalloc.get_traced_memory()[1] / 2 ** 20}
+                tracemalloc.stop()
+                continue
+            requisicoes = fonte.requisicoes
+            inicio = perf_counter()
+            latencias, itens = etapa()
+            total = perf_counter() - inicio
+            p50, p90, p99 = np.percentile(np.array(latencias) * 1000, [50, 90, 99])
+            resultado[nome] = {
+                'tempo_total_s': total,
+                'itens': itens,
+                'itens_por_s': itens / total if total else float('inf'),
+                'operacoes': len(latencias),
+                'p50_ms': p50,
+                'p90_ms': p90,
+                'p99_ms': p99,
+                'requisicoes': fonte.requisicoes - requisicoes
+            }
+    return resultado
+
+def executar_benchmark(tamanhos: List[int] = TAMANHOS, pregoes: int = 1500, lacunas: float = 0.01,
+                       deslistados: float = 0.05, latencia: float = 0.0, repeticoes: int = 5,
+                       memoria: bool = True, semente: int = 0) -> Dict:
+    """
+    Mede o desempenho das etapas do `Dowtrend` sem acessar a rede, para universos de vários tamanhos.
+
+    Para cada tamanho, um mercado sintético é gerado e as etapas são executadas sobre um `Dowtrend` que usa
+    `FonteSintetica` e `UniversoSintetico` e grava tudo em um diretório temporário. Os tempos e o pico de
+    memória são medidos em execuções separadas, pois o `tracemalloc` deixa o código mais lento.
+
+    :param tamanhos: Quantidades de tickers dos universos medidos.
+    :param pregoes: Quantidade de pregões do histórico de cada ticker.
+    :param lacunas: Fração dos pregões removida de cada ticker.
+    :param deslistados: Fração dos tickers deslistados.
+    :param latencia: Latência simulada de cada requisição, em segundos.
+    :param repeticoes: Quantidade de repetições das etapas de gravação e leitura dos resultados.
+    :param memoria: Se `False`, não mede o pico de memória.
+    :param semente: Semente do gerador do mercado sintético.
+    :return: Dicionário com os parâmetros, o ambiente e as métricas `{tamanho: {etapa: métricas}}`.
+    """
+    parametros = {'pregoes': pregoes, 'lacunas': lacunas, 'deslistados': deslistados, 'latencia': latencia,
+                  'repeticoes': repeticoes, 'semente': semente}
+    resultados = {}
+    nivel = logging.root.manager.disable
+    logging.disable(logging.INFO)
+    try:
+        for tamanho in tamanhos:
+            mercado = gerar_mercado(tamanho, pregoes, lacunas, deslistados, semente=semente)
+            resultados[str(tamanho)] = _executar(mercado, latencia, repeticoes, memoria=False)
+            if memoria:
+                for etapa, metricas in _executar(mercado, latencia, repeticoes, memoria=True).items():
+                    resultados[str(tamanho)][etapa].update(metricas)
+    finally:
+        logging.disable(nivel)
+    return {'data': datetime.now().isoformat(timespec='seconds'), 'versao': _versao(),
+            'pandas': pd.__version__, 'numpy': np.__version__, 'parametros': parametros, 'resultados': resultados}
+
+def medir_importacao(modulos: List[str] = MODULOS_IMPORTACAO, repeticoes: int = 5) -> Dict[str, Dict]:
+    """
+    Mede o tempo de importação de cada módulo a partir de um processo Python novo (sem cache de módulos).
+
+    :param modulos: Módulos medidos (nomes dos arquivos em `Scripts`).
+    :param repeticoes: Quantidade de processos por módulo; é informada a mediana.
+    :return: Dicionário `{modulo: {'segundos': mediana, 'pesados': [módulos pesados carregados]}}`.
+    """
+    resultado = {}
+    for modulo in modulos:
+        medicoes = []
+        for _ in range(repeticoes):
+            saida = subprocess.run([sys.executable, '-c', _CODIGO_IMPORTACAO.format(modulo=modulo, pesados=MODULOS_PESADOS)],
+                                   cwd=dirname(abspath(__file__)), capture_output=True, text=True, check=True)
+            medicoes.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+        resultado[modulo] = {'segundos': float(np.median([m['segundos'] for m in medicoes])), 'pesados': medicoes[-1]['pesados']}
+    return resultado
+
+def _versao() -> Optional[str]:
+    """
+    Retorna o commit atual do repositório, para identificar a versão medida.
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=dirname(abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def salvar_resultado(resultado: Dict, diretorio: str = DIRETORIO_BENCHMARKS) -> str:
+    """
+    Grava o resultado de um benchmark em `data/benchmarks/AAAAMMDD-HHMMSS.json`.
+
+    :param resultado: Resultado retornado por `executar_benchmark`.
+    :param diretorio: Diretório dos resultados.
+    :return: Caminho do arquivo gravado.
+    """
+    makedirs(diretorio, exist_ok=True)
+    caminho = join(diretorio, datetime.fromisoformat(resultado['data']).strftime('%Y%m%d-%H%M%S') + '.json')
+    with open(caminho, 'w') as json_file:
+        json.dump(resultado, json_file, indent=4)
+    return caminho
+
+def ler_resultados(diretorio: str = DIRETORIO_BENCHMARKS) -> List[Dict]:
+    """
+    Lê os resultados gravados, do mais antigo ao mais recente.
+
+    :param diretorio: Diretório dos resultados.
+    :return: Lista de resultados no formato de `executar_benchmark`.
+    """
+    if not exists(diretorio):
+        return []
+    resultados = []
+    for arquivo in sorted(listdir(diretorio)):
+        if arquivo.endswith('.json'):
+            with open(join(diretorio, arquivo), 'r') as json_file:
+                resultados.append(json.load(json_file))
+    return resultados
+
+def comparar(anterior: Dict, atual: Dict) -> DataFrame:
+    """
+    Compara dois resultados de benchmark etapa a etapa.
+
+    :param anterior: Resultado de referência.
+    :param atual: Resultado comparado.
+    :return: DataFrame com a vazão (itens/s) de cada etapa nos dois resultados e a razão atual/anterior
+        (acima de 1 significa mais rápido).
+    """
+    linhas = []
+    for tamanho, etapas in atual['resultados'].items():
+        for etapa, metricas in etapas.items():
+            referencia = anterior['resultados'].get(tamanho, {}).get(etapa)
+            if referencia is None:
+                continue
+            linhas.append({'tickers': int(tamanho), 'etapa': etapa, 'anterior': referencia['itens_por_s'],
+                           'atual': metricas['itens_por_s'], 'razao': metricas['itens_por_s'] / referencia['itens_por_s']})
+    return DataFrame(linhas)
+
+def tabela(resultado: Dict) -> DataFrame:
+    """
+    Organiza as métricas de um resultado em uma tabela (uma linha por tamanho e etapa).
+
+    :param resultado: Resultado retornado por `executar_benchmark`.
+    :return: DataFrame com as métricas de cada etapa.
+    """
+    linhas = [{'tickers': int(tamanho), 'etapa': etapa, **metricas}
+              for tamanho, etapas in resultado['resultados'].items() for etapa, metricas in etapas.items()]
+    return DataFrame(linhas).set_index(['tickers', 'etapa'])
+
+def main() -> int:
+    """
+    Executa o benchmark, grava o resultado em `data/benchmarks` e o compara com a execução anterior.
+
+    Com `--importacao`, mede apenas o tempo de importação dos módulos e retorna 1 se a consulta rápida
+    (`consulta`) importar algum dos `MODULOS_PESADOS`.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark offline das etapas do Dowtrend com dados sintéticos.')
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS, help='Quantidades de tickers medidas.')
+    parser.add_argument('--pregoes', type=int, default=1500, help='Pregões do histórico de cada ticker.')
+    parser.add_argument('--lacunas', type=float, default=0.01, help='Fração de pregões sem negociação.')
+    parser.add_argument('--deslistados', type=float, default=0.05, help='Fração de tickers deslistados.')
+    parser.add_argument('--latencia', type=float, default=0.0, help='Latência simulada por requisição, em segundos.')
+    parser.add_argument('--repeticoes', type=int, default=5, help='Repetições das etapas de gravação e leitura.')
+    parser.add_argument('--sem-memoria', action='store_true', help='Não mede o pico de memória.')
+    parser.add_argument('--nao-salvar', action='store_true', help='Não grava o resultado em data/benchmarks.')
+    parser.add_argument('--importacao', action='store_true', help='Mede apenas o tempo de importação dos módulos.')
+    args = parser.parse_args()
+
+    if args.importacao:
+        importacao = medir_importacao()
+        for modulo, medicao in importacao.items():
+            print(f"{modulo:<10} {medicao['segundos'] * 1000:>8.1f} ms   módulos pesados: {', '.join(medicao['pesados']) or '-'}")
+        if importacao['consulta']['pesados']:
+            print(f"Erro: a consulta rápida importou {', '.join(importacao['consulta']['pesados'])}.")
+            return 1
+        return 0
+
+    anteriores = ler_resultados()
+    resultado = executar_benchmark(args.tamanhos, args.pregoes, args.lacunas, args.deslistados, args.latencia,
+                                   args.repeticoes, memoria=not args.sem_memoria)
+    with pd.option_context('display.max_rows', None, 'display.max_columns', None, 'display.width', 250, 'display.float_format', '{:.2f}'.format):
+        print(tabela(resultado))
+        if anteriores:
+            print(f"\nComparação com a execução de {anteriores[-1]['data']} ({anteriores[-1]['versao']}):")
+            print(comparar(anteriores[-1], resultado).to_string(index=False))
+    if not args.nao_salvar:
+        print(f"\nResultado gravado em {salvar_resultado(resultado)}.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
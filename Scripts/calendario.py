@@ -0,0 +1,124 @@
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import FrozenSet, Optional
+from zoneinfo import ZoneInfo
+
+FUSO_B3 = ZoneInfo('America/Sao_Paulo')
+
+# Horário (de Brasília) a partir do qual o pregão do dia é considerado encerrado e disponível no Yahoo Finance
+HORARIO_FECHAMENTO = time(18, 30)
+
+def _pascoa(ano: int) -> date:
+    """
+    Calcula o domingo de Páscoa de um ano (algoritmo de Meeus/Jones/Butcher).
+
+    :param ano: Ano desejado.
+    :return: Data do domingo de Páscoa.
+    """
+    a, b, c = ano % 19, ano // 100, ano % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes = (h + l - 7 * m + 114) // 31
+    dia = (h + l - 7 * m + 114) % 31 + 1
+    return date(ano, mes, dia)
+
+@lru_cache(maxsize=None)
+def feriados_b3(ano: int) -> FrozenSet[date]:
+    """
+    Retorna os dias úteis sem pregão na B3 em um ano.
+
+    Inclui os feriados nacionais, o Carnaval (segunda e terça), a Sexta-feira Santa, Corpus Christi, o dia
+    24 de dezembro e o último dia útil do ano (31 de dezembro ou a sexta-feira anterior). Os feriados de São
+    Paulo (25 de janeiro, 9 de julho e 20 de novembro) fecharam a bolsa até 2021; o dia 20 de novembro voltou
+    a fechá-la em 2024, ao se tornar feriado nacional.
+
+    :param ano: Ano desejado.
+    :return: Conjunto de datas sem pregão (apenas dias úteis que seriam de negociação).
+    """
+    pascoa = _pascoa(ano)
+    ultimo_dia_util = date(ano, 12, 31)
+    while ultimo_dia_util.weekday() >= 5:
+        ultimo_dia_util -= timedelta(days=1)
+    feriados = {
+        date(ano, 1, 1),                  # Confraternização Universal
+        pascoa - timedelta(days=48),      # Carnaval (segunda-feira)
+        pascoa - timedelta(days=47),      # Carnaval (terça-feira)
+        pascoa - timedelta(days=2),       # Sexta-feira Santa
+        date(ano, 4, 21),                 # Tiradentes
+        date(ano, 5, 1),                  # Dia do Trabalho
+        pascoa + timedelta(days=60),      # Corpus Christi
+        date(ano, 9, 7),                  # Independência
+        date(ano, 10, 12),                # Nossa Senhora Aparecida
+        date(ano, 11, 2),                 # Finados
+        date(ano, 11, 15),                # Proclamação da República
+        date(ano, 12, 24),                # Véspera de Natal (sem pregão)
+        date(ano, 12, 25),                # Natal
+        ultimo_dia_util,                  # Último dia útil do ano (sem pregão)
+    }
+    if ano <= 2021:
+        feriados |= {date(ano, 1, 25), date(ano, 7, 9)}
+    if ano <= 2021 or ano >= 2024:
+        feriados.add(date(ano, 11, 20))
+    return frozenset(dia for dia in feriados if dia.weekday() < 5)
+
+def eh_pregao(dia: date) -> bool:
+    """
+    Indica se há pregão na B3 em um dia.
+
+    :param dia: Data desejada.
+    :return: `True` para dias úteis que não são feriados da B3.
+    """
+    return dia.weekday() < 5 and dia not in feriados_b3(dia.year)
+
+def pregao_anterior(dia: date) -> date:
+    """
+    Retorna o último pregão estritamente anterior a um dia.
+
+    :param dia: Data de referência.
+    :return: Data do pregão anterior.
+    """
+    dia -= timedelta(days=1)
+    while not eh_pregao(dia):
+        dia -= timedelta(days=1)
+    return dia
+
+def ultimo_pregao(agora: Optional[datetime] = None) -> date:
+    """
+    Retorna o último pregão encerrado, isto é, o pregão mais recente cuja cotação de fechamento já deve
+    estar disponível.
+
+    :param agora: Momento de referência (padrão: agora, no fuso da B3); datas sem fuso são consideradas no fuso da B3.
+    :return: Data do último pregão encerrado.
+    """
+    agora = _no_fuso(agora)
+    if eh_pregao(agora.date()) and agora.time() >= HORARIO_FECHAMENTO:
+        return agora.date()
+    return pregao_anterior(agora.date())
+
+def proximo_fechamento(agora: Optional[datetime] = None) -> datetime:
+    """
+    Retorna o próximo momento em que um novo pregão será encerrado (`HORARIO_FECHAMENTO` do próximo pregão).
+
+    :param agora: Momento de referência (padrão: agora, no fuso da B3).
+    :return: Data e horário, no fuso da B3.
+    """
+    agora = _no_fuso(agora)
+    dia = agora.date() if agora.time() < HORARIO_FECHAMENTO else agora.date() + timedelta(days=1)
+    while not eh_pregao(dia):
+        dia += timedelta(days=1)
+    return datetime.combine(dia, HORARIO_FECHAMENTO, tzinfo=FUSO_B3)
+
+def _no_fuso(agora: Optional[datetime]) -> datetime:
+    """
+    Converte um momento para o fuso da B3 (momentos sem fuso são considerados já no fuso da B3).
+    """
+    if agora is None:
+        return datetime.now(FUSO_B3)
+    if agora.tzinfo is None:
+        return agora.replace(tzinfo=FUSO_B3)
+    return agora.astimezone(FUSO_B3)
@@ -0,0 +1,75 @@
+from threading import Lock
+from time import monotonic, sleep
+from typing import Callable, Optional, Any
+
+import logging
+
+class LimitadorTaxa:
+    """
+    Limitador de taxa do tipo token bucket, seguro para uso em várias threads.
+
+    O balde começa cheio com `capacidade` fichas e é reabastecido continuamente à razão de `taxa`
+    fichas por segundo. Cada requisição consome uma ficha; sem fichas disponíveis, `aguardar` bloqueia
+    até que a próxima ficha seja gerada.
+
+    **Atributos:**
+    - `taxa` (float): Quantidade média de requisições permitidas por segundo.
+    - `capacidade` (int): Quantidade máxima de requisições permitidas em rajada.
+
+    **Métodos:**
+    - `aguardar(self)`: Bloqueia até que uma requisição possa ser feita e consome uma ficha.
+    """
+
+    def __init__(self, taxa: float, capacidade: Optional[int] = None):
+        """
+        Inicializa o limitador de taxa.
+
+        :param taxa: Quantidade média de requisições permitidas por segundo.
+        :param capacidade: Quantidade máxima de requisições em rajada (padrão: `taxa`, no mínimo 1).
+        """
+        self.taxa = taxa
+        self.capacidade = capacidade or max(1, int(taxa))
+        self._fichas = float(self.capacidade)
+        self._ultimo = monotonic()
+        self._trava = Lock()
+
+    def aguardar(self) -> None:
+        """
+        Bloqueia até que uma requisição possa ser feita e consome uma ficha.
+        """
+        while True:
+            with self._trava:
+                agora = monotonic()
+                self._fichas = min(self.capacidade, self._fichas + (agora - self._ultimo) * self.taxa)
+                self._ultimo = agora
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    return
+                espera = (1 - self._fichas) / self.taxa
+            sleep(espera)
+
+def com_tentativas(funcao: Callable[..., Any], *args, tentativas: int = 3, espera_base: float = 1.0,
+                   limitador: Optional[LimitadorTaxa] = None, **kwargs) -> Any:
+    """
+    Executa uma função repetindo-a com espera exponencial quando ela lança uma exceção.
+
+    :param funcao: Função a ser executada (ex.: uma fonte de preços).
+    :param args: Argumentos posicionais repassados à função.
+    :param tentativas: Quantidade máxima de tentativas.
+    :param espera_base: Espera, em segundos, antes da segunda tentativa; dobra a cada nova falha.
+    :param limitador: Limitador de taxa consultado antes de cada tentativa.
+    :param kwargs: Argumentos nomeados repassados à função.
+    :return: O retorno da função.
+    :raises Exception: A exceção da última tentativa, se todas falharem.
+    """
+    for tentativa in range(tentativas):
+        if limitador is not None:
+            limitador.aguardar()
+        try:
+            return funcao(*args, **kwargs)
+        except Exception as e:
+            if tentativa == tentativas - 1:
+                raise
+            espera = espera_base * 2 ** tentativa
+            logging.warning(f"Falha na tentativa {tentativa + 1} de {tentativas} ({e}); nova tentativa em {espera:.1f}s.")
+            sleep(espera)
@@ -0,0 +1,147 @@
+"""
+Consulta rápida, somente leitura, dos resultados já salvos pelo `Dowtrend`.
+
+Este módulo usa apenas a biblioteca padrão: não importa `pandas`, `yfinance`, `requests` nem `matplotlib`,
+de modo que uma consulta como "os 10 menores retornos mensais do IDIV" responde em milissegundos a partir
+de um processo novo (cron, alertas, linha de comando). Os resultados são lidos do arquivo JSON de cada
+amostra (`data/<amostra>.json`), gravado a cada execução junto com o snapshot do dia.
+
+Uso:
+    python consulta.py indice:IDIV mensal            # 10 menores retornos mensais
+    python consulta.py indice:IDIV mensal --maiores  # 10 maiores retornos mensais
+    python consulta.py empresas_listadas anual -k 20
+    python consulta.py indice:IDIV mensal --ticker PETR4
+"""
+
+import sys
+import json
+import argparse
+from math import isnan
+from os.path import join, dirname, abspath
+from typing import Dict, List, Optional, Tuple
+
+DIRETORIO_DADOS = join(dirname(dirname(abspath(__file__))), 'data')
+
+PERIODOS = ['semanal', 'quinzenal', 'mensal', 'trimestral', 'anual']
+
+# Cópia de `Dowtrend.CRITERIOS`, para que a consulta não importe o pandas
+CRITERIOS = {'DESVALORIZAÇÃO': True, 'VALORIZAÇÃO': False}
+
+def caminho_resultados(amostra: str, diretorio: str = DIRETORIO_DADOS) -> str:
+    """
+    Retorna o caminho do arquivo JSON de uma amostra (ex.: 'indice:IDIV' -> `data/indice_IDIV.json`).
+
+    :param amostra: Tipo de amostra, como 'empresas_listadas' ou 'indice:IDIV'.
+    :param diretorio: Diretório dos arquivos JSON.
+    :return: Caminho do arquivo.
+    """
+    return join(diretorio, amostra.replace(':', '_') + '.json')
+
+def ler_resultados(amostra: str, diretorio: str = DIRETORIO_DADOS) -> Dict[str, Dict[str, float]]:
+    """
+    Lê os resultados salvos de uma amostra.
+
+    :param amostra: Tipo de amostra, como 'empresas_listadas' ou 'indice:IDIV'.
+    :param diretorio: Diretório dos arquivos JSON.
+    :return: Dicionário `{ticker: {periodo: valor}}`, como o `Dowtrend.read_data('json')`.
+    :raises FileNotFoundError: Se a amostra ainda não foi processada.
+    """
+    with open(caminho_resultados(amostra, diretorio), 'r') as json_file:
+        return json.load(json_file)
+
+def _valido(valor: Optional[float]) -> bool:
+    """
+    Indica se um retorno possui valor (não é `None` nem `nan`).
+    """
+    return valor is not None and not isnan(valor)
+
+def ordenar(dados: Dict[str, Dict[str, float]], periodo: str, tipo: str) -> List[str]:
+    """
+    Ordena os tickers pelo retorno de um período, como o `Dowtrend.obter_maximos`.
+
+    A ordenação é estável e deixa os tickers sem valor ao final; para 'VALORIZAÇÃO' a ordem crescente é
+    invertida, como no `IndiceRankings`. Os valores saem na mesma ordem do `obter_maximos`; apenas tickers
+    com retornos iguais podem trocar de lugar entre si, pois o `sort_values` do pandas não é estável.
+
+    :param dados: Dicionário `{ticker: {periodo: valor}}`.
+    :param periodo: Período do ranking (ex.: 'mensal').
+    :param tipo: 'VALORIZAÇÃO' para os maiores retornos ou 'DESVALORIZAÇÃO' para os menores.
+    :return: Tickers na ordem do critério.
+    """
+    validos = sorted((ticker for ticker, valores in dados.items() if _valido(valores.get(periodo))),
+                     key=lambda ticker: dados[ticker][periodo])
+    sem_valor = [ticker for ticker, valores in dados.items() if not _valido(valores.get(periodo))]
+    return (validos if CRITERIOS[tipo] else validos[::-1]) + sem_valor
+
+def obter_maximos(dados: Dict[str, Dict[str, float]], periodo: str, tipo: str, k: int = 10) -> List[Tuple[str, Dict[str, float]]]:
+    """
+    Obtém os `k` tickers com os maiores ou menores retornos de um período.
+
+    :param dados: Dicionário `{ticker: {periodo: valor}}`.
+    :param periodo: Período do ranking (ex.: 'mensal').
+    :param tipo: 'VALORIZAÇÃO' para os maiores retornos ou 'DESVALORIZAÇÃO' para os menores.
+    :param k: Quantidade de tickers.
+    :return: Lista de tuplas `(ticker, {periodo: valor})`, na ordem do critério.
+    """
+    return [(ticker, dados[ticker]) for ticker in ordenar(dados, periodo, tipo)[:k]]
+
+def formatar(linhas: List[Tuple[str, Dict[str, float]]]) -> str:
+    """
+    Formata os resultados como uma tabela de texto com uma coluna por período.
+
+    :param linhas: Lista de tuplas `(ticker, {periodo: valor})`.
+    :return: Tabela de texto.
+    """
+    cabecalho = f"{'Ticker':<8}" + ''.join(f'{periodo:>12}' for periodo in PERIODOS)
+    corpo = [f'{ticker:<8}' + ''.join(f"{valores.get(periodo, float('nan')):>12.2f}" for periodo in PERIODOS)
+             for ticker, valores in linhas]
+    return '\n'.join([cabecalho] + corpo)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Executa uma consulta pela linha de comando e imprime a tabela de resultados.
+
+    :param argv: Argumentos da linha de comando (padrão: `sys.argv[1:]`).
+    :return: Código de saída (0 em caso de sucesso).
+    """
+    parser = argparse.ArgumentParser(description='Consulta os resultados salvos pelo Dowtrend.')
+    parser.add_argument('amostra', help="Tipo de amostra, como 'empresas_listadas' ou 'indice:IDIV'.")
+    parser.add_argument('periodo', choices=PERIODOS, help='Período do ranking.')
+    parser.add_argument('-k', type=int, default=10, help='Quantidade de tickers (padrão: 10).')
+    parser.add_argument('--maiores', action='store_true', help='Lista os maiores retornos (VALORIZAÇÃO) em vez dos menores.')
+    parser.add_argument('--ticker', help='Mostra a posição e os retornos de um ticker.')
+    parser.add_argument('--data', help="Consulta o snapshot vigente em uma data 'AAAA-MM-DD' (carrega o pandas).")
+    args = parser.parse_args(argv)
+    tipo = 'VALORIZAÇÃO' if args.maiores else 'DESVALORIZAÇÃO'
+
+    if args.data:
+        # Os snapshots datados são arquivos parquet: apenas este caminho carrega o `Dowtrend` e o pandas
+        try:
+            from .dowtrend import Dowtrend
+        except ImportError:
+            from dowtrend import Dowtrend
+        dados = Dowtrend(type_amostra=args.amostra).read_data('json', data=args.data)
+        if dados is None:
+            return 1
+    else:
+        try:
+            dados = ler_resultados(args.amostra)
+        except FileNotFoundError:
+            print(f"Arquivo {caminho_resultados(args.amostra)} não encontrado.", file=sys.stderr)
+            return 1
+
+    if args.ticker:
+        if args.ticker not in dados:
+            print(f"O ticker {args.ticker} não pertence à amostra {args.amostra}.", file=sys.stderr)
+            return 1
+        ordem = ordenar(dados, args.periodo, tipo)
+        posicao = ordem.index(args.ticker) + 1 if _valido(dados[args.ticker].get(args.periodo)) else None
+        print(f"{args.ticker}: posição {posicao or '-'} de {sum(_valido(v.get(args.periodo)) for v in dados.values())} ({tipo}, {args.periodo})")
+        print(formatar([(args.ticker, dados[args.ticker])]))
+        return 0
+
+    print(formatar(obter_maximos(dados, args.periodo, tipo, args.k)))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+import json
+from os import remove, fsync
+from os.path import exists
+from threading import Lock
+from typing import Dict
+
+import logging
+
+class Diario:
+    """
+    Diário (journal) de resultados por ticker, gravado em modo append-only.
+
+    Cada ticker processado é registrado imediatamente como uma linha JSON `{"ticker": ..., "dados": {...}}`,
+    de modo que uma execução interrompida não perde os resultados já calculados. Ao retomar, `ler` devolve
+    os tickers já registrados; uma última linha incompleta (gravação interrompida) é ignorada.
+
+    **Atributos:**
+    - `caminho` (str): Caminho do arquivo do diário.
+
+    **Métodos:**
+    - `ler(self)`: Retorna os resultados já registrados no diário.
+    - `registrar(self, ticker: str, dados: Dict[str, float])`: Acrescenta o resultado de um ticker ao diário.
+    - `remover(self)`: Apaga o diário após a finalização da execução.
+    """
+
+    def __init__(self, caminho: str):
+        """
+        Inicializa o diário.
+
+        :param caminho: Caminho do arquivo do diário.
+        """
+        self.caminho = caminho
+        self._trava = Lock()
+
+    def ler(self) -> Dict[str, Dict[str, float]]:
+        """
+        Retorna os resultados já registrados no diário.
+
+        :return: Dicionário `{ticker: {periodo: valor}}`; vazio se o diário não existir.
+        """
+        data = {}
+        if not exists(self.caminho):
+            return data
+        with open(self.caminho, 'r') as arquivo:
+            for linha in arquivo:
+                try:
+                    registro = json.loads(linha)
+                except json.JSONDecodeError:
+                    logging.warning(f"Linha incompleta ignorada no diário {self.caminho}.")
+                    continue
+                data[registro['ticker']] = registro['dados']
+        return data
+
+    def registrar(self, ticker: str, dados: Dict[str, float]) -> None:
+        """
+        Acrescenta o resultado de um ticker ao diário e força a gravação em disco.
+
+        :param ticker: Código do ativo (ticker).
+        :param dados: Retornos calculados para o ticker.
+        """
+        linha = json.dumps({'ticker': ticker, 'dados': dados}) + '\n'
+        with self._trava:
+            with open(self.caminho, 'a') as arquivo:
+                arquivo.write(linha)
+                arquivo.flush()
+                fsync(arquivo.fileno())
+
+    def remover(self) -> None:
+        """
+        Apaga o diário após a finalização da execução.
+        """
+        if exists(self.caminho):
+            remove(self.caminho)
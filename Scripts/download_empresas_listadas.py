@@ -1,16 +1,19 @@
 from dowtrend import Dowtrend
 
+# Quantidade de tickers baixados em cada requisição multi-símbolo
+LOTE = 50
+
 def main() -> None:
     """
     Função principal que instancia a classe `Dowtrend` para o tipo de amostra 'empresas_listadas' 
-    e executa o método `loop()` para processar os dados.
+    e executa o método `loop()` para processar os dados, em lotes de `LOTE` tickers por download.
     """
     try:
         # Criando uma instância da classe Dowtrend com o tipo de amostra 'empresas_listadas'
         dowtrend = Dowtrend(type_amostra='empresas_listadas')
 
-        # Processando os dados dos tickers
-        dowtrend.loop()
+        # Processando os dados dos tickers em lotes
+        dowtrend.loop(lote=LOTE)
         print("Processamento das empresas listadas concluído com sucesso.")
 
     except Exception as e:
@@ -1,4 +1,4 @@
-from dowtrend import Dowtrend
+from planejador import PlanejadorExecucao
 
 # Dicionário de índices, com os códigos e suas respectivas descrições
 INDICES = {
@@ -24,30 +24,18 @@ INDICES = {
     'IFIX': 'Índice de Fundos de Investimentos Imobiliários (IFIX B3)'
 }
 
-def processar_indice(indice: str, numero: int) -> None:
-    """
-    Processa os dados para um índice específico, instanciando a classe Dowtrend
-    e executando o método de processamento para cada um dos índices.
-
-    :param indice: Código do índice a ser analisado (ex.: 'IDIV', 'SMLL').
-    :param numero: Número sequencial do índice no dicionário `INDICES`.
-    """
-    print(f'Processando o {numero}º índice: {indice} ({INDICES[indice]})')
-    # Inicializa a classe Dowtrend com o tipo de amostra configurado como o índice
-    dowtrend = Dowtrend(type_amostra=f'indice:{indice}')
-    dowtrend.loop()
-    print(f'Finalizado o processamento do índice: {indice}.\n')
-
 def main() -> None:
     """
     Função principal que executa o processamento de todos os índices presentes
     no dicionário `INDICES`.
 
-    Para cada índice, o código instancia a classe Dowtrend e executa o método `loop`
-    para coletar e salvar os dados financeiros.
+    Os índices são processados em conjunto pelo `PlanejadorExecucao`: cada ticker presente
+    em mais de um índice é baixado e processado uma única vez, e os resultados são salvos
+    no arquivo JSON de cada índice.
     """
-    for i, indice in enumerate(INDICES.keys()):
-        processar_indice(indice, i)
+    relatorio = PlanejadorExecucao([f'indice:{indice}' for indice in INDICES]).executar()
+    print(f"Finalizado o processamento de {relatorio['amostras']} índices: "
+          f"{relatorio['tickers_unicos']} tickers únicos, {relatorio['tickers_evitados']} processamentos evitados.")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,24 @@
+from download_indices import INDICES
+from planejador import PlanejadorExecucao
+
+# Quantidade de tickers baixados em cada requisição multi-símbolo
+LOTE = 50
+
+def main() -> None:
+    """
+    Função principal que atualiza todos os índices do dicionário `INDICES` e as empresas listadas
+    em uma única execução.
+
+    Como todos os tickers dos índices também fazem parte das empresas listadas, o `PlanejadorExecucao`
+    processa cada ticker uma única vez e distribui os resultados para todos os arquivos JSON.
+    """
+    amostras = [f'indice:{indice}' for indice in INDICES] + ['empresas_listadas']
+    try:
+        relatorio = PlanejadorExecucao(amostras, lote=LOTE).executar()
+        print(f"Processamento concluído: {relatorio['amostras']} amostras, {relatorio['tickers_unicos']} tickers únicos, "
+              f"{relatorio['tickers_evitados']} processamentos evitados.")
+    except Exception as e:
+        print(f"Erro ao processar as amostras: {e}")
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,32 @@
 
 import json
-from os.path import join
-import requests
-from pandas import read_csv, DataFrame
+from os import replace
+from os.path import join, exists, getmtime
+from pandas import read_csv, DataFrame, concat
 from io import StringIO
-from yfinance import download
 from numpy import nan
 from os.path import dirname, abspath
 from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    from .historico import HistoricoPrecos
+    from .concorrencia import LimitadorTaxa
+    from .universo import CacheUniverso
+    from .diario import Diario
+    from .snapshots import ArmazemResultados
+    from .retornos import PERIODOS, calcular_retornos_painel, calcular_retornos_serie
+    from .metricas import Metricas
+    from .vivacidade import RegistroVivacidade
+except ImportError:
+    from historico import HistoricoPrecos
+    from concorrencia import LimitadorTaxa
+    from universo import CacheUniverso
+    from diario import Diario
+    from snapshots import ArmazemResultados
+    from retornos import PERIODOS, calcular_retornos_painel, calcular_retornos_serie
+    from metricas import Metricas
+    from vivacidade import RegistroVivacidade
 
 import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -18,101 +37,134 @@ class Dowtrend:
 
     A classe `Dowtrend` fornece funcionalidades para:
     - Obter tickers de empresas listadas ou de índices específicos.
-    - Baixar séries temporais de dados financeiros de ações utilizando o `yfinance`.
+    - Baixar séries temporais de dados financeiros de ações utilizando o `yfinance`, mantendo um histórico local atualizado de forma incremental.
     - Calcular e processar os retornos financeiros em diferentes períodos, como semanal, quinzenal, mensal, trimestral e anual.
-    - Salvar e ler os dados extraídos em arquivos no formato JSON.
+    - Salvar e ler os dados extraídos em arquivos no formato JSON e em snapshots datados no formato parquet.
     - Identificar os tickers com os maiores ou menores retornos financeiros com base em um critério de valorização ou desvalorização.
 
     **Atributos:**
+    - `CRITERIOS` (Dict[str, bool]): Ordem crescente (`True`) ou decrescente (`False`) dos retornos em cada critério de `obter_maximos`.
     - `qtd_output` (int): Quantidade de resultados a serem retornados, geralmente o número de maiores ou menores valores de valorização/desvalorização.
     - `type_amostra` (str): Tipo de amostra a ser utilizada para a extração de dados, podendo ser `'empresas_listadas'` ou um índice específico no formato `'indice:NOME'`.
     - `file_path` (str): Caminho do arquivo onde os dados processados serão salvos, com base no tipo de amostra.
+    - `historico` (HistoricoPrecos): Armazenamento local dos preços ajustados de cada ticker.
+    - `universo` (CacheUniverso): Cache em disco da composição das amostras.
+    - `resultados` (ArmazemResultados): Snapshots datados dos resultados da amostra (`data/resultados/<amostra>`).
+    - `metricas` (Metricas): Tempo de cada etapa, contadores e tickers mais lentos da execução (desligadas por padrão).
+    - `vivacidade` (RegistroVivacidade): Registro dos tickers sem cotações, que não são consultados novamente até o fim da espera.
 
     **Métodos:**
-    - `__init__(self, qtd_output=10, type_amostra='indice:IDIV')`: Inicializa a classe `Dowtrend` com os parâmetros necessários.
+    - `__init__(self, qtd_output=10, type_amostra='indice:IDIV', requisicoes_por_segundo=None, metricas=False)`: Inicializa a classe `Dowtrend` com os parâmetros necessários.
     - `_get_tickers_empresas_listadas(self)`: Obtém a lista de tickers de todas as empresas listadas na B3.
     - `_get_tickers_indice(self, indice: str)`: Obtém a lista de tickers de um índice específico.
-    - `_obter_amostra(self)`: Retorna a lista de tickers com base no tipo de amostra configurado.
-    - `_obter_serie_temporal(self, ticker: str)`: Obtém a série temporal de um ticker específico com dados históricos de preços ajustados.
+    - `_obter_amostra(self)`: Retorna a lista de tickers com base no tipo de amostra configurado, resolvida uma única vez por instância.
+    - `_obter_serie_temporal(self, ticker: str, atualizar: bool = True)`: Obtém a série temporal de um ticker específico a partir do histórico local de preços ajustados.
     - `_calcular_retorno(self, df_data: DataFrame, periodo: str)`: Calcula o retorno de um ativo em um período específico (semanal, quinzenal, mensal, trimestral ou anual).
     - `_obter_ultimo_valor(self, df_data: DataFrame)`: Obtém o último valor de um DataFrame contendo os retornos calculados.
     - `processar_dados_ticker(self, ticker: str)`: Processa os dados de um único ticker e calcula os retornos para diferentes períodos.
-    - `save_data(self, data: Dict[str, Dict[str, float]])`: Salva os dados processados em um arquivo JSON.
-    - `read_data(self, tipo: str)`: Lê os dados salvos de um arquivo JSON e os retorna no formato especificado (JSON ou DataFrame).
+    - `_processar_concorrente(self, amostra: List[str], concorrencia: int, diario=None)`: Processa os tickers em várias threads, sobrepondo os downloads.
+    - `processar_lote(self, tickers: List[str])`: Processa um lote de tickers com um único download multi-símbolo e cálculo vetorizado.
+    - `_caminho_diario(self)`: Retorna o caminho do diário de resultados da amostra.
+    - `processar_tickers(self, tickers: List[str], lote=None, concorrencia=None, diario=None)`: Processa uma lista de tickers no modo escolhido (sequencial, em lotes ou concorrente).
+    - `save_data(self, data: Dict[str, Dict[str, float]])`: Salva os dados processados em um arquivo JSON de forma atômica e grava o snapshot do dia.
+    - `read_data(self, tipo: str, data=None, colunas=None)`: Lê os dados salvos (JSON, snapshot vigente em uma data ou colunas do snapshot mais recente) no formato especificado (JSON ou DataFrame).
+    - `_snapshot_atualizado(self)`: Indica se o snapshot mais recente foi gravado depois do arquivo JSON.
     - `obter_maximos(self, data: DataFrame, column: str, tipo: str)`: Obtém os tickers com os maiores ou menores retornos com base em um critério (VALORIZAÇÃO ou DESVALORIZAÇÃO).
-    - `loop(self)`: Processa os dados de todos os tickers da amostra e salva os resultados no arquivo JSON.
+    - `loop(self, lote=None, concorrencia=None, retomar=False, reverificar=False)`: Processa os dados de todos os tickers da amostra e salva os resultados no arquivo JSON.
+    - `exportar_metricas(self, nome: str)`: Grava o resumo das métricas da execução e registra os tickers mais lentos.
     """
 
-    def __init__(self, qtd_output=10, type_amostra='indice:IDIV'):
+    CRITERIOS = {'DESVALORIZAÇÃO': True, 'VALORIZAÇÃO': False}
+
+    def __init__(self, qtd_output=10, type_amostra='indice:IDIV', requisicoes_por_segundo: Optional[float] = None,
+                 metricas: bool = False):
         """
         Inicializa a classe `Dowtrend` com os parâmetros necessários.
 
         :param qtd_output: Quantidade de resultados a serem retornados, geralmente o número de maiores ou menores valores de valorização ou desvalorização.
         :param type_amostra: Tipo de amostra a ser utilizada, como 'empresas_listadas' ou um índice específico como 'indice:IDIV'.
+        :param requisicoes_por_segundo: Limite de requisições por segundo ao `yfinance` (sem limite se `None`).
+        :param metricas: Se `True`, mede o tempo de cada etapa e grava o resumo da execução em `data/metricas` ao final do `loop()`.
         """
         self.qtd_output = qtd_output
         self.type_amostra = type_amostra
         self.file_path = join(dirname(dirname(abspath(__file__))), 'data', type_amostra.replace(':', '_')+'.json')
+        self.metricas = Metricas(ativo=metricas, rotulos={'amostra': type_amostra})
+        self.vivacidade = RegistroVivacidade()
+        self.historico = HistoricoPrecos(limitador=LimitadorTaxa(requisicoes_por_segundo) if requisicoes_por_segundo else None,
+                                         metricas=self.metricas, vivacidade=self.vivacidade)
+        self.universo = CacheUniverso()
+        self._amostra = None
+        self.resultados = ArmazemResultados(join(dirname(self.file_path), 'resultados', type_amostra.replace(':', '_')))
     
     def _get_tickers_empresas_listadas(self) -> List[str]:
         """
         Obtém a lista de tickers de todas as empresas listadas na B3.
 
+        A lista é lida do cache em disco (`data/universo`) e só é baixada novamente quando o cache expira e o arquivo de origem mudou.
+
         :return: Lista de strings contendo os códigos de negociação das empresas listadas na B3.
-        :raises ValueError: Se houver um erro ao acessar a URL para baixar os dados.
+        :raises ValueError: Se houver um erro ao acessar a URL para baixar os dados e não houver cache.
         """
         url = 'https://raw.githubusercontent.com/rianlucascs/b3-scraping-project/master/processed_data/3.%20Empresas%20listadas/todas_empresas_listadas.csv'
-        try:
-            response = requests.get(url)
-        except requests.exceptions.RequestException as e:
-            raise ValueError(f'Erro ao acessar a página: {e}')
-        return list(read_csv(StringIO(response.text), delimiter=';')['codigo_de_negociacao'].dropna())
+        return self.universo.obter('empresas_listadas', url, lambda texto: list(read_csv(StringIO(texto), delimiter=';')['codigo_de_negociacao'].dropna()))
 
     def _get_tickers_indice(self, indice: str) -> List [str]:
         """
         Obtém a lista de tickers de um índice específico.
 
+        A lista é lida do cache em disco (`data/universo`) e só é baixada novamente quando o cache expira e o arquivo de origem mudou.
+
         :param indice: O nome do índice para o qual os tickers devem ser obtidos (exemplo: 'IDIV').
         :return: Lista de strings contendo os códigos dos tickers pertencentes ao índice especificado.
-        :raises ValueError: Se houver um erro ao acessar a URL para baixar os dados.
+        :raises ValueError: Se houver um erro ao acessar a URL para baixar os dados e não houver cache.
         """
         url = f'https://raw.githubusercontent.com/rianlucascs/b3-scraping-project/master/processed_data/1.%20%C3%8Dndices%20de%20Segmentos%20e%20Setoriais/Setores/{indice}/Tabela_{indice}.csv'
-        try:
-            response = requests.get(url)
-        except requests.exceptions.RequestException as e:
-            raise ValueError(f'Erro ao acessar a página: {e}')
-        return list(read_csv(StringIO(response.text), delimiter=',')['Código'])
+        return self.universo.obter(f'indice_{indice}', url, lambda texto: list(read_csv(StringIO(texto), delimiter=',')['Código']))
 
     def _obter_amostra(self) -> List[str]:
         """
         Retorna a lista de tickers com base no tipo de amostra configurado na instância.
 
         O tipo de amostra pode ser 'empresas_listadas' ou um índice no formato 'indice:NOME'.
+        A lista é resolvida na primeira chamada e reaproveitada nas seguintes.
 
         :return: Lista de tickers a serem analisados.
         :raises ValueError: Se o tipo de amostra fornecido for desconhecido.
         """
-        if self.type_amostra == 'empresas_listadas':
-            return self._get_tickers_empresas_listadas()
-        elif 'indice:' in self.type_amostra:
-            indice = self.type_amostra.split(':')[1]
-            return self._get_tickers_indice(indice)
-        else:
-            raise ValueError(f"Tipo de amostra '{self.type_amostra}' desconhecido.")
+        if self._amostra is not None:
+            return self._amostra
+        with self.metricas.etapa('amostra'):
+            if self.type_amostra == 'empresas_listadas':
+                self._amostra = self._get_tickers_empresas_listadas()
+            elif 'indice:' in self.type_amostra:
+                indice = self.type_amostra.split(':')[1]
+                self._amostra = self._get_tickers_indice(indice)
+            else:
+                raise ValueError(f"Tipo de amostra '{self.type_amostra}' desconhecido.")
+        return self._amostra
             
-    def _obter_serie_temporal(self, ticker: str) -> DataFrame:
+    def _obter_serie_temporal(self, ticker: str, atualizar: bool = True) -> DataFrame:
         """
         Obtém a série temporal de um ticker específico com dados históricos de preços ajustados.
 
+        Os preços vêm do histórico local (`data/historico`); apenas os pregões que ainda não foram
+        armazenados são baixados com o `yfinance`.
+
         :param ticker: Código do ativo (ticker) para o qual os dados serão obtidos.
+        :param atualizar: Se `False`, usa o histórico local sem buscar novos pregões (quando disponível).
         :return: DataFrame contendo a série temporal de preços ajustados (Adj Close) para o ativo.
-        :raises Exception: Se houver erro ao baixar os dados do ticker.
         """
         try:
-            return download(f'{ticker}.SA', progress=False, period='max')[['Adj Close']]
+            with self.metricas.etapa('serie_temporal', ticker):
+                df = self.historico.obter(ticker, atualizar=atualizar)
         except Exception as e:
-            logging.error(f"Erro ao baixar dados para o ticker {ticker}: {e}")
+            logging.error(f"Erro ao obter dados para o ticker {ticker}: {e}")
+            self.metricas.contar('erros')
             return DataFrame()
+        if df.empty:
+            self.metricas.contar('series_vazias')
+        return df
 
     def _calcular_retorno(self, df_data: DataFrame, periodo: str) -> DataFrame:
         """
@@ -122,8 +174,8 @@ class Dowtrend:
         :param periodo: O período para o qual o retorno será calculado (exemplo: 'semanal', 'quinzenal', 'mensal', 'trimestral', 'anual').
         :return: DataFrame contendo os retornos calculados para o período especificado.
         """
-        periodos_map  = {'semanal': 'W', 'quinzenal': '15D', 'mensal': 'ME', 'trimestral': 'QE', 'anual': 'YE'}
-        return df_data['Adj Close'].resample(periodos_map [periodo]).last().pct_change().dropna() * 100
+        with self.metricas.etapa('calcular_retorno'):
+            return df_data['Adj Close'].resample(PERIODOS[periodo]).last().pct_change().dropna() * 100
 
     def _obter_ultimo_valor(self, df_data: DataFrame) -> float:
         """
@@ -137,56 +189,128 @@ class Dowtrend:
             return float(round(df_data.iloc[-1].iloc[-1], 2))
         except Exception as e:
             logging.error(f"Erro pegar o último valor: {e}")
+            self.metricas.contar('erros')
             return nan
         
     def processar_dados_ticker(self, ticker: str) -> Dict[str, float]:
         """
         Processa os dados de um único ticker e calcula os retornos para diferentes períodos.
 
-        Para cada ticker, os retornos são calculados para os períodos semanal, quinzenal, mensal, trimestral e anual.
+        Para cada ticker, os retornos são calculados para os períodos semanal, quinzenal, mensal, trimestral e anual
+        em uma única passagem (`calcular_retornos_serie`), com os mesmos valores de `_calcular_retorno`.
 
         :param ticker: Código do ativo (ticker) a ser analisado.
         :return: Dicionário com os retornos calculados para os diferentes períodos (semanal, quinzenal, mensal, trimestral e anual).
         """
         df = self._obter_serie_temporal(ticker)
-        return {
-            'semanal': self._obter_ultimo_valor(self._calcular_retorno(df, 'semanal')),
-            'quinzenal': self._obter_ultimo_valor(self._calcular_retorno(df, 'quinzenal')),
-            'mensal': self._obter_ultimo_valor(self._calcular_retorno(df, 'mensal')),
-            'trimestral': self._obter_ultimo_valor(self._calcular_retorno(df, 'trimestral')),
-            'anual': self._obter_ultimo_valor(self._calcular_retorno(df, 'anual'))
-        }
+        if 'Adj Close' not in df.columns.get_level_values(0):
+            return {periodo: nan for periodo in PERIODOS}
+        serie = df['Adj Close']
+        with self.metricas.etapa('calcular_retorno', ticker):
+            return calcular_retornos_serie(serie.iloc[:, 0] if isinstance(serie, DataFrame) else serie)
     
-    def save_data(self, data: Dict[str, Dict[str, float]]) -> None:
+    def _processar_concorrente(self, amostra: List[str], concorrencia: int, diario: Optional[Diario] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Processa os tickers da amostra em um pool de threads, sobrepondo as esperas de rede dos downloads.
+
+        O número de downloads simultâneos é limitado por `concorrencia`; a taxa de requisições e as
+        repetições em caso de falha são controladas pelo `historico`.
+
+        :param amostra: Lista de tickers a serem processados.
+        :param concorrencia: Quantidade máxima de tickers processados ao mesmo tempo.
+        :param diario: Diário onde cada resultado é registrado assim que fica pronto.
+        :return: Dicionário `{ticker: {periodo: valor}}`, na mesma ordem de `amostra`.
+        """
+        data = {}
+        with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+            futuros = {executor.submit(self.processar_dados_ticker, ticker): ticker for ticker in amostra}
+            for i, futuro in enumerate(as_completed(futuros)):
+                ticker = futuros[futuro]
+                try:
+                    data[ticker] = futuro.result()
+                except Exception as e:
+                    logging.error(f"Erro ao processar o ticker {ticker}: {e}")
+                    self.metricas.contar('erros')
+                    data[ticker] = {periodo: nan for periodo in PERIODOS}
+                if diario is not None:
+                    diario.registrar(ticker, data[ticker])
+                logging.info(f"({i} / {len(futuros)}) Dados processados para o ticker: {ticker}")
+        return {ticker: data[ticker] for ticker in amostra}
+
+    def processar_lote(self, tickers: List[str]) -> Dict[str, Dict[str, float]]:
+        """
+        Processa um lote de tickers de uma só vez.
+
+        Os preços do lote são atualizados com uma única requisição multi-símbolo, alinhados em um painel
+        largo (datas × tickers) e os retornos de todos os períodos são calculados de forma vetorizada.
+        O resultado é igual ao obtido chamando `processar_dados_ticker` para cada ticker.
+
+        :param tickers: Lista de códigos dos ativos (tickers) do lote.
+        :return: Dicionário `{ticker: {periodo: valor}}`, na mesma ordem de `tickers`.
+        """
+        with self.metricas.etapa('serie_temporal'):
+            series = {ticker: serie for ticker, serie in self.historico.atualizar_lote(tickers).items() if not serie.empty}
+        self.metricas.contar('series_vazias', len(tickers) - len(series))
+        with self.metricas.etapa('calcular_retorno'):
+            resultados = calcular_retornos_painel(concat(series, axis=1)) if series else {}
+        return {ticker: resultados.get(ticker, {periodo: nan for periodo in PERIODOS}) for ticker in tickers}
+
+    def save_data(self, data: Dict[str, Dict[str, float]]) -> bool:
         """
         Salva os dados processados em um arquivo JSON.
 
+        Os dados são gravados em um arquivo temporário que substitui o arquivo final de uma só vez,
+        para que uma interrupção nunca deixe o JSON pela metade. Em seguida, o snapshot datado da
+        execução é gravado em `resultados`.
+
         :param data: Dicionário contendo os dados a serem salvos em formato JSON.
-        :raises Exception: Se ocorrer um erro ao salvar o arquivo JSON.
+        :return: `True` se os dados foram salvos, `False` caso contrário.
         """
         try:
-            with open(join(self.file_path), 'w') as json_file:
-                json.dump(data, json_file, indent=4)
+            with self.metricas.etapa('save_data'):
+                with open(self.file_path + '.tmp', 'w') as json_file:
+                    json.dump(data, json_file, indent=4)
+                replace(self.file_path + '.tmp', self.file_path)
+                self.resultados.salvar(data)
             logging.info(f"Dados salvos com sucesso no arquivo {self.file_path}.")
+            return True
         except Exception as e:
             logging.error(f"Erro ao salvar os dados: {e}")
+            self.metricas.contar('erros')
+            return False
     
-    def read_data(self, type) -> Optional[Dict[str, Dict[str, float]]]:
+    def read_data(self, type, data: Optional[str] = None, colunas: Optional[List[str]] = None) -> Optional[Dict[str, Dict[str, float]]]:
         """
-        Lê os dados salvos de um arquivo JSON e os retorna no formato especificado.
+        Lê os dados salvos e os retorna no formato especificado.
+
+        Por padrão o arquivo JSON da amostra é lido. Os snapshots são usados apenas quando pedidos:
+        com `data`, é lido o snapshot vigente naquele dia; com `colunas`, apenas as colunas pedidas são lidas do
+        snapshot mais recente, desde que ele não seja mais antigo que o JSON (que pode ter sido atualizado por
+        fora, por exemplo com um `git pull`).
 
         :param tipo: Tipo de leitura ('json' para dicionário ou 'DataFrame' para DataFrame).
+        :param data: Data no formato 'AAAA-MM-DD' para ler os resultados vigentes naquele dia; se `None`, lê os mais recentes.
+        :param colunas: Períodos a serem lidos (ex.: ['mensal']); se `None`, lê todos.
         :return: Dados carregados no formato especificado (dicionário ou DataFrame).
         :raises FileNotFoundError: Se o arquivo JSON não for encontrado.
         :raises json.JSONDecodeError: Se houver erro ao decodificar o arquivo JSON.
         """
+        if data is not None or (colunas is not None and self._snapshot_atualizado()):
+            df = self.resultados.ler(data, colunas)
+            if df is not None:
+                df.index.name = None
+                return df.to_dict(orient='index') if type == 'json' else df
+            if data is not None:
+                print(f"Nenhum snapshot da amostra {self.type_amostra} até {data}.")
+                return None
+
         try:
             with open(self.file_path, 'r') as json_file:
                 data = json.load(json_file) 
                 if type == 'json':
-                    return data
+                    return data if colunas is None else {ticker: {c: valores[c] for c in colunas} for ticker, valores in data.items()}
                 if type == 'DataFrame':
-                    return DataFrame(data).T
+                    return DataFrame(data).T if colunas is None else DataFrame(data).T[colunas]
             return data
         except FileNotFoundError:
             print(f"Arquivo {self.file_path} não encontrado.")
@@ -195,6 +319,15 @@ class Dowtrend:
             print(f"Erro ao decodificar o arquivo JSON.")
             return None
 
+    def _snapshot_atualizado(self) -> bool:
+        """
+        Indica se o snapshot mais recente foi gravado depois do arquivo JSON (ou se o JSON não existe).
+
+        :return: `True` se o snapshot mais recente pode substituir a leitura do JSON.
+        """
+        modificado = self.resultados.modificado_em()
+        return modificado is not None and (not exists(self.file_path) or modificado >= getmtime(self.file_path))
+
     def obter_maximos(self, data: DataFrame, column: str, tipo: str) -> DataFrame:
         """
         Obtém os tickers com os maiores ou menores retornos com base em um critério (VALORIZAÇÃO ou DESVALORIZAÇÃO).
@@ -204,19 +337,98 @@ class Dowtrend:
         :param tipo: Tipo de critério para ordenação ('VALORIZAÇÃO' para maiores retornos ou 'DESVALORIZAÇÃO' para menores retornos).
         :return: DataFrame contendo os tickers classificados conforme o critério.
         """
-        criterios = {'DESVALORIZAÇÃO': True, 'VALORIZAÇÃO': False}
-        return data.sort_values(by=column, ascending=criterios[tipo]).head(self.qtd_output)
+        return data.sort_values(by=column, ascending=self.CRITERIOS[tipo]).head(self.qtd_output)
 
-    def loop(self):
+    def _caminho_diario(self) -> str:
         """
-        Processa os dados de todos os tickers da amostra e salva os resultados no arquivo JSON.
+        Retorna o caminho do diário de resultados da amostra (ex.: `data/indice_IDIV.diario.jsonl`).
 
-        Este método percorre a lista de tickers definida pela amostra, processa os dados para cada um e salva os resultados.
+        :return: Caminho do arquivo do diário.
+        """
+        return self.file_path[:-len('.json')] + '.diario.jsonl'
+
+    def processar_tickers(self, tickers: List[str], lote: Optional[int] = None, concorrencia: Optional[int] = None,
+                          diario: Optional[Diario] = None) -> Dict[str, Dict[str, float]]:
         """
+        Processa uma lista de tickers no modo escolhido (sequencial, em lotes ou concorrente).
+
+        :param tickers: Lista de códigos dos ativos (tickers) a serem processados.
+        :param lote: Se informado, os tickers são processados em lotes desse tamanho com `processar_lote`,
+            em vez de um download e um cálculo por ticker.
+        :param concorrencia: Se informado, os tickers são processados em até essa quantidade de threads
+            simultâneas com `_processar_concorrente`.
+        :param diario: Diário onde cada resultado é registrado assim que fica pronto.
+        :return: Dicionário `{ticker: {periodo: valor}}`, na mesma ordem de `tickers`.
+        """
+        self.metricas.contar('tickers', len(tickers))
+        if concorrencia:
+            return self._processar_concorrente(tickers, concorrencia, diario)
+
         data = {}
-        
-        for i, ticker in enumerate(self._obter_amostra()):
-            logging.info(f"({i} / {len(self._obter_amostra())}) Processando dados para o ticker: {ticker}")
+        if lote:
+            for i in range(0, len(tickers), lote):
+                logging.info(f"({i} / {len(tickers)}) Processando lote de {len(tickers[i:i + lote])} tickers")
+                resultados = self.processar_lote(tickers[i:i + lote])
+                if diario is not None:
+                    for ticker, dados in resultados.items():
+                        diario.registrar(ticker, dados)
+                data.update(resultados)
+            return data
+
+        for i, ticker in enumerate(tickers):
+            logging.info(f"({i} / {len(tickers)}) Processando dados para o ticker: {ticker}")
             data[ticker] = self.processar_dados_ticker(ticker)
-        
-        self.save_data(data)
+            if diario is not None:
+                diario.registrar(ticker, data[ticker])
+        return data
+
+    def loop(self, lote: Optional[int] = None, concorrencia: Optional[int] = None, retomar: bool = False,
+             reverificar: bool = False):
+        """
+        Processa os dados de todos os tickers da amostra e salva os resultados no arquivo JSON.
+
+        Este método percorre a lista de tickers definida pela amostra, processa os dados para cada um e salva os resultados.
+        Cada resultado é registrado em um diário (`_caminho_diario`) assim que fica pronto; o diário só é apagado
+        depois que o arquivo JSON final é salvo. Com as métricas ligadas, o resumo da execução é gravado
+        em `data/metricas/<amostra>.json` e `data/metricas/<amostra>.prom` (formato do Prometheus).
+
+        :param lote: Se informado, os tickers são processados em lotes desse tamanho com `processar_lote`,
+            em vez de um download e um cálculo por ticker.
+        :param concorrencia: Se informado, os tickers são processados em até essa quantidade de threads
+            simultâneas com `_processar_concorrente`.
+        :param retomar: Se `True`, retoma uma execução interrompida, pulando os tickers já presentes no diário.
+        :param reverificar: Se `True`, consulta novamente os tickers da amostra presentes no registro de vivacidade
+            (`data/vivacidade.json`); caso contrário eles são pulados até o fim da espera e recebem `nan`.
+        """
+        diario = Diario(self._caminho_diario())
+        feitos = diario.ler() if retomar else {}
+        if not retomar:
+            diario.remover()
+
+        amostra = self._obter_amostra()
+        pendentes = [ticker for ticker in amostra if ticker not in feitos]
+        if feitos:
+            logging.info(f"Retomando execução: {len(amostra) - len(pendentes)} tickers já processados, {len(pendentes)} pendentes.")
+        if reverificar:
+            self.vivacidade.forcar(amostra)
+        try:
+            feitos.update(self.processar_tickers(pendentes, lote=lote, concorrencia=concorrencia, diario=diario))
+        finally:
+            self.vivacidade.salvar()
+
+        if self.save_data({ticker: feitos[ticker] for ticker in amostra}):
+            diario.remover()
+
+        if self.metricas.ativo:
+            self.exportar_metricas(self.type_amostra.replace(':', '_'))
+
+    def exportar_metricas(self, nome: str) -> None:
+        """
+        Grava o resumo das métricas da execução (`data/metricas/<nome>.json` e `.prom`) e registra os tickers mais lentos.
+
+        :param nome: Nome dos arquivos de métricas (ex.: 'indice_IDIV').
+        """
+        caminho_json, _ = self.metricas.exportar(nome)
+        for ticker, segundos, etapas in self.metricas.mais_lentos(5):
+            logging.info(f"Ticker lento: {ticker} ({segundos:.2f}s: " + ', '.join(f'{etapa} {tempo:.2f}s' for etapa, tempo in etapas.items()) + ')')
+        logging.info(f"Métricas da execução gravadas em {caminho_json}.")
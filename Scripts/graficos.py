@@ -1,43 +1,187 @@
+import json
+from hashlib import sha256
+from os import makedirs, replace
+from os.path import join, exists, getmtime
+from concurrent.futures import ProcessPoolExecutor
+
 import matplotlib.pyplot as plt
 
+import logging
+
+def _iniciar_processo():
+    """
+    Configura o backend headless (Agg) do matplotlib nos processos que renderizam a galeria.
+    """
+    plt.switch_backend('Agg')
+
+def _renderizar(tarefa):
+    """
+    Renderiza um gráfico da galeria em um arquivo de imagem (executada em um processo separado).
+
+    Uma falha é registrada e não interrompe os demais gráficos da galeria.
+
+    :param tarefa: Dicionário com o tipo do gráfico ('preco' ou 'variacao'), a amostra, os dados e o arquivo de saída.
+    :return: Caminho do arquivo gravado, ou `None` se o gráfico não pôde ser renderizado.
+    """
+    try:
+        graficos = Graficos(None, type_amostra=tarefa['type_amostra'], dados=tarefa.get('dados'))
+        if tarefa['tipo'] == 'preco':
+            graficos.grafico1(tarefa['ticker'], arquivo=tarefa['arquivo'], df=tarefa['df'], dpi=tarefa['dpi'])
+        else:
+            graficos.grafico2(tarefa['df'], tarefa['period'], arquivo=tarefa['arquivo'], dpi=tarefa['dpi'])
+    except Exception as e:
+        logging.error(f"Erro ao renderizar o gráfico {tarefa['arquivo']}: {e}")
+        plt.close('all')
+        return None
+    return tarefa['arquivo']
+
 class Graficos:
 
-    def __init__(self, dowtrend):
+    def __init__(self, dowtrend, type_amostra=None, dados=None):
         """
         Inicializa a classe Graficos com uma instância de Dowtrend.
         
         :param dowtrend: Instância da classe Dowtrend que contém os dados financeiros.
+        :param type_amostra: Amostra exibida nos títulos (padrão: a amostra do `dowtrend`).
+        :param dados: Resultados já carregados (`read_data('json')`); se `None`, são lidos do `dowtrend` quando
+            necessários e relidos sempre que os arquivos de resultados mudarem.
         """
         self.dowtrend = dowtrend
+        self.type_amostra = type_amostra or dowtrend.type_amostra
+        self._dados = dados
+        self._fixos = dados is not None
+        self._versao = None
+
+    def _versao_dados(self):
+        """
+        Identifica a versão dos resultados salvos pelo horário de gravação do JSON e do snapshot mais recente.
 
-    def grafico1(self, ticker):
+        :return: Tupla com os horários de modificação (`None` para arquivos ausentes).
+        """
+        json_path = self.dowtrend.file_path
+        return (getmtime(json_path) if exists(json_path) else None, self.dowtrend.resultados.modificado_em())
+
+    def _obter_dados(self):
+        """
+        Retorna os resultados da amostra, relendo os arquivos apenas quando um novo resultado foi salvo.
+
+        :return: Dicionário `{ticker: {periodo: valor}}`.
+        """
+        if self._fixos:
+            return self._dados
+        versao = self._versao_dados()
+        if self._dados is None or versao != self._versao:
+            self._dados = self.dowtrend.read_data('json')
+            self._versao = versao
+        return self._dados
+
+    def grafico1(self, ticker, arquivo=None, df=None, dpi=300):
         """
         Gera um gráfico do preço de fechamento ajustado para um ativo, com as últimas 255 observações.
 
         :param ticker: O símbolo do ativo (ex: 'AESB3', 'ITUB4', etc.).
+        :param arquivo: Se informado, o gráfico é salvo nesse arquivo de imagem em vez de exibido.
+        :param df: Série de preços já carregada; se `None`, é lida do histórico local.
+        :param dpi: Resolução do gráfico.
         """
-        # Obtém os últimos 255 valores de fechamento ajustado
-        df = self.dowtrend._obter_serie_temporal(ticker).tail(255)
+        # Obtém os últimos 255 valores de fechamento ajustado a partir do histórico local
+        if df is None:
+            df = self.dowtrend._obter_serie_temporal(ticker, atualizar=False).tail(255)
         
         # Cria a figura do gráfico
-        plt.figure(figsize=(14, 7), dpi=300)
+        plt.figure(figsize=(14, 7), dpi=dpi)
         self._plot_price(df, ticker)
         self._add_title_and_labels_g1(ticker)
         self._add_legend()
         self._add_annotation(df, ticker)
         
-        # Ajusta o layout e exibe o gráfico
+        # Ajusta o layout e exibe (ou salva) o gráfico
         plt.tight_layout()
-        plt.show()
+        self._finalizar(arquivo)
+
+    def grafico2(self, df, period, arquivo=None, dpi=300):
+        """
+        Gera um gráfico de barras com a variação do período de cada ativo.
 
-    def grafico2(self, df, period):
-        plt.figure(figsize=(14, 5), dpi=300)
+        :param df: O DataFrame com os ativos no índice e a coluna do período.
+        :param period: O nome do período (ex: 'semanal', 'mensal', etc.).
+        :param arquivo: Se informado, o gráfico é salvo nesse arquivo de imagem em vez de exibido.
+        :param dpi: Resolução do gráfico.
+        """
+        plt.figure(figsize=(14, 5), dpi=dpi)
         self._plot_bar(df, period)
         self._adjust_y_axis(df, period)
         self._add_title_and_labels_g2(period)
         self._add_legend()
         plt.tight_layout()
-        plt.show()
+        self._finalizar(arquivo)
+
+    def _finalizar(self, arquivo):
+        """
+        Exibe o gráfico atual ou, se um arquivo for informado, salva-o e libera a figura.
+
+        :param arquivo: Caminho do arquivo de imagem ou `None` para exibir o gráfico.
+        """
+        if arquivo is None:
+            plt.show()
+        else:
+            plt.savefig(arquivo)
+            plt.close()
+
+    def renderizar_galeria(self, dowtrend_data, period, diretorio, processos=None, dpi=100):
+        """
+        Renderiza em arquivos de imagem os gráficos de um resultado do `obter_maximos`: o gráfico de variação
+        do período (`grafico2`) e o gráfico de preço (`grafico1`) de cada ativo.
+
+        Os gráficos são desenhados com o backend headless (Agg) em vários processos. As séries de preço vêm do
+        histórico local e os resultados são lidos uma única vez. Um gráfico só é desenhado de novo se o hash
+        dos seus dados de entrada mudou desde a última renderização (registrado em `.galeria.json`).
+        Ativos sem histórico de preços são ignorados e a falha de um gráfico é registrada sem interromper os
+        demais; o manifesto é sempre gravado com os gráficos que foram renderizados.
+
+        :param dowtrend_data: DataFrame retornado pelo `obter_maximos`.
+        :param period: O nome do período (ex: 'semanal', 'mensal', etc.).
+        :param diretorio: Diretório onde as imagens serão gravadas.
+        :param processos: Quantidade de processos (padrão: quantidade de CPUs).
+        :param dpi: Resolução dos gráficos.
+        :return: Lista com os arquivos renderizados nesta chamada.
+        """
+        makedirs(diretorio, exist_ok=True)
+        dados = self._obter_dados()
+        tarefas = [{'tipo': 'variacao', 'df': dowtrend_data[[period]], 'period': period,
+                    'arquivo': join(diretorio, f'variacao_{period}.png')}]
+        for ticker in dowtrend_data.index:
+            df = self.dowtrend._obter_serie_temporal(ticker, atualizar=False).tail(255)
+            if df.empty or ticker not in dados:
+                logging.warning(f"Gráfico de preço de {ticker} ignorado: sem histórico de preços ou resultados salvos.")
+                continue
+            tarefas.append({'tipo': 'preco', 'ticker': ticker, 'df': df, 'dados': {ticker: dados[ticker]},
+                            'arquivo': join(diretorio, f'preco_{ticker}.png')})
+
+        manifesto_path = join(diretorio, '.galeria.json')
+        manifesto = {}
+        if exists(manifesto_path):
+            with open(manifesto_path, 'r') as json_file:
+                manifesto = json.load(json_file)
+
+        pendentes = []
+        for tarefa in tarefas:
+            tarefa.update({'type_amostra': self.type_amostra, 'dpi': dpi})
+            tarefa['hash'] = sha256((tarefa['df'].to_csv() + json.dumps(tarefa.get('dados'), sort_keys=True)
+                                     + f"{tarefa['tipo']}|{self.type_amostra}|{dpi}").encode()).hexdigest()
+            if manifesto.get(tarefa['arquivo']) != tarefa['hash'] or not exists(tarefa['arquivo']):
+                pendentes.append(tarefa)
+
+        with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo) as executor:
+            arquivos = list(executor.map(_renderizar, pendentes))
+
+        # Apenas os gráficos renderizados entram no manifesto; os que falharam são tentados de novo na próxima chamada
+        renderizados = [arquivo for arquivo in arquivos if arquivo is not None]
+        manifesto.update({tarefa['arquivo']: tarefa['hash'] for tarefa, arquivo in zip(pendentes, arquivos) if arquivo is not None})
+        with open(manifesto_path + '.tmp', 'w') as json_file:
+            json.dump(manifesto, json_file, indent=4)
+        replace(manifesto_path + '.tmp', manifesto_path)
+        return renderizados
 
     def _plot_price(self, df, ticker):
         """
@@ -80,7 +224,7 @@ class Graficos:
         :param ticker: O símbolo do ativo.
         """
         plt.title(f'{ticker} - Preço de Fechamento Ajustado', fontsize=18, fontweight='bold', color='black', loc='center')
-        plt.suptitle(f'Amostra ({self.dowtrend.type_amostra})', fontsize=12, fontstyle='italic', color='grey')
+        plt.suptitle(f'Amostra ({self.type_amostra})', fontsize=12, fontstyle='italic', color='grey')
         plt.xlabel('Data', fontsize=14, fontweight='bold', color='black')
         plt.ylabel('Preço de Fechamento Ajustado (R$)', fontsize=14, fontweight='bold', color='black')
         plt.xticks(rotation=45, ha='right', fontsize=10, color='black')  
@@ -94,7 +238,7 @@ class Graficos:
         :param period: O nome do período (ex: 'Variação diária', 'Variação semanal', etc.)
         """
         plt.title(f'Variação {period}', fontsize=18, fontweight='bold', color='black', loc='center')
-        plt.suptitle(f'Amostra ({self.dowtrend.type_amostra})', fontsize=12, fontstyle='italic', color='grey')
+        plt.suptitle(f'Amostra ({self.type_amostra})', fontsize=12, fontstyle='italic', color='grey')
         plt.xlabel('Data', fontsize=14, fontweight='bold', color='black')
         plt.ylabel(f'Variação de {period} (%)', fontsize=14, fontweight='bold', color='black')
         plt.xticks(rotation=45, ha='right', fontsize=10, color='black')
@@ -119,7 +263,7 @@ class Graficos:
         max_price_date = df.index[-1]
 
         # Obtém informações adicionais (semanal, quinzenal, mensal, anual)
-        x = self.dowtrend.read_data('json')[ticker]
+        x = self._obter_dados()[ticker]
         other_infos = f'Semanal: {x["semanal"]}%\nQuinzenal: {x["quinzenal"]}%\nMensal: {x["mensal"]}%\nAnual: {x["anual"]}%'
 
         # Adiciona uma anotação no gráfico com a seta
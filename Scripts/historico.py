@@ -0,0 +1,402 @@
+from os import makedirs, replace
+from os.path import join, exists, dirname, abspath
+from typing import Optional, List, Dict, Callable
+
+from pandas import DataFrame, Series, MultiIndex, DatetimeIndex, read_parquet, concat
+from numpy import isclose
+
+try:
+    from .concorrencia import LimitadorTaxa, com_tentativas
+    from .metricas import Metricas
+    from .vivacidade import RegistroVivacidade
+except ImportError:
+    from concorrencia import LimitadorTaxa, com_tentativas
+    from metricas import Metricas
+    from vivacidade import RegistroVivacidade
+
+import logging
+
+DIRETORIO_HISTORICO = join(dirname(dirname(abspath(__file__))), 'data', 'historico')
+
+# Exceções do `yfinance` que indicam um símbolo sem cotações, se persistirem depois das novas tentativas
+ERROS_SEM_COTACOES = ('YFPricesMissingError', 'YFTzMissingError')
+
+def _serie_vazia() -> Series:
+    """
+    Retorna uma série de preços vazia, indexada por datas como as do `yfinance`.
+
+    :return: Série vazia com índice `DatetimeIndex`.
+    """
+    return Series(dtype=float, name='Adj Close', index=DatetimeIndex([]))
+
+def baixar_historico(simbolo: str, **kwargs) -> DataFrame:
+    """
+    Baixa o histórico de um símbolo com `yfinance.Ticker.history`.
+
+    Ao contrário do `yfinance.download`, que guarda os resultados em um dicionário global, pode ser
+    chamada por várias threads ao mesmo tempo. Retorna os mesmos preços do `download`, com as datas sem fuso.
+
+    As exceções do `yfinance` são repassadas, inclusive `YFPricesMissingError` e `YFTzMissingError`: o
+    `yfinance` também as lança quando a consulta do fuso falha por um erro de rede, por isso um símbolo só é
+    considerado sem cotações pelo `HistoricoPrecos` depois que as novas tentativas também falharem.
+
+    :param simbolo: Símbolo no Yahoo Finance (ex.: 'PETR4.SA').
+    :param kwargs: Parâmetros repassados ao `Ticker.history` (`period` ou `start`).
+    :return: DataFrame com a coluna `Adj Close`.
+    :raises Exception: Em falhas de rede, limite de requisições ou símbolos sem cotações, para que a chamada seja repetida.
+    """
+    # Importado apenas ao baixar, para que as consultas aos dados salvos não carreguem o `yfinance`
+    from yfinance import Ticker
+    dados = Ticker(simbolo).history(auto_adjust=False, raise_errors=True, **kwargs)
+    if not dados.empty:
+        dados.index = dados.index.tz_localize(None)
+    return dados
+
+def baixar_lote(simbolos: List[str], **kwargs) -> DataFrame:
+    """
+    Baixa o histórico de vários símbolos com uma única chamada ao `yfinance.download`.
+
+    Os preços são pedidos sem ajuste automático (`auto_adjust=False`), como em `baixar_historico`: nas versões
+    recentes do `yfinance` o padrão é ajustar os preços e a coluna `Adj Close` deixa de existir.
+
+    :param simbolos: Símbolos no Yahoo Finance (ex.: ['PETR4.SA', 'VALE3.SA']).
+    :param kwargs: Parâmetros repassados ao `yfinance.download` (`period` ou `start`).
+    :return: DataFrame com colunas MultiIndex (`Price`, `Ticker`).
+    """
+    from yfinance import download
+    return download(simbolos, progress=False, group_by='column', auto_adjust=False, **kwargs)
+
+class HistoricoPrecos:
+    """
+    Armazena localmente o histórico de preços ajustados de cada ticker, em arquivos parquet.
+
+    Cada ticker possui um arquivo `data/historico/<TICKER>.parquet` com a coluna `Adj Close`
+    indexada por data. Na primeira consulta o histórico completo (`period='max'`) é baixado;
+    nas seguintes apenas a cauda a partir do penúltimo pregão salvo é solicitada ao `yfinance`
+    e anexada ao arquivo, de modo que o custo de uma atualização é proporcional aos novos pregões.
+
+    O penúltimo pregão é usado como ponto de conferência: se o preço ajustado baixado agora for
+    diferente do salvo, houve um provento que reajustou toda a série e o histórico é baixado de novo.
+
+    Todas as requisições passam pelo limitador de taxa (quando configurado) e são repetidas com espera
+    exponencial em caso de falha transitória.
+
+    Com um registro de vivacidade (`vivacidade`), os tickers cujo histórico completo voltou vazio não são
+    consultados de novo até o fim da espera do registro; enquanto isso são tratados como séries vazias.
+
+    **Atributos:**
+    - `diretorio` (str): Diretório onde os arquivos parquet são gravados.
+    - `fonte` (Callable): Função que baixa o histórico de um símbolo (padrão: `baixar_historico`).
+    - `fonte_lote` (Callable): Função que baixa o histórico de vários símbolos (padrão: `baixar_lote`).
+    - `limitador` (Optional[LimitadorTaxa]): Limitador de requisições por segundo.
+    - `tentativas` (int): Quantidade máxima de tentativas por requisição.
+    - `espera_base` (float): Espera, em segundos, antes da primeira repetição; dobra a cada nova falha.
+    - `metricas` (Metricas): Métricas da execução (requisições, linhas baixadas e memória ocupada por elas).
+    - `vivacidade` (Optional[RegistroVivacidade]): Registro dos tickers sem cotações.
+
+    **Métodos:**
+    - `ler(self, ticker: str)`: Lê o histórico salvo de um ticker, sem acessar a rede.
+    - `atualizar(self, ticker: str)`: Baixa apenas os pregões que faltam e atualiza o arquivo do ticker.
+    - `atualizar_lote(self, tickers: List[str])`: Atualiza vários tickers com uma única requisição multi-símbolo.
+    - `obter(self, ticker: str, atualizar: bool = True)`: Retorna a série temporal no mesmo formato do `yfinance.download`.
+    """
+
+    def __init__(self, diretorio: str = DIRETORIO_HISTORICO, fonte: Callable[..., DataFrame] = baixar_historico,
+                 fonte_lote: Callable[..., DataFrame] = baixar_lote, limitador: Optional[LimitadorTaxa] = None,
+                 tentativas: int = 3, espera_base: float = 1.0, metricas: Optional[Metricas] = None,
+                 vivacidade: Optional[RegistroVivacidade] = None):
+        """
+        Inicializa o armazenamento de históricos.
+
+        :param diretorio: Diretório onde os arquivos parquet serão gravados.
+        :param fonte: Função `fonte(simbolo, **kwargs)` que baixa o histórico de um símbolo.
+        :param fonte_lote: Função `fonte_lote(simbolos, **kwargs)` que baixa o histórico de vários símbolos.
+        :param limitador: Limitador de requisições por segundo, compartilhado entre as threads.
+        :param tentativas: Quantidade máxima de tentativas por requisição.
+        :param espera_base: Espera, em segundos, antes da primeira repetição.
+        :param metricas: Métricas da execução (padrão: desligadas).
+        :param vivacidade: Registro dos tickers sem cotações (padrão: todos os tickers são sempre consultados).
+        """
+        self.diretorio = diretorio
+        self.fonte = fonte
+        self.fonte_lote = fonte_lote
+        self.limitador = limitador
+        self.tentativas = tentativas
+        self.espera_base = espera_base
+        self.metricas = metricas or Metricas(ativo=False)
+        self.vivacidade = vivacidade
+
+    def _requisitar(self, fonte: Callable[..., DataFrame], simbolos, **kwargs) -> DataFrame:
+        """
+        Executa uma requisição à fonte de preços respeitando o limitador e repetindo em caso de falha.
+
+        :param fonte: Função da fonte de preços (`fonte` ou `fonte_lote`).
+        :param simbolos: Símbolo ou lista de símbolos repassados à fonte.
+        :param kwargs: Parâmetros repassados à fonte (`period` ou `start`).
+        :return: DataFrame retornado pela fonte.
+        """
+        dados = com_tentativas(fonte, simbolos, tentativas=self.tentativas, espera_base=self.espera_base,
+                               limitador=self.limitador, **kwargs)
+        if self.metricas.ativo and dados is not None:
+            self.metricas.contar('requisicoes')
+            self.metricas.contar('linhas_baixadas', len(dados))
+            # O `yfinance` não expõe o tamanho da resposta HTTP; mede-se a memória ocupada pelos dados recebidos
+            self.metricas.contar('bytes_memoria', int(dados.memory_usage(index=True).sum()))
+        return dados
+
+    def _caminho(self, ticker: str) -> str:
+        """
+        Retorna o caminho do arquivo parquet de um ticker.
+
+        :param ticker: Código do ativo (ticker).
+        :return: Caminho do arquivo parquet.
+        """
+        return join(self.diretorio, f'{ticker}.parquet')
+
+    def _extrair_fechamento(self, dados: DataFrame) -> Series:
+        """
+        Extrai a coluna `Adj Close` do retorno da fonte de preços como uma série simples.
+
+        :param dados: DataFrame retornado pela fonte (colunas simples ou MultiIndex).
+        :return: Série de preços ajustados indexada por data.
+        """
+        if dados is None or dados.empty or 'Adj Close' not in dados.columns.get_level_values(0):
+            return _serie_vazia()
+        fechamento = dados['Adj Close']
+        if isinstance(fechamento, DataFrame):
+            fechamento = fechamento.iloc[:, 0]
+        return fechamento.rename('Adj Close')
+
+    def _baixar(self, ticker: str, **kwargs) -> Series:
+        """
+        Baixa os preços ajustados de um ticker pela fonte de preços.
+
+        :param ticker: Código do ativo (ticker).
+        :param kwargs: Parâmetros repassados à fonte (`period` ou `start`).
+        :return: Série de preços ajustados; vazia se o download falhar.
+        """
+        try:
+            serie = self._extrair_fechamento(self._requisitar(self.fonte, f'{ticker}.SA', **kwargs))
+        except Exception as e:
+            logging.error(f"Erro ao baixar dados para o ticker {ticker}: {e}")
+            # Apenas a falta de cotações confirmada em todas as tentativas conta para o registro de vivacidade;
+            # as demais falhas (rede, limite de requisições) são transitórias
+            if kwargs.get('period') == 'max' and type(e).__name__ in ERROS_SEM_COTACOES:
+                self._registrar_vivacidade(ticker, False)
+            return _serie_vazia()
+        if kwargs.get('period') == 'max':
+            self._registrar_vivacidade(ticker, not serie.empty)
+        return serie
+
+    def _registrar_vivacidade(self, ticker: str, possui_dados: bool) -> None:
+        """
+        Atualiza o registro de vivacidade com o resultado do download do histórico completo de um ticker.
+
+        :param ticker: Código do ativo (ticker).
+        :param possui_dados: Se o download retornou alguma cotação.
+        """
+        if self.vivacidade is None:
+            return
+        if possui_dados:
+            self.vivacidade.registrar_dados(ticker)
+        else:
+            self.vivacidade.registrar_vazio(ticker)
+
+    def _ignorar(self, ticker: str) -> bool:
+        """
+        Indica se o download do histórico completo de um ticker deve ser pulado pelo registro de vivacidade.
+
+        :param ticker: Código do ativo (ticker).
+        :return: `True` se o ticker está registrado sem cotações e ainda dentro da espera.
+        """
+        if self.vivacidade is None or not self.vivacidade.ignorar(ticker):
+            return False
+        logging.debug(f"Ticker {ticker} ignorado: sem cotações nas últimas tentativas.")
+        self.metricas.contar('tickers_ignorados')
+        return True
+
+    def _baixar_lote(self, tickers: List[str], **kwargs) -> Dict[str, Series]:
+        """
+        Baixa os preços ajustados de vários tickers em uma única requisição à fonte de preços.
+
+        Como o `yfinance` alinha todos os símbolos nas mesmas datas, os pregões sem cotação de cada
+        ticker são descartados, deixando cada série igual à obtida em um download individual.
+
+        :param tickers: Lista de códigos dos ativos.
+        :param kwargs: Parâmetros repassados à fonte (`period` ou `start`).
+        :return: Dicionário `{ticker: série de preços ajustados}` apenas com os tickers que retornaram dados.
+        """
+        if not tickers:
+            return {}
+        try:
+            dados = self._requisitar(self.fonte_lote, [f'{ticker}.SA' for ticker in tickers], **kwargs)
+        except Exception as e:
+            logging.error(f"Erro ao baixar dados para o lote de {len(tickers)} tickers: {e}")
+            return {}
+        series = {}
+        if dados is not None and not dados.empty and 'Adj Close' in dados.columns.get_level_values(0):
+            fechamento = dados['Adj Close']
+            if isinstance(fechamento, Series):
+                fechamento = fechamento.to_frame(f'{tickers[0]}.SA')
+            for ticker in tickers:
+                if f'{ticker}.SA' in fechamento.columns:
+                    serie = fechamento[f'{ticker}.SA'].dropna().rename('Adj Close')
+                    if not serie.empty:
+                        series[ticker] = serie
+        if kwargs.get('period') == 'max' and self.vivacidade is not None:
+            self._conferir_vivacidade_lote(tickers, series)
+        return series
+
+    def _conferir_vivacidade_lote(self, tickers: List[str], series: Dict[str, Series]) -> None:
+        """
+        Atualiza o registro de vivacidade com o resultado do download do histórico completo de um lote.
+
+        O `yfinance.download` não repassa as falhas de cada símbolo (inclusive as de rede), apenas os deixa sem
+        cotações. Por isso os tickers que voltaram com dados saem do registro, e cada ticker vazio é conferido
+        com um download individual, que distingue as falhas de rede da falta de cotações.
+
+        :param tickers: Tickers do lote.
+        :param series: Séries obtidas no download do lote; recebe as séries encontradas na conferência individual.
+        """
+        for ticker in tickers:
+            if ticker in series:
+                self._registrar_vivacidade(ticker, True)
+                continue
+            serie = self._baixar(ticker, period='max')
+            if not serie.empty:
+                series[ticker] = serie
+
+    def _gravar(self, ticker: str, serie: Series) -> None:
+        """
+        Grava a série de um ticker de forma atômica (arquivo temporário seguido de `replace`).
+
+        :param ticker: Código do ativo (ticker).
+        :param serie: Série de preços ajustados a ser gravada.
+        """
+        makedirs(self.diretorio, exist_ok=True)
+        caminho = self._caminho(ticker)
+        serie.to_frame('Adj Close').to_parquet(caminho + '.tmp')
+        replace(caminho + '.tmp', caminho)
+
+    def ler(self, ticker: str) -> Optional[Series]:
+        """
+        Lê o histórico salvo de um ticker, sem acessar a rede.
+
+        :param ticker: Código do ativo (ticker).
+        :return: Série de preços ajustados ou `None` se o ticker ainda não foi armazenado.
+        """
+        caminho = self._caminho(ticker)
+        if not exists(caminho):
+            return None
+        try:
+            return read_parquet(caminho)['Adj Close']
+        except Exception as e:
+            logging.error(f"Erro ao ler o histórico do ticker {ticker}: {e}")
+            return None
+
+    def atualizar(self, ticker: str) -> Series:
+        """
+        Atualiza o histórico de um ticker baixando apenas os pregões que faltam.
+
+        :param ticker: Código do ativo (ticker).
+        :return: Série de preços ajustados atualizada.
+        """
+        salvo = self.ler(ticker)
+        if salvo is None and self._ignorar(ticker):
+            return _serie_vazia()
+        if salvo is None or len(salvo) < 2:
+            serie = self._baixar(ticker, period='max')
+            if not serie.empty:
+                self._gravar(ticker, serie)
+            return serie
+
+        cauda = self._baixar(ticker, start=salvo.index[-2].strftime('%Y-%m-%d'))
+        if cauda.empty:
+            return salvo
+
+        serie = self._mesclar(ticker, salvo, cauda)
+        if serie is None:
+            serie = self._baixar(ticker, period='max')
+
+        if serie.empty:
+            return salvo
+        self._gravar(ticker, serie)
+        return serie
+
+    def _mesclar(self, ticker: str, salvo: Series, cauda: Series) -> Optional[Series]:
+        """
+        Anexa a cauda baixada ao histórico salvo, conferindo o penúltimo pregão salvo.
+
+        :param ticker: Código do ativo (ticker).
+        :param salvo: Série de preços ajustados já armazenada.
+        :param cauda: Série baixada a partir do penúltimo pregão salvo.
+        :return: Série atualizada, ou `None` se os preços ajustados foram reajustados e o histórico
+            completo precisa ser baixado novamente.
+        """
+        conferencia = salvo.index[-2]
+        if conferencia not in cauda.index or not isclose(cauda.loc[conferencia], salvo.loc[conferencia]):
+            logging.info(f"Preços ajustados de {ticker} foram reajustados; baixando o histórico completo.")
+            return None
+        # O último pregão salvo pode ter sido gravado durante o pregão, por isso é substituído pela cauda
+        return concat([salvo[salvo.index < salvo.index[-1]], cauda[cauda.index >= salvo.index[-1]]])
+
+    def atualizar_lote(self, tickers: List[str]) -> Dict[str, Series]:
+        """
+        Atualiza o histórico de vários tickers com requisições multi-símbolo ao `yfinance`.
+
+        Os tickers já armazenados são agrupados pelo penúltimo pregão salvo e cada grupo é atualizado com uma
+        única requisição a partir dessa data; assim um ticker desatualizado (ou deslistado) não faz o lote
+        inteiro baixar de novo os pregões que os demais já têm. Os tickers novos (ou reajustados) são baixados
+        juntos com `period='max'`.
+
+        :param tickers: Lista de códigos dos ativos.
+        :return: Dicionário `{ticker: série de preços ajustados}`; tickers sem dados recebem uma série vazia.
+        """
+        salvos = {ticker: self.ler(ticker) for ticker in tickers}
+        completos = [ticker for ticker, salvo in salvos.items() if salvo is None or len(salvo) < 2]
+        existentes = [ticker for ticker in salvos if ticker not in completos]
+        resultado = {}
+
+        grupos: Dict[str, List[str]] = {}
+        for ticker in existentes:
+            grupos.setdefault(salvos[ticker].index[-2].strftime('%Y-%m-%d'), []).append(ticker)
+        for inicio, grupo in grupos.items():
+            caudas = self._baixar_lote(grupo, start=inicio)
+            for ticker in grupo:
+                if ticker not in caudas:
+                    resultado[ticker] = salvos[ticker]
+                    continue
+                serie = self._mesclar(ticker, salvos[ticker], caudas[ticker])
+                if serie is None:
+                    completos.append(ticker)
+                else:
+                    self._gravar(ticker, serie)
+                    resultado[ticker] = serie
+
+        ignorados = [ticker for ticker in completos if salvos[ticker] is None and self._ignorar(ticker)]
+        baixados = self._baixar_lote([ticker for ticker in completos if ticker not in ignorados], period='max')
+        for ticker in completos:
+            if ticker in baixados:
+                self._gravar(ticker, baixados[ticker])
+                resultado[ticker] = baixados[ticker]
+            elif salvos[ticker] is not None:
+                resultado[ticker] = salvos[ticker]
+            else:
+                resultado[ticker] = _serie_vazia()
+        return resultado
+
+    def obter(self, ticker: str, atualizar: bool = True) -> DataFrame:
+        """
+        Retorna a série temporal de um ticker no mesmo formato do `yfinance.download(...)[['Adj Close']]`.
+
+        :param ticker: Código do ativo (ticker).
+        :param atualizar: Se `True`, busca os pregões que faltam antes de retornar; se `False`, usa o
+            histórico salvo e só acessa a rede quando o ticker ainda não foi armazenado.
+        :return: DataFrame com a coluna `('Adj Close', '<TICKER>.SA')`.
+        """
+        serie = None if atualizar else self.ler(ticker)
+        if serie is None:
+            serie = self.atualizar(ticker)
+        df = serie.to_frame()
+        df.columns = MultiIndex.from_tuples([('Adj Close', f'{ticker}.SA')], names=['Price', 'Ticker'])
+        return df
@@ -0,0 +1,197 @@
+from datetime import date
+from math import isnan, copysign
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pandas import Series, DatetimeIndex, Timestamp
+from numpy import nan, float64
+
+try:
+    from .retornos import PERIODOS
+except ImportError:
+    from retornos import PERIODOS
+
+# Tamanho, em dias, da janela da regra '15D'
+_JANELA_QUINZENAL = 15
+
+def _inicio_periodo(periodo: str, dia: date, origem: int) -> int:
+    """
+    Retorna o primeiro dia (ordinal) do período que contém `dia`, com os mesmos intervalos do `resample`.
+
+    Semanas vão de segunda a domingo ('W' termina no domingo); meses, trimestres e anos seguem o calendário;
+    as janelas de 15 dias são contadas a partir do primeiro pregão da série (`origem`).
+
+    :param periodo: Nome do período (ex.: 'mensal').
+    :param dia: Data do pregão.
+    :param origem: Primeiro pregão da série (ordinal), usado pela regra '15D'.
+    :return: Ordinal do primeiro dia do período.
+    """
+    if periodo == 'semanal':
+        return dia.toordinal() - dia.weekday()
+    if periodo == 'quinzenal':
+        return origem + (dia.toordinal() - origem) // _JANELA_QUINZENAL * _JANELA_QUINZENAL
+    if periodo == 'mensal':
+        return date(dia.year, dia.month, 1).toordinal()
+    if periodo == 'trimestral':
+        return date(dia.year, (dia.month - 1) // 3 * 3 + 1, 1).toordinal()
+    return date(dia.year, 1, 1).toordinal()
+
+def _arredondar(atual: float, referencia: float) -> float:
+    """
+    Calcula o retorno percentual arredondado como em `calcular_retornos_serie` (`nan` sem referência).
+
+    Usa aritmética de `float` do Python, bem mais rápida que a dos escalares do numpy, reproduzindo o
+    `round(float64, 2)` do numpy: multiplica por 100, arredonda para o par mais próximo e divide por 100.
+    """
+    if isnan(referencia) or referencia == 0:
+        retorno = (float64(atual) / float64(referencia) - 1) * 100
+        return nan if isnan(retorno) else float(round(retorno, 2))
+    centesimos = (atual / referencia - 1) * 100 * 100
+    return round(centesimos) / 100 or copysign(0.0, centesimos)
+
+class _EstadoTicker:
+    """
+    Estado de um ticker: último pregão e preço, e, para cada período, o início do período corrente e o
+    preço de referência (último preço antes desse início).
+    """
+
+    __slots__ = ('origem', 'dia', 'preco', 'inicios', 'referencias', 'retornos')
+
+    def __init__(self, origem: int, dia: int, preco: float, inicios: Dict[str, int], referencias: Dict[str, float]):
+        self.origem = origem
+        self.dia = dia
+        self.preco = preco
+        self.inicios = inicios
+        self.referencias = referencias
+        self.retornos = {periodo: _arredondar(preco, referencias[periodo]) for periodo in PERIODOS}
+
+class RetornosIncrementais:
+    """
+    Mantém os retornos de cada ticker atualizados a cada novo pregão (ou cotação intradiária) em tempo constante.
+
+    Para cada ticker e período guarda apenas o preço de referência (último fechamento antes do início do
+    período corrente) e o início desse período. Ao chegar um novo preço:
+
+    - no mesmo dia do último pregão (cotação intradiária ou correção), apenas o preço atual é substituído;
+    - em um dia novo, os períodos que viraram passam a usar o último preço conhecido como referência.
+
+    Os retornos são iguais aos de `calcular_retornos_serie` aplicada ao histórico completo com o novo pregão.
+    Se o histórico for reajustado por proventos (ver `HistoricoPrecos`), o ticker deve ser recarregado com `carregar`.
+
+    **Métodos:**
+    - `carregar(self, ticker: str, serie: Series)`: Inicializa o estado de um ticker a partir do seu histórico.
+    - `de_historico(cls, historico, tickers)`: Cria o estado de vários tickers a partir do histórico local.
+    - `aplicar(self, ticker: str, data, preco: float)`: Aplica um novo preço e retorna os retornos se algum mudou.
+    - `aplicar_lote(self, cotacoes)`: Aplica vários preços e retorna apenas as linhas alteradas.
+    - `resultados(self)`: Retornos atuais de todos os tickers, no formato do `Dowtrend.save_data`.
+    """
+
+    def __init__(self):
+        """
+        Inicializa o estado vazio; os tickers são adicionados com `carregar` ou no primeiro `aplicar`.
+        """
+        self._estados: Dict[str, _EstadoTicker] = {}
+
+    def carregar(self, ticker: str, serie: Series) -> Dict[str, float]:
+        """
+        Inicializa o estado de um ticker a partir do seu histórico de preços.
+
+        O preço de referência de cada período é localizado com `searchsorted`, sem percorrer o histórico.
+
+        :param ticker: Código do ativo (ticker).
+        :param serie: Série de preços ajustados indexada por data.
+        :return: Retornos atuais do ticker.
+        """
+        serie = serie.dropna()
+        if serie.empty:
+            self._estados.pop(ticker, None)
+            return {periodo: nan for periodo in PERIODOS}
+        datas = DatetimeIndex(serie.index)
+        valores = serie.to_numpy(dtype=float64)
+        origem, ultimo = datas[0].toordinal(), datas[-1]
+        inicios, referencias = {}, {}
+        for periodo in PERIODOS:
+            inicios[periodo] = _inicio_periodo(periodo, ultimo, origem)
+            posicao = datas.searchsorted(Timestamp(date.fromordinal(inicios[periodo])), side='left') - 1
+            referencias[periodo] = valores[posicao] if posicao >= 0 else nan
+        estado = _EstadoTicker(origem, ultimo.toordinal(), float(valores[-1]), inicios, {p: float(v) for p, v in referencias.items()})
+        self._estados[ticker] = estado
+        return dict(estado.retornos)
+
+    @classmethod
+    def de_historico(cls, historico, tickers: Iterable[str]) -> 'RetornosIncrementais':
+        """
+        Cria o estado de vários tickers a partir do histórico local (`HistoricoPrecos.ler`), sem acessar a rede.
+
+        :param historico: Instância de `HistoricoPrecos`.
+        :param tickers: Códigos dos ativos.
+        :return: Instância com os tickers que possuem histórico salvo.
+        """
+        incrementais = cls()
+        for ticker in tickers:
+            serie = historico.ler(ticker)
+            if serie is not None:
+                incrementais.carregar(ticker, serie)
+        return incrementais
+
+    def aplicar(self, ticker: str, data, preco: float) -> Optional[Dict[str, float]]:
+        """
+        Aplica um novo preço de um ticker e atualiza os retornos de todos os períodos em tempo constante.
+
+        :param ticker: Código do ativo (ticker).
+        :param data: Data (ou data e horário) da cotação; cotações anteriores ao último pregão são ignoradas.
+        :param preco: Preço ajustado; valores nulos são ignorados.
+        :return: Retornos do ticker se algum deles mudou, ou `None` caso contrário.
+        """
+        if preco is None or isnan(preco):
+            return None
+        dia = data.toordinal()
+        estado = self._estados.get(ticker)
+        preco = float(preco)
+        if estado is None:
+            estado = _EstadoTicker(dia, dia, preco, {periodo: _inicio_periodo(periodo, data, dia) for periodo in PERIODOS},
+                                   {periodo: nan for periodo in PERIODOS})
+            self._estados[ticker] = estado
+            return None
+        if dia < estado.dia:
+            return None
+        if dia > estado.dia:
+            for periodo in PERIODOS:
+                inicio = _inicio_periodo(periodo, data, estado.origem)
+                if inicio != estado.inicios[periodo]:
+                    estado.inicios[periodo] = inicio
+                    estado.referencias[periodo] = estado.preco
+            estado.dia = dia
+        estado.preco = preco
+
+        retornos = {periodo: _arredondar(preco, estado.referencias[periodo]) for periodo in PERIODOS}
+        # `nan` é diferente de si mesmo, por isso os valores são comparados pela representação
+        if repr(retornos) == repr(estado.retornos):
+            return None
+        estado.retornos = retornos
+        return dict(retornos)
+
+    def aplicar_lote(self, cotacoes: Iterable[Tuple[str, object, float]]) -> Dict[str, Dict[str, float]]:
+        """
+        Aplica vários preços (ex.: o fechamento do dia de todo o universo) e retorna apenas as linhas alteradas.
+
+        :param cotacoes: Tuplas `(ticker, data, preco)`, em ordem cronológica para cada ticker.
+        :return: Dicionário `{ticker: {periodo: valor}}` apenas com os tickers cujos retornos mudaram.
+        """
+        alterados = {}
+        for ticker, data, preco in cotacoes:
+            retornos = self.aplicar(ticker, data, preco)
+            if retornos is not None:
+                alterados[ticker] = retornos
+        return alterados
+
+    def resultados(self, tickers: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Retorna os retornos atuais, no formato do `Dowtrend.save_data`.
+
+        :param tickers: Tickers desejados (na ordem da amostra); tickers sem estado recebem `nan`.
+            Se `None`, todos os tickers carregados.
+        :return: Dicionário `{ticker: {periodo: valor}}`.
+        """
+        tickers = list(self._estados) if tickers is None else tickers
+        return {ticker: dict(self._estados[ticker].retornos) if ticker in self._estados else {periodo: nan for periodo in PERIODOS}
+                for ticker in tickers}
@@ -0,0 +1,185 @@
+import json
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from os import makedirs, replace
+from os.path import join, dirname, abspath
+from threading import Lock
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+DIRETORIO_METRICAS = join(dirname(dirname(abspath(__file__))), 'data', 'metricas')
+
+# Contexto reaproveitado por todas as etapas quando as métricas estão desligadas
+_NULO = nullcontext()
+
+class Metricas:
+    """
+    Métricas de uma execução: tempo gasto em cada etapa, contadores e tempo de cada ticker.
+
+    As etapas são medidas com `with metricas.etapa('nome', ticker):`; o tempo é somado ao total da etapa e,
+    quando o ticker é informado, ao tempo daquele ticker, permitindo listar os tickers mais lentos.
+    Os contadores (`contar`) registram quantidades como requisições e linhas baixadas, erros e séries vazias.
+
+    Desligada (`ativo=False`), cada chamada retorna imediatamente sem medir nada, de modo que a
+    instrumentação pode ficar sempre no código. Pode ser usada por várias threads ao mesmo tempo.
+
+    **Atributos:**
+    - `ativo` (bool): Se `False`, nenhuma métrica é registrada.
+    - `rotulos` (Dict[str, str]): Rótulos incluídos em todas as métricas exportadas (ex.: `{'amostra': 'indice:IDIV'}`).
+
+    **Métodos:**
+    - `etapa(self, nome: str, ticker: Optional[str] = None)`: Mede o tempo de um bloco de código.
+    - `contar(self, nome: str, quantidade: float = 1)`: Incrementa um contador.
+    - `mais_lentos(self, n: int = 10)`: Lista os tickers que consumiram mais tempo.
+    - `resumo(self, n: int = 10)`: Resumo da execução em um dicionário serializável.
+    - `prometheus(self, n: int = 10)`: Métricas no formato de texto do Prometheus.
+    - `exportar(self, nome: str, diretorio: str = DIRETORIO_METRICAS, n: int = 10)`: Grava o resumo em JSON e as métricas do Prometheus.
+    """
+
+    def __init__(self, ativo: bool = True, rotulos: Optional[Dict[str, str]] = None):
+        """
+        Inicializa as métricas da execução.
+
+        :param ativo: Se `False`, nenhuma métrica é registrada.
+        :param rotulos: Rótulos incluídos em todas as métricas exportadas.
+        """
+        self.ativo = ativo
+        self.rotulos = rotulos or {}
+        self._inicio = perf_counter()
+        self._etapas: Dict[str, List[float]] = {}
+        self._contadores: Dict[str, float] = {}
+        self._tickers: Dict[str, Dict[str, float]] = {}
+        self._trava = Lock()
+
+    def etapa(self, nome: str, ticker: Optional[str] = None):
+        """
+        Mede o tempo de um bloco de código (`with metricas.etapa('serie_temporal', 'PETR4'):`).
+
+        :param nome: Nome da etapa.
+        :param ticker: Ticker ao qual o tempo é atribuído, se houver.
+        :return: Gerenciador de contexto.
+        """
+        if not self.ativo:
+            return _NULO
+        return self._medir(nome, ticker)
+
+    @contextmanager
+    def _medir(self, nome: str, ticker: Optional[str]):
+        """
+        Soma a duração do bloco ao total da etapa e ao tempo do ticker.
+        """
+        inicio = perf_counter()
+        try:
+            yield
+        finally:
+            duracao = perf_counter() - inicio
+            with self._trava:
+                etapa = self._etapas.setdefault(nome, [0.0, 0])
+                etapa[0] += duracao
+                etapa[1] += 1
+                if ticker is not None:
+                    tempos = self._tickers.setdefault(ticker, {})
+                    tempos[nome] = tempos.get(nome, 0.0) + duracao
+
+    def contar(self, nome: str, quantidade: float = 1) -> None:
+        """
+        Incrementa um contador (ex.: 'erros', 'series_vazias', 'linhas_baixadas', 'bytes_memoria').
+
+        :param nome: Nome do contador.
+        :param quantidade: Valor somado ao contador.
+        """
+        if not self.ativo:
+            return
+        with self._trava:
+            self._contadores[nome] = self._contadores.get(nome, 0) + quantidade
+
+    def mais_lentos(self, n: int = 10) -> List[Tuple[str, float, Dict[str, float]]]:
+        """
+        Lista os tickers que consumiram mais tempo somando todas as etapas.
+
+        :param n: Quantidade de tickers.
+        :return: Lista de tuplas `(ticker, segundos, {etapa: segundos})`, do mais lento ao mais rápido.
+        """
+        with self._trava:
+            tempos = [(ticker, sum(etapas.values()), dict(etapas)) for ticker, etapas in self._tickers.items()]
+        return sorted(tempos, key=lambda item: item[1], reverse=True)[:n]
+
+    def resumo(self, n: int = 10) -> Dict:
+        """
+        Resumo da execução em um dicionário serializável em JSON.
+
+        :param n: Quantidade de tickers do relatório de tickers mais lentos.
+        :return: Dicionário com a duração da execução, as etapas, os contadores e os tickers mais lentos.
+        """
+        with self._trava:
+            etapas = {nome: {'segundos': segundos, 'chamadas': chamadas} for nome, (segundos, chamadas) in self._etapas.items()}
+            contadores = dict(self._contadores)
+        return {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'rotulos': self.rotulos,
+            'duracao_segundos': perf_counter() - self._inicio,
+            'etapas': etapas,
+            'contadores': contadores,
+            'tickers_mais_lentos': [{'ticker': ticker, 'segundos': segundos, 'etapas': detalhes}
+                                    for ticker, segundos, detalhes in self.mais_lentos(n)]
+        }
+
+    def _rotulos(self, **extras: str) -> str:
+        """
+        Formata os rótulos de uma métrica do Prometheus (ex.: `{amostra="indice:IDIV",etapa="save_data"}`).
+        """
+        rotulos = {**self.rotulos, **extras}
+        if not rotulos:
+            return ''
+        valores = ','.join(f'{chave}="{str(valor).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                           for chave, valor in rotulos.items())
+        return '{' + valores + '}'
+
+    def prometheus(self, n: int = 10) -> str:
+        """
+        Métricas no formato de texto do Prometheus, para o textfile collector do node_exporter.
+
+        Cada execução começa do zero e o arquivo é reescrito ao final, por isso todos os valores são exportados
+        como `gauge` (valores da última execução), e não como `counter`.
+
+        :param n: Quantidade de tickers exportados em `dowtrend_ticker_segundos`.
+        :return: Texto com as métricas.
+        """
+        resumo = self.resumo(n)
+        linhas = [
+            '# HELP dowtrend_execucao_segundos Duração da execução.',
+            '# TYPE dowtrend_execucao_segundos gauge',
+            f"dowtrend_execucao_segundos{self._rotulos()} {resumo['duracao_segundos']}",
+            '# HELP dowtrend_etapa_segundos Tempo gasto em cada etapa na última execução.',
+            '# TYPE dowtrend_etapa_segundos gauge'
+        ]
+        linhas += [f"dowtrend_etapa_segundos{self._rotulos(etapa=nome)} {etapa['segundos']}" for nome, etapa in resumo['etapas'].items()]
+        linhas += ['# HELP dowtrend_etapa_chamadas Quantidade de execuções de cada etapa na última execução.',
+                   '# TYPE dowtrend_etapa_chamadas gauge']
+        linhas += [f"dowtrend_etapa_chamadas{self._rotulos(etapa=nome)} {etapa['chamadas']}" for nome, etapa in resumo['etapas'].items()]
+        for nome, valor in resumo['contadores'].items():
+            linhas += [f'# TYPE dowtrend_{nome} gauge', f'dowtrend_{nome}{self._rotulos()} {valor}']
+        linhas += ['# HELP dowtrend_ticker_segundos Tempo total dos tickers mais lentos.',
+                   '# TYPE dowtrend_ticker_segundos gauge']
+        linhas += [f"dowtrend_ticker_segundos{self._rotulos(ticker=item['ticker'])} {item['segundos']}" for item in resumo['tickers_mais_lentos']]
+        return '\n'.join(linhas) + '\n'
+
+    def exportar(self, nome: str, diretorio: str = DIRETORIO_METRICAS, n: int = 10) -> Tuple[str, str]:
+        """
+        Grava o resumo da execução em `<nome>.json` e as métricas do Prometheus em `<nome>.prom`.
+
+        :param nome: Nome dos arquivos (ex.: 'indice_IDIV').
+        :param diretorio: Diretório dos arquivos (padrão: `data/metricas`).
+        :param n: Quantidade de tickers do relatório de tickers mais lentos.
+        :return: Caminhos dos arquivos JSON e Prometheus.
+        """
+        makedirs(diretorio, exist_ok=True)
+        caminho_json, caminho_prom = join(diretorio, f'{nome}.json'), join(diretorio, f'{nome}.prom')
+        with open(caminho_json + '.tmp', 'w') as json_file:
+            json.dump(self.resumo(n), json_file, indent=4)
+        replace(caminho_json + '.tmp', caminho_json)
+        # O textfile collector lê qualquer `.prom`, por isso o arquivo temporário usa outra extensão
+        with open(caminho_prom + '.tmp', 'w') as prom_file:
+            prom_file.write(self.prometheus(n))
+        replace(caminho_prom + '.tmp', caminho_prom)
+        return caminho_json, caminho_prom
@@ -0,0 +1,120 @@
+from os.path import join, dirname
+from typing import List, Dict, Optional, Tuple
+
+try:
+    from .dowtrend import Dowtrend
+    from .diario import Diario
+except ImportError:
+    from dowtrend import Dowtrend
+    from diario import Diario
+
+import logging
+
+class PlanejadorExecucao:
+    """
+    Planeja e executa o processamento conjunto de várias amostras.
+
+    Índices como IBEP, IVBX, MLCX e IDIV compartilham boa parte dos tickers (PETR4, ITUB4, VALE3, ...),
+    e todos eles também fazem parte das empresas listadas. Em vez de executar `Dowtrend.loop()` para cada
+    amostra, o planejador resolve a composição de todas, processa cada ticker da união uma única vez e
+    distribui os resultados para o arquivo JSON de cada amostra.
+
+    **Atributos:**
+    - `amostras` (List[Dowtrend]): Uma instância de `Dowtrend` para cada amostra planejada.
+    - `lote` (Optional[int]): Tamanho dos lotes repassado a `Dowtrend.processar_tickers`.
+    - `concorrencia` (Optional[int]): Quantidade de threads repassada a `Dowtrend.processar_tickers`.
+    - `metricas` (bool): Se `True`, o resumo das métricas do processamento é gravado em `data/metricas/planejador.json` e `.prom`.
+
+    **Métodos:**
+    - `planejar(self)`: Resolve a composição das amostras e retorna a união dos tickers e o relatório do plano.
+    - `executar(self, retomar: bool = False, reverificar: bool = False)`: Processa cada ticker da união uma única vez e salva os resultados de todas as amostras.
+    """
+
+    def __init__(self, amostras: List[str], lote: Optional[int] = None, concorrencia: Optional[int] = None,
+                 metricas: bool = False):
+        """
+        Inicializa o planejador com as amostras a serem processadas.
+
+        :param amostras: Tipos de amostra, como 'empresas_listadas' ou 'indice:IDIV'.
+        :param lote: Tamanho dos lotes de download (modo em lotes).
+        :param concorrencia: Quantidade de downloads simultâneos (modo concorrente).
+        :param metricas: Se `True`, mede o processamento como `Dowtrend(..., metricas=True)` e grava o resumo
+            ao final do `executar()`.
+        """
+        self.amostras = [Dowtrend(type_amostra=type_amostra, metricas=metricas) for type_amostra in amostras]
+        self.lote = lote
+        self.concorrencia = concorrencia
+        self.metricas = metricas
+
+    def planejar(self) -> Tuple[List[str], Dict[str, int]]:
+        """
+        Resolve a composição de cada amostra e calcula a união dos tickers.
+
+        Amostras cuja composição não pode ser obtida são descartadas do plano, com um registro de erro.
+
+        :return: Tupla com a lista de tickers únicos (na ordem em que aparecem) e o relatório do plano:
+            quantidade de amostras, total de tickers somando todas as amostras, tickers únicos e
+            processamentos evitados.
+        """
+        unicos = {}
+        total = 0
+        for dowtrend in list(self.amostras):
+            try:
+                amostra = dowtrend._obter_amostra()
+            except Exception as e:
+                logging.error(f"Erro ao obter a amostra {dowtrend.type_amostra}: {e}")
+                self.amostras.remove(dowtrend)
+                continue
+            total += len(amostra)
+            unicos.update(dict.fromkeys(amostra))
+
+        relatorio = {
+            'amostras': len(self.amostras),
+            'tickers_total': total,
+            'tickers_unicos': len(unicos),
+            'tickers_evitados': total - len(unicos)
+        }
+        return list(unicos), relatorio
+
+    def executar(self, retomar: bool = False, reverificar: bool = False) -> Dict[str, int]:
+        """
+        Processa cada ticker da união uma única vez e salva os resultados de todas as amostras.
+
+        Os resultados são registrados em um diário (`data/planejador.diario.jsonl`) à medida que ficam prontos,
+        e o diário só é apagado depois que os arquivos JSON de todas as amostras foram salvos. Com as métricas
+        ligadas, o resumo do processamento é gravado em `data/metricas/planejador.json` e `.prom`.
+
+        :param retomar: Se `True`, retoma uma execução interrompida, pulando os tickers já presentes no diário.
+        :param reverificar: Se `True`, consulta novamente os tickers presentes no registro de vivacidade.
+        :return: Relatório do plano (ver `planejar`).
+        """
+        tickers, relatorio = self.planejar()
+        logging.info(
+            f"Plano: {relatorio['amostras']} amostras, {relatorio['tickers_total']} tickers no total, "
+            f"{relatorio['tickers_unicos']} únicos ({relatorio['tickers_evitados']} processamentos evitados)."
+        )
+        if not self.amostras:
+            return relatorio
+
+        diario = Diario(join(dirname(self.amostras[0].file_path), 'planejador.diario.jsonl'))
+        resultados = diario.ler() if retomar else {}
+        if not retomar:
+            diario.remover()
+
+        pendentes = [ticker for ticker in tickers if ticker not in resultados]
+        # A primeira amostra processa a união de todas; as suas métricas cobrem a execução inteira
+        processador = self.amostras[0]
+        processador.metricas.rotulos['amostra'] = 'planejador'
+        if reverificar:
+            processador.vivacidade.forcar(tickers)
+        try:
+            resultados.update(processador.processar_tickers(pendentes, lote=self.lote, concorrencia=self.concorrencia, diario=diario))
+        finally:
+            processador.vivacidade.salvar()
+
+        salvos = [dowtrend.save_data({ticker: resultados[ticker] for ticker in dowtrend._obter_amostra()}) for dowtrend in self.amostras]
+        if all(salvos):
+            diario.remover()
+        if self.metricas:
+            processador.exportar_metricas('planejador')
+        return relatorio
@@ -0,0 +1,176 @@
+from heapq import merge
+from os import listdir
+from os.path import join, dirname, abspath, exists, getmtime
+from typing import Dict, List, Optional, Iterator, Tuple
+
+from pandas import DataFrame
+
+try:
+    from .dowtrend import Dowtrend
+    from .snapshots import ArmazemResultados
+except ImportError:
+    from dowtrend import Dowtrend
+    from snapshots import ArmazemResultados
+
+DIRETORIO_RESULTADOS = join(dirname(dirname(abspath(__file__))), 'data', 'resultados')
+
+class _RankingAmostra:
+    """
+    Ranking de uma amostra mantido em memória: valores do snapshot e ordem dos tickers por período.
+    """
+
+    def __init__(self, valores: DataFrame, ranking: DataFrame, versao: tuple):
+        """
+        :param valores: Snapshot da amostra, com os tickers no índice e uma coluna por período.
+        :param ranking: Ranking gravado pelo `ArmazemResultados`.
+        :param versao: Data e horário de modificação do snapshot, usados para detectar snapshots novos.
+        """
+        self.valores = valores
+        self.versao = versao
+        self.ordem = {periodo: list(ranking[periodo].dropna()) for periodo in ranking.columns}
+        self.validos = {periodo: int(valores[periodo].notna().sum()) for periodo in ranking.columns}
+        self.posicoes = {periodo: {ticker: i for i, ticker in enumerate(ordem)} for periodo, ordem in self.ordem.items()}
+
+    def ordenados(self, periodo: str, tipo: str) -> List[str]:
+        """
+        Retorna os tickers na ordem do critério, com os tickers sem valor ao final.
+        """
+        ordem, validos = self.ordem[periodo], self.validos[periodo]
+        if Dowtrend.CRITERIOS[tipo]:
+            return ordem
+        return ordem[:validos][::-1] + ordem[validos:]
+
+    def chaves(self, periodo: str, tipo: str, amostra: str) -> Iterator[Tuple[float, str, str]]:
+        """
+        Percorre os tickers com valor na ordem do critério como tuplas `(chave, ticker, amostra)`,
+        em que a chave cresce ao longo do ranking (usada para intercalar amostras com `heapq.merge`).
+        """
+        sinal = 1 if Dowtrend.CRITERIOS[tipo] else -1
+        valores = self.valores[periodo]
+        for ticker in self.ordenados(periodo, tipo)[:self.validos[periodo]]:
+            yield sinal * valores[ticker], ticker, amostra
+
+class IndiceRankings:
+    """
+    Índice de rankings em memória para consultas de top-K sobre todas as amostras e períodos.
+
+    Os rankings são calculados uma única vez, quando o `Dowtrend` salva os resultados (ver
+    `ArmazemResultados`), e carregados sob demanda. A cada consulta o índice confere se um snapshot
+    mais novo foi gravado para a amostra e, nesse caso, recarrega apenas aquela amostra.
+
+    **Atributos:**
+    - `diretorio` (str): Diretório com os snapshots de todas as amostras (`data/resultados`).
+
+    **Métodos:**
+    - `amostras(self)`: Lista as amostras que possuem snapshots.
+    - `top(self, amostra: str, periodo: str, tipo: str, k: int = 10)`: Top-K de uma amostra, no formato do `obter_maximos`.
+    - `top_geral(self, periodo: str, tipo: str, k: int = 10, amostras=None)`: Top-K considerando várias amostras ao mesmo tempo.
+    - `posicao(self, amostra: str, periodo: str, ticker: str, tipo: str = 'DESVALORIZAÇÃO')`: Posição de um ticker no ranking.
+    """
+
+    def __init__(self, diretorio: str = DIRETORIO_RESULTADOS):
+        """
+        Inicializa o índice de rankings.
+
+        :param diretorio: Diretório com os snapshots de todas as amostras.
+        """
+        self.diretorio = diretorio
+        self._rankings: Dict[str, _RankingAmostra] = {}
+
+    def _nome(self, amostra: str) -> str:
+        """
+        Converte o tipo de amostra no nome do diretório de snapshots (ex.: 'indice:IDIV' -> 'indice_IDIV').
+        """
+        return amostra.replace(':', '_')
+
+    def amostras(self) -> List[str]:
+        """
+        Lista as amostras que possuem snapshots.
+
+        :return: Nomes das amostras no formato do `Dowtrend` (ex.: 'empresas_listadas', 'indice:IDIV').
+        """
+        if not exists(self.diretorio):
+            return []
+        return sorted(nome.replace('indice_', 'indice:', 1) for nome in listdir(self.diretorio))
+
+    def _obter(self, amostra: str) -> Optional[_RankingAmostra]:
+        """
+        Retorna o ranking de uma amostra, recarregando-o se um snapshot mais novo foi gravado.
+
+        :param amostra: Tipo de amostra (ex.: 'indice:IDIV').
+        :return: Ranking em memória, ou `None` se a amostra não possui snapshots.
+        """
+        armazem = ArmazemResultados(join(self.diretorio, self._nome(amostra)))
+        datas = armazem.datas()
+        if not datas:
+            return None
+        versao = (datas[-1], getmtime(join(armazem.diretorio, f'{datas[-1]}.parquet')))
+        atual = self._rankings.get(amostra)
+        if atual is None or atual.versao != versao:
+            ranking = armazem.ler_ranking()
+            if ranking is None:
+                return None
+            atual = _RankingAmostra(armazem.ler(), ranking, versao)
+            self._rankings[amostra] = atual
+        return atual
+
+    def top(self, amostra: str, periodo: str, tipo: str, k: int = 10) -> Optional[DataFrame]:
+        """
+        Retorna os `k` tickers com os maiores ou menores retornos de uma amostra.
+
+        :param amostra: Tipo de amostra (ex.: 'indice:IDIV').
+        :param periodo: Período do ranking (ex.: 'mensal').
+        :param tipo: 'VALORIZAÇÃO' para os maiores retornos ou 'DESVALORIZAÇÃO' para os menores.
+        :param k: Quantidade de tickers.
+        :return: DataFrame no mesmo formato do `Dowtrend.obter_maximos`, ou `None` se a amostra não possui snapshots.
+        """
+        ranking = self._obter(amostra)
+        if ranking is None:
+            return None
+        return ranking.valores.loc[ranking.ordenados(periodo, tipo)[:k]]
+
+    def top_geral(self, periodo: str, tipo: str, k: int = 10, amostras: Optional[List[str]] = None) -> DataFrame:
+        """
+        Retorna os `k` tickers com os maiores ou menores retornos considerando várias amostras.
+
+        Os rankings já ordenados de cada amostra são intercalados (merge), sem reordenar a união;
+        tickers presentes em mais de uma amostra aparecem uma única vez.
+
+        :param periodo: Período do ranking (ex.: 'mensal').
+        :param tipo: 'VALORIZAÇÃO' para os maiores retornos ou 'DESVALORIZAÇÃO' para os menores.
+        :param k: Quantidade de tickers.
+        :param amostras: Amostras consideradas; se `None`, todas as que possuem snapshots.
+        :return: DataFrame com os retornos dos tickers e a coluna `amostra` com a amostra de origem.
+        """
+        fontes = []
+        for amostra in amostras or self.amostras():
+            ranking = self._obter(amostra)
+            if ranking is None:
+                continue
+            fontes.append(ranking.chaves(periodo, tipo, amostra))
+
+        linhas = {}
+        for _, ticker, amostra in merge(*fontes):
+            if ticker not in linhas:
+                linhas[ticker] = {**self._rankings[amostra].valores.loc[ticker].to_dict(), 'amostra': amostra}
+                if len(linhas) == k:
+                    break
+        return DataFrame.from_dict(linhas, orient='index')
+
+    def posicao(self, amostra: str, periodo: str, ticker: str, tipo: str = 'DESVALORIZAÇÃO') -> Optional[int]:
+        """
+        Retorna a posição (a partir de 1) de um ticker no ranking de uma amostra.
+
+        :param amostra: Tipo de amostra (ex.: 'indice:IDIV').
+        :param periodo: Período do ranking (ex.: 'mensal').
+        :param ticker: Código do ativo (ticker).
+        :param tipo: 'VALORIZAÇÃO' (maior retorno na posição 1) ou 'DESVALORIZAÇÃO' (menor retorno na posição 1).
+        :return: Posição do ticker, ou `None` se ele não pertence à amostra ou não possui valor no período.
+        """
+        ranking = self._obter(amostra)
+        if ranking is None or ticker not in ranking.posicoes[periodo]:
+            return None
+        posicao, validos = ranking.posicoes[periodo][ticker], ranking.validos[periodo]
+        if posicao >= validos:
+            return None
+        return posicao + 1 if Dowtrend.CRITERIOS[tipo] else validos - posicao
@@ -0,0 +1,177 @@
+from typing import Dict, Tuple, Optional
+
+from pandas import DataFrame, Series, DatetimeIndex, Timedelta, Timestamp, concat
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Tick, Day
+from numpy import nan, isnan, arange, where, float64, int64, maximum, searchsorted
+
+# Regras de reamostragem usadas pelo `Dowtrend._calcular_retorno`
+PERIODOS = {'semanal': 'W', 'quinzenal': '15D', 'mensal': 'ME', 'trimestral': 'QE', 'anual': 'YE'}
+
+def _fronteiras(regra: str, inicio: DatetimeIndex, fim: DatetimeIndex) -> Tuple[DatetimeIndex, str]:
+    """
+    Calcula, para cada ticker, a data que separa o último período do período anterior.
+
+    Reproduz os intervalos do `resample(regra)`: as regras de calendário ('W', 'ME', 'QE', 'YE') usam
+    intervalos fechados à direita e terminam na âncora; a regra '15D' usa janelas de 15 dias fechadas à
+    esquerda, contadas a partir da meia-noite do primeiro pregão da série (`origin='start_day'`).
+
+    :param regra: Regra de reamostragem (ex.: 'W', '15D', 'ME').
+    :param inicio: Data do primeiro pregão de cada ticker.
+    :param fim: Data do último pregão de cada ticker.
+    :return: Tupla com as datas de fronteira e o lado a ser usado no `searchsorted`
+        ('right' quando a fronteira pertence ao período anterior, 'left' caso contrário).
+    """
+    offset = to_offset(regra)
+    if isinstance(offset, (Tick, Day)):
+        origem = inicio.normalize()
+        janela = Timedelta(regra)
+        return origem + ((fim - origem) // janela) * janela, 'left'
+    rotulo = fim.normalize() + offset * 0
+    rotulo = rotulo.where(fim <= rotulo, rotulo + offset)
+    return rotulo - offset, 'right'
+
+def calcular_retornos_painel(painel: DataFrame) -> Dict[str, Dict[str, float]]:
+    """
+    Calcula os retornos de todos os períodos para um painel largo de preços (datas × tickers).
+
+    O resultado é idêntico ao de `resample(regra).last().pct_change().dropna() * 100` seguido do último
+    valor, aplicado a cada ticker isoladamente: o retorno do último período compara o último preço do
+    ticker com o último preço anterior à fronteira do período. As fronteiras e as posições são obtidas de
+    forma vetorizada para todas as colunas, sem reamostrar o histórico.
+
+    :param painel: DataFrame com as datas no índice e um ticker por coluna (preços ajustados).
+    :return: Dicionário `{ticker: {periodo: valor}}` no mesmo formato do `Dowtrend.processar_dados_ticker`.
+    """
+    resultado = {ticker: {periodo: nan for periodo in PERIODOS} for ticker in painel.columns}
+    if painel.empty:
+        return resultado
+
+    painel = painel.sort_index()
+    valores = painel.to_numpy(dtype=float)
+    preenchido = painel.ffill().to_numpy(dtype=float)
+    validos = ~isnan(valores)
+    colunas = arange(valores.shape[1])
+    com_dados = validos.any(axis=0)
+    primeiro = validos.argmax(axis=0)
+    ultimo = len(painel) - 1 - validos[::-1].argmax(axis=0)
+    datas = DatetimeIndex(painel.index)
+    atual = valores[ultimo, colunas]
+
+    for periodo, regra in PERIODOS.items():
+        fronteira, lado = _fronteiras(regra, datas[primeiro], datas[ultimo])
+        posicao = datas.searchsorted(fronteira, side=lado) - 1
+        anterior = where(posicao >= primeiro, preenchido[posicao.clip(0), colunas], nan)
+        retorno = (atual / anterior - 1) * 100
+        for j, ticker in enumerate(painel.columns):
+            if com_dados[j] and not isnan(retorno[j]):
+                resultado[ticker][periodo] = float(round(retorno[j], 2))
+    return resultado
+
+def _ultimo_valido(valores, posicao: int) -> float:
+    """
+    Retorna o último preço válido (não nulo) até a posição informada, inclusive.
+
+    :param valores: Array com os preços da série.
+    :param posicao: Posição a partir da qual a busca volta no tempo.
+    :return: Último preço válido ou `nan` se não houver nenhum.
+    """
+    while posicao >= 0:
+        if not isnan(valores[posicao]):
+            return valores[posicao]
+        posicao -= 1
+    return nan
+
+def calcular_retornos_serie(serie: Series) -> Dict[str, float]:
+    """
+    Calcula os retornos de todos os períodos de uma série de preços em uma única passagem.
+
+    Em vez de reamostrar todo o histórico a cada período, localiza com `searchsorted` no índice de datas
+    apenas os dois preços necessários: o último preço e o último preço anterior à fronteira do período.
+    O custo é constante em relação ao tamanho do histórico e o resultado é idêntico ao de
+    `resample(regra).last().pct_change().dropna() * 100`, inclusive a ancoragem da regra '15D' no primeiro
+    pregão da série.
+
+    :param serie: Série de preços ajustados indexada por data.
+    :return: Dicionário com os retornos de cada período (semanal, quinzenal, mensal, trimestral e anual).
+    """
+    resultado = {periodo: nan for periodo in PERIODOS}
+    if serie.empty:
+        return resultado
+
+    datas = DatetimeIndex(serie.index)
+    valores = serie.to_numpy(dtype=float64)
+    atual = _ultimo_valido(valores, len(valores) - 1)
+    if isnan(atual):
+        return resultado
+
+    for periodo, regra in PERIODOS.items():
+        fronteira, lado = _fronteiras(regra, datas[:1], datas[-1:])
+        anterior = _ultimo_valido(valores, datas.searchsorted(fronteira[0], side=lado) - 1)
+        retorno = (atual / anterior - 1) * 100
+        if not isnan(retorno):
+            resultado[periodo] = float(round(retorno, 2))
+    return resultado
+
+def calcular_matriz_retornos(painel: DataFrame, inicio: Optional[str] = None) -> Dict[str, DataFrame]:
+    """
+    Calcula a matriz completa de retornos de cada período para um painel largo de preços (datas × tickers).
+
+    A célula `[data, ticker]` contém o retorno que `calcular_retornos_painel` daria se o histórico do ticker
+    terminasse naquela data, ou seja, o resultado que o `Dowtrend` teria salvo ao ser executado no dia.
+    Os valores não são arredondados, para que cada consulta arredonde apenas as linhas que usar.
+
+    :param painel: DataFrame com as datas no índice e um ticker por coluna (preços ajustados).
+    :param inicio: Primeira data ('AAAA-MM-DD') das matrizes; as datas anteriores continuam sendo usadas
+        como histórico, mas não geram linhas (reduz a memória usada em universos grandes).
+    :return: Dicionário `{periodo: DataFrame}` com as datas a partir de `inicio` no índice e um ticker por coluna.
+    """
+    painel = painel.sort_index()
+    datas = DatetimeIndex(painel.index)
+    valores = painel.to_numpy(dtype=float)
+    preenchido = painel.ffill().to_numpy(dtype=float)
+    validos = ~isnan(valores)
+    n, m = valores.shape
+    if n == 0:
+        return {periodo: DataFrame(index=datas, columns=painel.columns, dtype=float) for periodo in PERIODOS}
+    colunas = arange(m)
+    primeiro = where(validos.any(axis=0), validos.argmax(axis=0), n)
+
+    linhas = arange(0 if inicio is None else datas.searchsorted(Timestamp(inicio)), n)
+    # Posição do último pregão com cotação de cada ticker até cada data (-1 se ainda não havia cotação)
+    ultimo = maximum.accumulate(where(validos, arange(n)[:, None], -1), axis=0)[linhas]
+    atual = preenchido[linhas]
+    dias = datas.values.astype('datetime64[D]').astype(int64)
+
+    matrizes = {}
+    for periodo, regra in PERIODOS.items():
+        if regra.endswith('D'):
+            janela = Timedelta(regra).days
+            origem = dias[primeiro.clip(max=n - 1)]
+            fim = dias[ultimo.clip(0)]
+            posicao = searchsorted(dias, origem + ((fim - origem) // janela) * janela, side='left') - 1
+        else:
+            fronteira, lado = _fronteiras(regra, datas, datas)
+            posicao = (datas.searchsorted(fronteira, side=lado) - 1)[ultimo.clip(0)]
+        anterior = where((ultimo >= 0) & (posicao >= primeiro), preenchido[posicao.clip(0), colunas], nan)
+        matrizes[periodo] = DataFrame((atual / anterior - 1) * 100, index=datas[linhas], columns=painel.columns)
+    return matrizes
+
+def painel_local(dowtrend) -> DataFrame:
+    """
+    Monta o painel de preços (datas × tickers) de uma amostra a partir do histórico local (`data/historico`).
+
+    Apenas os preços já armazenados são usados; tickers sem histórico local aparecem como colunas vazias,
+    na ordem da amostra e sem repetições.
+
+    :param dowtrend: Instância de `Dowtrend` com a amostra desejada.
+    :return: DataFrame com as datas no índice e um ticker por coluna (preços ajustados).
+    """
+    amostra = list(dict.fromkeys(dowtrend._obter_amostra()))
+    series = {}
+    for ticker in amostra:
+        serie = dowtrend.historico.ler(ticker)
+        if serie is not None and not serie.empty:
+            series[ticker] = serie
+    painel = concat(series, axis=1) if series else DataFrame(index=DatetimeIndex([]))
+    return painel.reindex(columns=amostra)
@@ -0,0 +1,102 @@
+from typing import Iterator, Optional, Tuple
+
+from pandas import DataFrame, Timestamp
+from numpy import round as arredondar
+
+try:
+    from .dowtrend import Dowtrend
+    from .retornos import PERIODOS, calcular_matriz_retornos, painel_local
+except ImportError:
+    from dowtrend import Dowtrend
+    from retornos import PERIODOS, calcular_matriz_retornos, painel_local
+
+class AvaliacaoRetroativa:
+    """
+    Avalia a triagem de tendências em qualquer data passada, sem baixar nem recalcular nada por consulta.
+
+    As matrizes de retornos de todos os períodos são calculadas uma única vez para o universo inteiro
+    (`calcular_matriz_retornos`). Cada consulta apenas seleciona a linha da data pedida, reproduzindo o
+    resultado que o `Dowtrend` teria salvo se tivesse sido executado naquele dia.
+
+    **Atributos:**
+    - `qtd_output` (int): Quantidade de resultados retornados por `obter_maximos`.
+    - `matrizes` (Dict[str, DataFrame]): Matriz de retornos (datas × tickers) de cada período.
+
+    **Métodos:**
+    - `de_amostra(cls, dowtrend, inicio=None)`: Cria a avaliação a partir do histórico local dos tickers de uma amostra.
+    - `resultados(self, data: str)`: Retorna os retornos de todos os tickers vigentes em uma data, no formato do `read_data('DataFrame')`.
+    - `obter_maximos(self, data: str, column: str, tipo: str)`: Triagem de maiores/menores retornos vigente em uma data.
+    - `percorrer(self, inicio: str, fim: str, column: str, tipo: str)`: Percorre a triagem em cada pregão de um intervalo de datas.
+    """
+
+    def __init__(self, painel: DataFrame, inicio: Optional[str] = None, qtd_output: int = 10):
+        """
+        Inicializa a avaliação calculando as matrizes de retornos do painel.
+
+        :param painel: DataFrame com as datas no índice e um ticker por coluna (preços ajustados).
+        :param inicio: Primeira data ('AAAA-MM-DD') que poderá ser consultada; limita a memória usada.
+        :param qtd_output: Quantidade de resultados retornados por `obter_maximos`.
+        """
+        self.qtd_output = qtd_output
+        self.matrizes = calcular_matriz_retornos(painel, inicio)
+
+    @classmethod
+    def de_amostra(cls, dowtrend, inicio: Optional[str] = None) -> 'AvaliacaoRetroativa':
+        """
+        Cria a avaliação a partir do histórico local (`data/historico`) dos tickers de uma amostra.
+
+        Apenas os preços já armazenados são usados; tickers sem histórico local aparecem com `nan`.
+
+        :param dowtrend: Instância de `Dowtrend` com a amostra desejada.
+        :param inicio: Primeira data ('AAAA-MM-DD') que poderá ser consultada.
+        :return: Avaliação retroativa da amostra.
+        """
+        return cls(painel_local(dowtrend), inicio, dowtrend.qtd_output)
+
+    def resultados(self, data: str) -> DataFrame:
+        """
+        Retorna os retornos de todos os tickers vigentes em uma data (último pregão até ela, inclusive).
+
+        :param data: Data no formato 'AAAA-MM-DD'.
+        :return: DataFrame com os tickers no índice e uma coluna por período, como o `read_data('DataFrame')`.
+        """
+        return self._linha(self.matrizes['semanal'].index.searchsorted(Timestamp(data), side='right') - 1)[1]
+
+    def _linha(self, posicao: int) -> Tuple[Optional[Timestamp], DataFrame]:
+        """
+        Monta a tabela de resultados de uma linha das matrizes, arredondada como no `Dowtrend`.
+
+        :param posicao: Posição da data nas matrizes.
+        :return: Tupla com a data da linha (`None` antes do primeiro pregão) e a tabela de resultados.
+        """
+        tickers = self.matrizes['semanal'].columns
+        if posicao < 0:
+            return None, DataFrame(index=tickers, columns=list(PERIODOS), dtype=float)
+        tabela = DataFrame({periodo: arredondar(matriz.iloc[posicao].to_numpy(), 2) for periodo, matriz in self.matrizes.items()}, index=tickers)
+        return self.matrizes['semanal'].index[posicao], tabela
+
+    def obter_maximos(self, data: str, column: str, tipo: str) -> DataFrame:
+        """
+        Obtém os tickers com os maiores ou menores retornos vigentes em uma data.
+
+        :param data: Data no formato 'AAAA-MM-DD'.
+        :param column: Nome da coluna com os valores de retorno (exemplo: 'semanal', 'quinzenal', etc.).
+        :param tipo: Tipo de critério para ordenação ('VALORIZAÇÃO' ou 'DESVALORIZAÇÃO').
+        :return: DataFrame contendo os tickers classificados conforme o critério.
+        """
+        return self.resultados(data).sort_values(by=column, ascending=Dowtrend.CRITERIOS[tipo]).head(self.qtd_output)
+
+    def percorrer(self, inicio: str, fim: str, column: str, tipo: str) -> Iterator[Tuple[Timestamp, DataFrame]]:
+        """
+        Percorre a triagem de maiores ou menores retornos em cada pregão de um intervalo de datas.
+
+        :param inicio: Primeira data do intervalo ('AAAA-MM-DD').
+        :param fim: Última data do intervalo ('AAAA-MM-DD'), inclusive.
+        :param column: Nome da coluna com os valores de retorno (exemplo: 'mensal').
+        :param tipo: Tipo de critério para ordenação ('VALORIZAÇÃO' ou 'DESVALORIZAÇÃO').
+        :return: Iterador de tuplas `(data, DataFrame)` com a triagem de cada pregão.
+        """
+        datas = self.matrizes['semanal'].index
+        for posicao in range(datas.searchsorted(Timestamp(inicio)), datas.searchsorted(Timestamp(fim), side='right')):
+            data, tabela = self._linha(posicao)
+            yield data, tabela.sort_values(by=column, ascending=Dowtrend.CRITERIOS[tipo]).head(self.qtd_output)
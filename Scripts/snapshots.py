@@ -0,0 +1,120 @@
+from datetime import date
+from os import makedirs, replace, listdir
+from os.path import join, exists, getmtime
+from typing import Dict, List, Optional
+
+from pandas import DataFrame, read_parquet
+
+try:
+    from .retornos import PERIODOS
+except ImportError:
+    from retornos import PERIODOS
+
+class ArmazemResultados:
+    """
+    Armazena um snapshot datado dos resultados de uma amostra a cada execução, em formato colunar.
+
+    Cada snapshot é um arquivo parquet `AAAA-MM-DD.parquet` (compressão zstd) com os tickers no índice e
+    uma coluna por período. Execuções no mesmo dia substituem o snapshot do dia; os dias anteriores são
+    preservados, formando o histórico dos resultados. A leitura é feita com memory map e pode projetar
+    apenas as colunas desejadas (ex.: somente `mensal` de todos os tickers).
+
+    Junto com cada snapshot é gravado o ranking da execução em `rankings/AAAA-MM-DD.parquet`: para cada
+    período, os tickers em ordem crescente de retorno (tickers sem valor ao final), usado pelo
+    `IndiceRankings` para responder consultas de top-K sem reordenar os dados.
+
+    **Atributos:**
+    - `diretorio` (str): Diretório dos snapshots da amostra (ex.: `data/resultados/indice_IDIV`).
+
+    **Métodos:**
+    - `datas(self)`: Lista as datas dos snapshots disponíveis, em ordem crescente.
+    - `salvar(self, data: Dict[str, Dict[str, float]], data_execucao: Optional[str] = None)`: Grava o snapshot da execução.
+    - `ler(self, data: Optional[str] = None, colunas: Optional[List[str]] = None)`: Lê o snapshot mais recente ou o vigente em uma data.
+    - `ler_ranking(self, data: Optional[str] = None)`: Lê o ranking do snapshot mais recente ou do vigente em uma data.
+    - `modificado_em(self)`: Horário da última gravação do snapshot mais recente.
+    """
+
+    def __init__(self, diretorio: str):
+        """
+        Inicializa o armazenamento de snapshots de uma amostra.
+
+        :param diretorio: Diretório dos snapshots da amostra.
+        """
+        self.diretorio = diretorio
+
+    def datas(self) -> List[str]:
+        """
+        Lista as datas dos snapshots disponíveis.
+
+        :return: Datas no formato 'AAAA-MM-DD', em ordem crescente.
+        """
+        if not exists(self.diretorio):
+            return []
+        return sorted(arquivo[:-len('.parquet')] for arquivo in listdir(self.diretorio) if arquivo.endswith('.parquet'))
+
+    def salvar(self, data: Dict[str, Dict[str, float]], data_execucao: Optional[str] = None) -> str:
+        """
+        Grava o snapshot de uma execução de forma atômica.
+
+        :param data: Dicionário `{ticker: {periodo: valor}}` produzido pelo `Dowtrend`.
+        :param data_execucao: Data do snapshot no formato 'AAAA-MM-DD' (padrão: hoje).
+        :return: Caminho do arquivo gravado.
+        """
+        makedirs(self.diretorio, exist_ok=True)
+        caminho = join(self.diretorio, f'{data_execucao or date.today().isoformat()}.parquet')
+        df = DataFrame.from_dict(data, orient='index', columns=list(PERIODOS), dtype=float)
+        df.index.name = 'ticker'
+        df.to_parquet(caminho + '.tmp', compression='zstd')
+        self._gravar_ranking(df, data_execucao or date.today().isoformat())
+        replace(caminho + '.tmp', caminho)
+        return caminho
+
+    def _gravar_ranking(self, df: DataFrame, data_execucao: str) -> None:
+        """
+        Grava o ranking de um snapshot: para cada período, os tickers em ordem crescente de retorno.
+
+        A ordenação é estável e deixa os tickers sem valor (`nan`) ao final, como o `sort_values` do `obter_maximos`.
+
+        :param df: DataFrame do snapshot, com os tickers no índice e uma coluna por período.
+        :param data_execucao: Data do snapshot no formato 'AAAA-MM-DD'.
+        """
+        makedirs(join(self.diretorio, 'rankings'), exist_ok=True)
+        caminho = join(self.diretorio, 'rankings', f'{data_execucao}.parquet')
+        ranking = DataFrame({periodo: df[periodo].sort_values(kind='mergesort', na_position='last').index for periodo in df.columns})
+        ranking.to_parquet(caminho + '.tmp', compression='zstd')
+        replace(caminho + '.tmp', caminho)
+
+    def ler(self, data: Optional[str] = None, colunas: Optional[List[str]] = None) -> Optional[DataFrame]:
+        """
+        Lê o snapshot mais recente ou o vigente em uma data (o último gravado até ela, inclusive).
+
+        :param data: Data no formato 'AAAA-MM-DD'; se `None`, lê o snapshot mais recente.
+        :param colunas: Períodos a serem lidos (ex.: ['mensal']); se `None`, lê todos.
+        :return: DataFrame com os tickers no índice e uma coluna por período, ou `None` se não houver snapshot.
+        """
+        datas = [d for d in self.datas() if data is None or d <= data]
+        if not datas:
+            return None
+        return read_parquet(join(self.diretorio, f'{datas[-1]}.parquet'), columns=colunas, memory_map=True)
+
+    def ler_ranking(self, data: Optional[str] = None) -> Optional[DataFrame]:
+        """
+        Lê o ranking do snapshot mais recente ou do vigente em uma data.
+
+        :param data: Data no formato 'AAAA-MM-DD'; se `None`, lê o ranking mais recente.
+        :return: DataFrame com uma coluna por período contendo os tickers em ordem crescente de retorno,
+            ou `None` se não houver ranking.
+        """
+        datas = [d for d in self.datas() if data is None or d <= data]
+        if not datas or not exists(join(self.diretorio, 'rankings', f'{datas[-1]}.parquet')):
+            return None
+        return read_parquet(join(self.diretorio, 'rankings', f'{datas[-1]}.parquet'), memory_map=True)
+
+    def modificado_em(self) -> Optional[float]:
+        """
+        Retorna o horário da última gravação do snapshot mais recente.
+
+        :return: Horário (`os.path.getmtime`) do arquivo, ou `None` se não houver snapshot.
+        """
+        datas = self.datas()
+        return getmtime(join(self.diretorio, f'{datas[-1]}.parquet')) if datas else None
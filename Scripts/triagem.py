@@ -0,0 +1,259 @@
+import re
+import sys
+import argparse
+from typing import List, Optional
+
+from pandas import DataFrame, DatetimeIndex
+from numpy import (nan, inf, isnan, arange, where, full, int64, maximum, unique, flatnonzero, append, vstack, ix_,
+                   argsort, take_along_axis, round as arredondar)
+
+try:
+    from .retornos import PERIODOS, painel_local
+except ImportError:
+    from retornos import PERIODOS, painel_local
+
+# Janela, em dias corridos, da máxima de 52 semanas
+JANELA_MAXIMA = 52 * 7
+
+# Colunas calculadas por `calcular_indicadores`, além dos retornos de cada período
+INDICADORES = ['drawdown', 'inclinacao_media'] + [f'sequencia_{periodo}' for periodo in PERIODOS]
+
+def _grupos(periodo: str, dias, origem: int):
+    """
+    Numera o período de cada data com os mesmos intervalos do `resample` (ver `retornos._fronteiras`).
+
+    :param periodo: Nome do período (ex.: 'mensal').
+    :param dias: Array com as datas em dias desde 1970-01-01.
+    :param origem: Primeiro pregão (em dias) dos tickers, ou o seu resto na divisão por 15; usado apenas pela regra '15D'.
+    :return: Array com o número do período de cada data (crescente com a data).
+    """
+    if periodo == 'semanal':
+        # 1970-01-01 foi uma quinta-feira: somar 3 faz as semanas começarem na segunda e terminarem no domingo ('W')
+        return (dias + 3) // 7
+    if periodo == 'quinzenal':
+        return (dias - origem) // 15
+    meses = dias.astype('datetime64[D]').astype('datetime64[M]').astype(int64)
+    if periodo == 'mensal':
+        return meses
+    if periodo == 'trimestral':
+        return meses // 3
+    return meses // 12
+
+def calcular_indicadores(painel: DataFrame, media: int = 50, passo: int = 20) -> DataFrame:
+    """
+    Calcula, em uma única passagem vetorizada sobre o painel de preços, os indicadores de tendência de todos os tickers.
+
+    Para cada período, o painel é reduzido aos fechamentos de período (último preço de cada semana, mês, etc.),
+    de onde saem tanto o retorno do último período quanto a sequência de períodos de queda. Os indicadores são:
+
+    - `semanal`, ..., `anual`: retornos do último período, idênticos aos de `calcular_retornos_painel`;
+    - `drawdown`: queda percentual do último preço em relação à máxima das últimas 52 semanas (0 na máxima);
+    - `inclinacao_media`: variação percentual da média móvel de `media` pregões nos últimos `passo` pregões, contados
+      apenas entre os pregões com cotação do próprio ticker (independente dos demais tickers do painel);
+    - `sequencia_<periodo>`: quantidade de períodos consecutivos de queda até o último, inclusive
+      (0 se o último período não teve queda).
+
+    A máxima de 52 semanas é calculada com os preços de fechamento ajustados, os únicos armazenados no histórico.
+    Tickers sem cotações (ou sem histórico suficiente para um indicador) recebem `nan`.
+
+    :param painel: DataFrame com as datas no índice e um ticker por coluna (preços ajustados).
+    :param media: Quantidade de pregões com cotação da média móvel.
+    :param passo: Quantidade de pregões com cotação usada para medir a inclinação da média móvel.
+    :return: DataFrame com os tickers no índice e uma coluna por indicador (retornos seguidos de `INDICADORES`).
+    """
+    tabela = DataFrame(nan, index=painel.columns, columns=list(PERIODOS) + INDICADORES)
+    painel = painel.sort_index()
+    valores = painel.to_numpy(dtype=float)
+    validos = ~isnan(valores)
+    n, m = valores.shape
+    com_dados = validos.any(axis=0) if n else full(m, False)
+    if not com_dados.any():
+        return tabela.astype({f'sequencia_{periodo}': 'Int64' for periodo in PERIODOS})
+
+    preenchido = painel.ffill().to_numpy(dtype=float)
+    colunas = arange(m)
+    primeiro = validos.argmax(axis=0)
+    ultimo = n - 1 - validos[::-1].argmax(axis=0)
+    dias = DatetimeIndex(painel.index).values.astype('datetime64[D]').astype(int64)
+    atual = valores[ultimo, colunas]
+
+    for periodo in PERIODOS:
+        # Na regra '15D' os períodos dependem do primeiro pregão de cada ticker: os tickers são agrupados pela origem
+        origens = unique(dias[primeiro] % 15) if periodo == 'quinzenal' else [0]
+        retorno, sequencia = full(m, nan), full(m, nan)
+        for origem in origens:
+            selecao = flatnonzero(dias[primeiro] % 15 == origem) if periodo == 'quinzenal' else colunas
+            grupos = _grupos(periodo, dias, origem)
+            # Última linha de cada período; o fechamento do período é o último preço conhecido até ela
+            fins = append(flatnonzero(grupos[1:] != grupos[:-1]), n - 1)
+            fechamentos = preenchido[ix_(fins, selecao)]
+            # Quedas consecutivas terminando em cada período: distância até o último período sem queda
+            periodos = arange(len(fins))[:, None]
+            sem_queda = vstack([full((1, len(selecao)), True), ~(fechamentos[1:] < fechamentos[:-1])])
+            quedas = periodos - maximum.accumulate(where(sem_queda, periodos, 0), axis=0)
+            corrente, posicoes = fins.searchsorted(ultimo[selecao]), arange(len(selecao))
+            anterior = where(corrente > 0, fechamentos[(corrente - 1).clip(0), posicoes], nan)
+            retorno[selecao] = (atual[selecao] / anterior - 1) * 100
+            sequencia[selecao] = where(isnan(anterior), nan, quedas[corrente, posicoes])
+        tabela[periodo] = arredondar(retorno, 2)
+        tabela[f'sequencia_{periodo}'] = sequencia
+
+    # Máxima das últimas 52 semanas, apenas nas linhas que caem na janela de algum ticker
+    limite = dias[ultimo] - JANELA_MAXIMA
+    inicio = dias.searchsorted(limite[com_dados].min(), side='right')
+    linhas = arange(inicio, n)[:, None]
+    janela = validos[inicio:] & (dias[inicio:, None] > limite) & (linhas <= ultimo)
+    maxima = where(janela, valores[inicio:], -inf).max(axis=0)
+    tabela['drawdown'] = arredondar(where(com_dados, (1 - atual / maxima) * 100, nan), 2)
+
+    # A média móvel e o passo contam apenas os pregões com cotação de cada ticker, como `serie.dropna().rolling(media)`:
+    # as cotações de cada coluna são movidas para o topo (na ordem das datas) e somadas acumuladamente, de modo que
+    # a soma das cotações de posição k a k + media - 1 do ticker é acumulado[k + media] - acumulado[k]
+    compactos = take_along_axis(valores, argsort(~validos, axis=0, kind='stable'), axis=0)
+    acumulado = full((n + 1, m), 0.0)
+    acumulado[1:] = where(isnan(compactos), 0.0, compactos).cumsum(axis=0)
+    cotacoes = validos.sum(axis=0)
+    suficiente = cotacoes >= media + passo
+    somas = {}
+    for nome, fim in (('recente', cotacoes), ('passada', cotacoes - passo)):
+        somas[nome] = acumulado[fim.clip(0, n), colunas] - acumulado[(fim - media).clip(0, n), colunas]
+    inclinacao = somas['recente'] / where(suficiente, somas['passada'], nan)
+    tabela['inclinacao_media'] = arredondar((inclinacao - 1) * 100, 2)
+    return tabela.astype({f'sequencia_{periodo}': 'Int64' for periodo in PERIODOS})
+
+def _normalizar_filtro(expressao: str) -> str:
+    """
+    Converte as porcentagens de um filtro em números (ex.: 'drawdown > 20%' -> 'drawdown > 20'), já que
+    todos os indicadores são expressos em pontos percentuais.
+    """
+    return re.sub(r'(\d+(?:\.\d+)?)\s*%', r'\1', expressao)
+
+class Triagem:
+    """
+    Triagem de tendências com vários indicadores, filtros compostos e ordenação por mais de um critério.
+
+    Os indicadores de todos os tickers (retornos dos cinco períodos, drawdown da máxima de 52 semanas,
+    sequências de períodos de queda e inclinação da média móvel) são calculados uma única vez para o universo
+    inteiro com `calcular_indicadores`. Filtros como `'mensal < 0 and drawdown > 20%'` são avaliados de uma vez
+    sobre a tabela de indicadores (`DataFrame.query`), em vez de ticker por ticker.
+
+    **Atributos:**
+    - `qtd_output` (int): Quantidade padrão de resultados retornados por `triar`.
+    - `indicadores` (DataFrame): Tabela com os tickers no índice e uma coluna por indicador.
+
+    **Métodos:**
+    - `de_amostra(cls, dowtrend, media=50, passo=20)`: Cria a triagem a partir do histórico local dos tickers de uma amostra.
+    - `filtrar(self, expressao: str)`: Retorna os tickers que atendem a um filtro composto.
+    - `ordenar(self, tabela: DataFrame, ordem: str)`: Ordena uma tabela por um ou mais indicadores.
+    - `triar(self, filtro=None, ordem=None, k=None)`: Filtra, ordena e retorna os primeiros tickers.
+    """
+
+    def __init__(self, painel: DataFrame, media: int = 50, passo: int = 20, qtd_output: int = 10):
+        """
+        Inicializa a triagem calculando os indicadores do painel.
+
+        :param painel: DataFrame com as datas no índice e um ticker por coluna (preços ajustados).
+        :param media: Quantidade de pregões da média móvel.
+        :param passo: Quantidade de pregões usada para medir a inclinação da média móvel.
+        :param qtd_output: Quantidade padrão de resultados retornados por `triar`.
+        """
+        self.qtd_output = qtd_output
+        self.indicadores = calcular_indicadores(painel, media, passo)
+
+    @classmethod
+    def de_amostra(cls, dowtrend, media: int = 50, passo: int = 20) -> 'Triagem':
+        """
+        Cria a triagem a partir do histórico local (`data/historico`) dos tickers de uma amostra.
+
+        Apenas os preços já armazenados são usados; tickers sem histórico local aparecem com `nan`.
+
+        :param dowtrend: Instância de `Dowtrend` com a amostra desejada.
+        :param media: Quantidade de pregões da média móvel.
+        :param passo: Quantidade de pregões usada para medir a inclinação da média móvel.
+        :return: Triagem da amostra.
+        """
+        return cls(painel_local(dowtrend), media, passo, dowtrend.qtd_output)
+
+    def filtrar(self, expressao: str) -> DataFrame:
+        """
+        Retorna os tickers que atendem a um filtro composto sobre os indicadores.
+
+        O filtro usa a sintaxe do `DataFrame.query`, com os nomes das colunas de `indicadores`, e aceita
+        porcentagens (ex.: `'mensal < 0 and drawdown > 20%'`, `'sequencia_semanal >= 3 or anual < -30'`).
+        Tickers sem valor em um indicador não atendem às comparações com ele.
+
+        :param expressao: Expressão do filtro.
+        :return: Tabela de indicadores apenas com os tickers selecionados, na ordem da amostra.
+        :raises ValueError: Se a expressão for inválida ou usar um indicador desconhecido.
+        """
+        try:
+            return self.indicadores.query(_normalizar_filtro(expressao))
+        except (SyntaxError, NameError, TypeError, ValueError) as e:
+            raise ValueError(f"Filtro inválido '{expressao}': {e}") from e
+
+    def ordenar(self, tabela: DataFrame, ordem: str) -> DataFrame:
+        """
+        Ordena uma tabela de indicadores por um ou mais indicadores.
+
+        :param tabela: Tabela de indicadores (ex.: resultado de `filtrar`).
+        :param ordem: Indicadores separados por vírgula; o prefixo '-' indica ordem decrescente
+            (ex.: `'-drawdown, mensal'`). Tickers sem valor ficam ao final.
+        :return: Tabela ordenada.
+        :raises ValueError: Se algum indicador for desconhecido.
+        """
+        criterios = [criterio.strip() for criterio in ordem.split(',') if criterio.strip()]
+        colunas = [criterio.lstrip('-') for criterio in criterios]
+        desconhecidas = [coluna for coluna in colunas if coluna not in tabela.columns]
+        if desconhecidas:
+            raise ValueError(f"Indicadores desconhecidos na ordenação: {', '.join(desconhecidas)}.")
+        return tabela.sort_values(by=colunas, ascending=[not criterio.startswith('-') for criterio in criterios],
+                                  kind='stable', na_position='last')
+
+    def triar(self, filtro: Optional[str] = None, ordem: Optional[str] = None, k: Optional[int] = None) -> DataFrame:
+        """
+        Filtra e ordena todo o universo de uma vez e retorna os primeiros tickers.
+
+        :param filtro: Expressão do filtro (ver `filtrar`); se `None`, todos os tickers.
+        :param ordem: Critérios de ordenação (ver `ordenar`); se `None`, a ordem da amostra é mantida.
+        :param k: Quantidade de tickers retornados (padrão: `qtd_output`).
+        :return: Tabela de indicadores com os tickers selecionados.
+        """
+        tabela = self.indicadores if filtro is None else self.filtrar(filtro)
+        if ordem:
+            tabela = self.ordenar(tabela, ordem)
+        return tabela.head(self.qtd_output if k is None else k)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Executa uma triagem pela linha de comando sobre o histórico local de uma amostra e imprime a tabela.
+
+    :param argv: Argumentos da linha de comando (padrão: `sys.argv[1:]`).
+    :return: Código de saída (0 em caso de sucesso).
+    """
+    try:
+        from .dowtrend import Dowtrend
+    except ImportError:
+        from dowtrend import Dowtrend
+
+    parser = argparse.ArgumentParser(description='Triagem de tendências com vários indicadores.')
+    parser.add_argument('amostra', help="Tipo de amostra, como 'empresas_listadas' ou 'indice:IDIV'.")
+    parser.add_argument('--filtro', help="Filtro composto, como 'mensal < 0 and drawdown > 20%%'.")
+    parser.add_argument('--ordem', default='-drawdown', help="Indicadores da ordenação; '-' para decrescente (padrão: '-drawdown').")
+    parser.add_argument('-k', type=int, default=10, help='Quantidade de tickers (padrão: 10).')
+    parser.add_argument('--media', type=int, default=50, help='Pregões da média móvel (padrão: 50).')
+    parser.add_argument('--passo', type=int, default=20, help='Pregões usados na inclinação da média móvel (padrão: 20).')
+    args = parser.parse_args(argv)
+
+    triagem = Triagem.de_amostra(Dowtrend(type_amostra=args.amostra), args.media, args.passo)
+    try:
+        selecionados = triagem.indicadores if args.filtro is None else triagem.filtrar(args.filtro)
+        tabela = triagem.ordenar(selecionados, args.ordem).head(args.k)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(tabela.to_string())
+    print(f"{len(selecionados)} de {len(triagem.indicadores)} tickers atendem ao filtro.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import json
+from os import makedirs, replace
+from os.path import join, exists, dirname, abspath
+from time import time
+from typing import Callable, List, Optional, Dict
+
+import logging
+
+DIRETORIO_UNIVERSO = join(dirname(dirname(abspath(__file__))), 'data', 'universo')
+
+class CacheUniverso:
+    """
+    Cache em disco da composição das amostras (empresas listadas e carteiras dos índices).
+
+    Cada amostra é gravada em `data/universo/<nome>.json` com os tickers, o horário da última consulta
+    e os cabeçalhos `ETag`/`Last-Modified` devolvidos pelo servidor. Dentro do prazo de validade (`ttl`)
+    os tickers são lidos do disco sem acessar a rede; depois dele, a lista é revalidada com uma requisição
+    condicional e só é baixada e processada de novo se o arquivo de origem tiver mudado.
+
+    **Atributos:**
+    - `diretorio` (str): Diretório onde as composições são gravadas.
+    - `ttl` (float): Prazo de validade do cache, em segundos.
+    - `fonte` (Optional[Callable]): Função que executa a requisição HTTP (`requests.get` se `None`).
+
+    **Métodos:**
+    - `obter(self, nome: str, url: str, processar: Callable[[str], List[str]])`: Retorna os tickers da amostra, usando o cache quando possível.
+    """
+
+    def __init__(self, diretorio: str = DIRETORIO_UNIVERSO, ttl: float = 24 * 60 * 60,
+                 fonte: Optional[Callable] = None):
+        """
+        Inicializa o cache de composição das amostras.
+
+        :param diretorio: Diretório onde as composições são gravadas.
+        :param ttl: Prazo de validade do cache, em segundos (padrão: um dia).
+        :param fonte: Função `fonte(url, headers=...)` que executa a requisição HTTP (padrão: `requests.get`,
+            importado apenas quando a composição precisa ser baixada).
+        """
+        self.diretorio = diretorio
+        self.ttl = ttl
+        self.fonte = fonte
+
+    def _caminho(self, nome: str) -> str:
+        """
+        Retorna o caminho do arquivo de cache de uma amostra.
+
+        :param nome: Nome da amostra (ex.: 'empresas_listadas', 'indice_IDIV').
+        :return: Caminho do arquivo JSON.
+        """
+        return join(self.diretorio, f'{nome}.json')
+
+    def _ler(self, nome: str) -> Optional[Dict]:
+        """
+        Lê a entrada de cache de uma amostra.
+
+        :param nome: Nome da amostra.
+        :return: Dicionário com `tickers`, `obtido_em`, `etag` e `last_modified`, ou `None` se não houver cache.
+        """
+        if not exists(self._caminho(nome)):
+            return None
+        try:
+            with open(self._caminho(nome), 'r') as json_file:
+                return json.load(json_file)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.error(f"Erro ao ler o cache da amostra {nome}: {e}")
+            return None
+
+    def _gravar(self, nome: str, entrada: Dict) -> None:
+        """
+        Grava a entrada de cache de uma amostra de forma atômica.
+
+        :param nome: Nome da amostra.
+        :param entrada: Dicionário com `tickers`, `obtido_em`, `etag` e `last_modified`.
+        """
+        makedirs(self.diretorio, exist_ok=True)
+        with open(self._caminho(nome) + '.tmp', 'w') as json_file:
+            json.dump(entrada, json_file)
+        replace(self._caminho(nome) + '.tmp', self._caminho(nome))
+
+    def obter(self, nome: str, url: str, processar: Callable[[str], List[str]]) -> List[str]:
+        """
+        Retorna os tickers de uma amostra, usando o cache quando possível.
+
+        Respostas de erro (status diferente de 200 e 304) ou que não possam ser processadas nunca substituem o
+        cache: a composição em cache é mantida e será revalidada na próxima consulta.
+
+        :param nome: Nome da amostra (ex.: 'empresas_listadas', 'indice_IDIV').
+        :param url: Endereço do arquivo CSV com a composição da amostra.
+        :param processar: Função que converte o conteúdo do CSV na lista de tickers.
+        :return: Lista de tickers da amostra.
+        :raises ValueError: Se houver um erro ao acessar a URL e não existir cache da amostra.
+        """
+        entrada = self._ler(nome)
+        if entrada is not None and time() - entrada['obtido_em'] < self.ttl:
+            return entrada['tickers']
+
+        cabecalhos = {}
+        if entrada is not None and entrada.get('etag'):
+            cabecalhos['If-None-Match'] = entrada['etag']
+        if entrada is not None and entrada.get('last_modified'):
+            cabecalhos['If-Modified-Since'] = entrada['last_modified']
+
+        import requests
+        try:
+            response = (self.fonte or requests.get)(url, headers=cabecalhos)
+        except requests.exceptions.RequestException as e:
+            if entrada is None:
+                raise ValueError(f'Erro ao acessar a página: {e}')
+            logging.warning(f"Erro ao revalidar a amostra {nome} ({e}); usando a composição em cache.")
+            return entrada['tickers']
+
+        if response.status_code == 304 and entrada is not None:
+            logging.info(f"Composição da amostra {nome} não mudou desde a última consulta.")
+            entrada['obtido_em'] = time()
+        else:
+            try:
+                if response.status_code != 200:
+                    raise ValueError(f'HTTP {response.status_code}')
+                tickers = processar(response.text)
+            except Exception as e:
+                if entrada is None:
+                    raise ValueError(f'Erro ao acessar a página: {e}')
+                logging.warning(f"Erro ao revalidar a amostra {nome} ({e}); usando a composição em cache.")
+                return entrada['tickers']
+            entrada = {
+                'tickers': tickers,
+                'obtido_em': time(),
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')
+            }
+        self._gravar(nome, entrada)
+        return entrada['tickers']
@@ -0,0 +1,185 @@
+import sys
+import json
+import argparse
+from datetime import datetime
+from os import makedirs, replace
+from os.path import join, dirname, abspath, exists
+from threading import Lock
+from time import time
+from typing import Dict, Iterable, List, Optional
+
+import logging
+
+CAMINHO_VIVACIDADE = join(dirname(dirname(abspath(__file__))), 'data', 'vivacidade.json')
+
+class RegistroVivacidade:
+    """
+    Registro persistente dos tickers que não retornaram nenhuma cotação (cache negativo).
+
+    Parte da lista de empresas listadas não possui cotações no Yahoo Finance (BDRs, códigos cancelados,
+    ativos deslistados). Cada vez que o histórico completo de um ticker volta vazio, o ticker é registrado e
+    só volta a ser consultado depois de uma espera que dobra a cada nova tentativa vazia (`espera_base`,
+    `2 * espera_base`, ... até `espera_maxima`). Quando um ticker volta a ter cotações, ele sai do registro.
+
+    O registro é gravado em `data/vivacidade.json` e pode ser inspecionado com `listar` ou pela linha de
+    comando (`python vivacidade.py`); `forcar` faz com que os tickers sejam consultados na próxima execução.
+
+    **Atributos:**
+    - `caminho` (str): Caminho do arquivo do registro.
+    - `espera_base` (float): Espera, em segundos, depois da primeira tentativa vazia.
+    - `espera_maxima` (float): Espera máxima, em segundos, entre duas tentativas.
+
+    **Métodos:**
+    - `ignorar(self, ticker: str)`: Indica se o ticker deve ser pulado por ainda estar dentro da espera.
+    - `registrar_vazio(self, ticker: str)`: Registra uma tentativa sem cotações e agenda a próxima.
+    - `registrar_dados(self, ticker: str)`: Retira do registro um ticker que voltou a ter cotações.
+    - `forcar(self, tickers=None)`: Faz com que os tickers sejam consultados novamente na próxima execução.
+    - `listar(self)`: Lista os tickers registrados.
+    - `salvar(self)`: Grava o registro em disco, se houver alterações.
+    """
+
+    def __init__(self, caminho: str = CAMINHO_VIVACIDADE, espera_base: float = 24 * 60 * 60,
+                 espera_maxima: float = 32 * 24 * 60 * 60):
+        """
+        Inicializa o registro, lendo as entradas já gravadas.
+
+        :param caminho: Caminho do arquivo do registro.
+        :param espera_base: Espera, em segundos, depois da primeira tentativa vazia (padrão: um dia).
+        :param espera_maxima: Espera máxima, em segundos, entre duas tentativas (padrão: 32 dias).
+        """
+        self.caminho = caminho
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self._trava = Lock()
+        self._alterado = False
+        self._entradas: Dict[str, Dict] = self._ler()
+
+    def _ler(self) -> Dict[str, Dict]:
+        """
+        Lê as entradas gravadas; um arquivo ausente ou corrompido resulta em um registro vazio.
+
+        :return: Dicionário `{ticker: {'tentativas', 'primeira_falha', 'ultima_tentativa', 'proxima_tentativa'}}`.
+        """
+        if not exists(self.caminho):
+            return {}
+        try:
+            with open(self.caminho, 'r') as json_file:
+                return json.load(json_file)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.error(f"Erro ao ler o registro de vivacidade {self.caminho}: {e}")
+            return {}
+
+    def ignorar(self, ticker: str) -> bool:
+        """
+        Indica se o ticker deve ser pulado por não ter cotações e ainda estar dentro da espera.
+
+        :param ticker: Código do ativo (ticker).
+        :return: `True` se o ticker não deve ser consultado agora.
+        """
+        entrada = self._entradas.get(ticker)
+        return entrada is not None and time() < entrada['proxima_tentativa']
+
+    def registrar_vazio(self, ticker: str) -> None:
+        """
+        Registra uma tentativa sem cotações e agenda a próxima, dobrando a espera a cada tentativa vazia.
+
+        :param ticker: Código do ativo (ticker).
+        """
+        agora = time()
+        with self._trava:
+            entrada = self._entradas.setdefault(ticker, {'tentativas': 0, 'primeira_falha': agora})
+            entrada['tentativas'] += 1
+            entrada['ultima_tentativa'] = agora
+            entrada['proxima_tentativa'] = agora + min(self.espera_base * 2 ** (entrada['tentativas'] - 1), self.espera_maxima)
+            self._alterado = True
+
+    def registrar_dados(self, ticker: str) -> None:
+        """
+        Retira do registro um ticker que voltou a ter cotações.
+
+        :param ticker: Código do ativo (ticker).
+        """
+        if ticker not in self._entradas:
+            return
+        with self._trava:
+            if self._entradas.pop(ticker, None) is not None:
+                logging.info(f"O ticker {ticker} voltou a ter cotações e saiu do registro de vivacidade.")
+                self._alterado = True
+
+    def forcar(self, tickers: Optional[Iterable[str]] = None) -> int:
+        """
+        Faz com que os tickers registrados sejam consultados novamente na próxima execução.
+
+        A quantidade de tentativas é mantida: se o ticker continuar sem cotações, a espera seguinte
+        continua dobrando a partir dela.
+
+        :param tickers: Tickers a serem reconsultados; se `None`, todos os registrados.
+        :return: Quantidade de tickers liberados.
+        """
+        with self._trava:
+            selecionados = [ticker for ticker in (self._entradas if tickers is None else tickers) if ticker in self._entradas]
+            for ticker in selecionados:
+                self._entradas[ticker]['proxima_tentativa'] = 0
+            self._alterado = self._alterado or bool(selecionados)
+        return len(selecionados)
+
+    def listar(self) -> List[Dict]:
+        """
+        Lista os tickers registrados, ordenados pela próxima tentativa.
+
+        :return: Lista de dicionários com `ticker`, `tentativas`, `primeira_falha`, `ultima_tentativa`,
+            `proxima_tentativa` (datas no formato ISO) e `ignorado` (se o ticker está dentro da espera).
+        """
+        with self._trava:
+            entradas = sorted(self._entradas.items(), key=lambda item: item[1]['proxima_tentativa'])
+        return [{
+            'ticker': ticker,
+            'tentativas': entrada['tentativas'],
+            'primeira_falha': datetime.fromtimestamp(entrada['primeira_falha']).isoformat(timespec='seconds'),
+            'ultima_tentativa': datetime.fromtimestamp(entrada['ultima_tentativa']).isoformat(timespec='seconds'),
+            'proxima_tentativa': datetime.fromtimestamp(entrada['proxima_tentativa']).isoformat(timespec='seconds'),
+            'ignorado': self.ignorar(ticker)
+        } for ticker, entrada in entradas]
+
+    def salvar(self) -> None:
+        """
+        Grava o registro em disco de forma atômica, se houver alterações desde a última gravação.
+        """
+        with self._trava:
+            if not self._alterado:
+                return
+            makedirs(dirname(self.caminho), exist_ok=True)
+            with open(self.caminho + '.tmp', 'w') as json_file:
+                json.dump(self._entradas, json_file, indent=4)
+            replace(self.caminho + '.tmp', self.caminho)
+            self._alterado = False
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Lista os tickers do registro de vivacidade ou força que sejam consultados na próxima execução.
+
+    :param argv: Argumentos da linha de comando (padrão: `sys.argv[1:]`).
+    :return: Código de saída (0 em caso de sucesso).
+    """
+    parser = argparse.ArgumentParser(description='Registro dos tickers sem cotações.')
+    parser.add_argument('--reverificar', nargs='*', metavar='TICKER',
+                        help='Consulta os tickers informados (ou todos, se nenhum for informado) na próxima execução.')
+    args = parser.parse_args(argv)
+
+    registro = RegistroVivacidade()
+    if args.reverificar is not None:
+        liberados = registro.forcar(args.reverificar or None)
+        registro.salvar()
+        print(f"{liberados} tickers serão consultados novamente na próxima execução.")
+        return 0
+
+    entradas = registro.listar()
+    print(f"{'Ticker':<8} {'Tentativas':>10}  {'Primeira falha':<20} {'Próxima tentativa':<20} Ignorado")
+    for entrada in entradas:
+        print(f"{entrada['ticker']:<8} {entrada['tentativas']:>10}  {entrada['primeira_falha']:<20} "
+              f"{entrada['proxima_tentativa']:<20} {'sim' if entrada['ignorado'] else 'não'}")
+    print(f"{len(entradas)} tickers registrados, {sum(entrada['ignorado'] for entrada in entradas)} ignorados atualmente.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
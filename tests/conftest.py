@@ -0,0 +1,5 @@
+import sys
+from os.path import join, dirname, abspath
+
+# Os módulos de `Scripts` se importam pelo nome (como ao executar `python Scripts/<modulo>.py`)
+sys.path.insert(0, join(dirname(dirname(abspath(__file__))), 'Scripts'))
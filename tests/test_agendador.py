@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+from pandas import Timestamp
+
+from agendador import AgendadorAtualizacao
+from benchmark import gerar_mercado, FonteSintetica, _dowtrend_sintetico
+from calendario import FUSO_B3
+
+
+def agendador(tmp_path, composicoes):
+    """
+    Agendador com as composições lidas de `composicoes`, que pode ser alterado entre os ciclos.
+    """
+    agendador = AgendadorAtualizacao(['indice:IDIV', 'indice:SMLL'], caminho=str(tmp_path / 'agendador.json'))
+    for dowtrend in agendador.amostras:
+        def obter(indice, tipo=dowtrend.type_amostra):
+            composicao = composicoes[tipo]
+            if isinstance(composicao, Exception):
+                raise composicao
+            return list(composicao)
+        dowtrend._get_tickers_indice = obter
+    return agendador
+
+
+def test_composicao_resolvida_a_cada_ciclo(tmp_path):
+    composicoes = {'indice:IDIV': ['PETR4', 'VALE3'], 'indice:SMLL': ['ABCB4']}
+    agenda = agendador(tmp_path, composicoes)
+    assert agenda.pendencias()['composicoes']['indice:IDIV'] == ['PETR4', 'VALE3']
+    composicoes['indice:IDIV'] = ['PETR4', 'ITUB4']
+    assert agenda.pendencias()['composicoes']['indice:IDIV'] == ['PETR4', 'ITUB4']
+
+
+def test_falha_ignora_a_amostra_apenas_no_ciclo(tmp_path):
+    composicoes = {'indice:IDIV': ConnectionError('Erro de rede'), 'indice:SMLL': ['ABCB4']}
+    agenda = agendador(tmp_path, composicoes)
+    assert agenda.pendencias()['ordem'] == ['indice:SMLL']
+    assert len(agenda.amostras) == 2
+    composicoes['indice:IDIV'] = ['PETR4']
+    assert agenda.pendencias()['ordem'] == ['indice:IDIV', 'indice:SMLL']
+
+
+def test_retentativa_usa_o_instante_da_execucao(tmp_path):
+    mercado = gerar_mercado(6, pregoes=120, lacunas=0, deslistados=0, fim='2025-01-02', semente=4)
+    # As cotações param no pregão anterior, como um ticker com a negociação suspensa
+    fonte = FonteSintetica(mercado, corte=Timestamp('2024-12-30'))
+    agenda = AgendadorAtualizacao(['indice:SINT'], caminho=str(tmp_path / 'agendador.json'))
+    agenda.amostras = [_dowtrend_sintetico(str(tmp_path), mercado, fonte)]
+
+    agora = datetime(2025, 1, 2, 20, tzinfo=FUSO_B3)
+    assert agenda.executar(agora)['tickers_atualizados'] == 6
+    assert agenda.executar(agora + timedelta(minutes=30))['tickers_atualizados'] == 0
+    assert agenda.executar(agora + timedelta(minutes=61))['tickers_atualizados'] == 6
@@ -0,0 +1,11 @@
+from datetime import date
+
+from calendario import eh_pregao, feriados_b3
+
+
+def test_ultimo_dia_util_do_ano_sem_pregao():
+    assert date(2022, 12, 30) in feriados_b3(2022)
+    assert date(2023, 12, 29) in feriados_b3(2023)
+    assert date(2024, 12, 31) in feriados_b3(2024)
+    assert not eh_pregao(date(2022, 12, 30))
+    assert eh_pregao(date(2023, 12, 28))
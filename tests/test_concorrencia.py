@@ -0,0 +1,55 @@
+import json
+from os.path import join
+
+import numpy as np
+import pytest
+
+from benchmark import gerar_mercado, FonteSintetica, _dowtrend_sintetico
+from concorrencia import com_tentativas
+from retornos import PERIODOS
+
+@pytest.fixture(scope='module')
+def mercado():
+    return gerar_mercado(24, pregoes=300, semente=1)
+
+def processar(diretorio, mercado, fonte, **modo):
+    dowtrend = _dowtrend_sintetico(str(diretorio), mercado, fonte)
+    dados = dowtrend.processar_tickers(dowtrend._obter_amostra(), **modo)
+    # Mesma serialização do `save_data` (o `nan` vira `NaN`)
+    return json.dumps(dados, indent=4)
+
+def test_concorrente_com_falhas_igual_ao_sequencial(tmp_path, mercado):
+    tickers = list(mercado)
+    permanente = tickers[0]
+    sequencial = processar(tmp_path / 'sequencial', mercado, FonteSintetica(mercado, falhas_permanentes=[permanente]))
+
+    # Falhas transitórias menores que a quantidade de tentativas do `HistoricoPrecos` (3) são repetidas com sucesso
+    transitorias = {ticker: 1 + i % 2 for i, ticker in enumerate(tickers[1:8])}
+    fonte = FonteSintetica(mercado, latencia=0.005, falhas=transitorias, falhas_permanentes=[permanente])
+    concorrente = processar(tmp_path / 'concorrente', mercado, fonte, concorrencia=8)
+
+    assert concorrente == sequencial
+    assert all(restantes == 0 for restantes in fonte.falhas.values())
+    assert fonte.erros == sum(transitorias.values()) + 3
+    assert all(np.isnan(valor) for valor in json.loads(concorrente)[permanente].values())
+
+def test_falha_transitoria_em_excesso_vira_nan(tmp_path, mercado):
+    ticker = next(ticker for ticker, df in mercado.items() if not df.empty)
+    dados = json.loads(processar(tmp_path, mercado, FonteSintetica(mercado, falhas={ticker: 3}), concorrencia=4))
+    assert all(np.isnan(dados[ticker][periodo]) for periodo in PERIODOS)
+
+def test_com_tentativas_repete_e_relanca():
+    chamadas = []
+
+    def instavel(falhas):
+        chamadas.append(1)
+        if len(chamadas) <= falhas:
+            raise ConnectionError('falha')
+        return 'ok'
+
+    assert com_tentativas(instavel, 2, tentativas=3, espera_base=0) == 'ok'
+    assert len(chamadas) == 3
+    chamadas.clear()
+    with pytest.raises(ConnectionError):
+        com_tentativas(instavel, 5, tentativas=3, espera_base=0)
+    assert len(chamadas) == 3
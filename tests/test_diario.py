@@ -0,0 +1,57 @@
+import json
+from os.path import exists
+
+import pytest
+
+from benchmark import gerar_mercado, FonteSintetica, _dowtrend_sintetico
+from diario import Diario
+
+class FonteRegistrada(FonteSintetica):
+    """
+    Fonte sintética que registra os símbolos pedidos e simula uma interrupção depois de `limite` requisições.
+    """
+
+    def __init__(self, mercado, limite=None):
+        super().__init__(mercado)
+        self.limite = limite
+        self.pedidos = []
+
+    def __call__(self, simbolo, **kwargs):
+        if self.limite is not None and len(self.pedidos) >= self.limite:
+            raise KeyboardInterrupt
+        self.pedidos.append(simbolo[:-len('.SA')])
+        return super().__call__(simbolo, **kwargs)
+
+def ler_json(caminho):
+    with open(caminho, 'r') as json_file:
+        return json_file.read()
+
+def test_retomar_processa_apenas_os_pendentes(tmp_path):
+    mercado = gerar_mercado(12, pregoes=300, semente=3)
+    tickers = list(mercado)
+    limpo = _dowtrend_sintetico(str(tmp_path / 'limpo'), mercado, FonteRegistrada(mercado))
+    limpo.loop()
+
+    dowtrend = _dowtrend_sintetico(str(tmp_path / 'interrompido'), mercado, FonteRegistrada(mercado, limite=5))
+    with pytest.raises(KeyboardInterrupt):
+        dowtrend.loop()
+    feitos = Diario(dowtrend._caminho_diario()).ler()
+    assert list(feitos) == tickers[:5]
+    assert not exists(dowtrend.file_path)
+
+    fonte = FonteRegistrada(mercado)
+    dowtrend = _dowtrend_sintetico(str(tmp_path / 'interrompido'), mercado, fonte)
+    dowtrend.loop(retomar=True)
+    assert fonte.pedidos == tickers[5:]
+    assert ler_json(dowtrend.file_path) == ler_json(limpo.file_path)
+    assert not exists(dowtrend._caminho_diario())
+
+def test_ultima_linha_incompleta_ignorada(tmp_path):
+    diario = Diario(str(tmp_path / 'diario.jsonl'))
+    diario.registrar('PETR4', {'semanal': 1.5})
+    diario.registrar('VALE3', {'semanal': float('nan')})
+    with open(diario.caminho, 'a') as arquivo:
+        arquivo.write(json.dumps({'ticker': 'ITUB4', 'dados': {'semanal': 2.0}})[:20])
+    dados = Diario(diario.caminho).ler()
+    assert list(dados) == ['PETR4', 'VALE3']
+    assert dados['PETR4'] == {'semanal': 1.5}
@@ -0,0 +1,48 @@
+import json
+import os
+from os.path import join, exists
+
+import matplotlib
+matplotlib.use('Agg')
+
+from benchmark import gerar_mercado, FonteSintetica, _dowtrend_sintetico
+from graficos import Graficos, _renderizar
+
+def dowtrend_com_resultados(diretorio):
+    mercado = gerar_mercado(4, pregoes=120, deslistados=0)
+    dowtrend = _dowtrend_sintetico(str(diretorio), mercado, FonteSintetica(mercado))
+    dados = dowtrend.processar_tickers(dowtrend._obter_amostra())
+    # Ticker presente nos resultados, mas sem histórico de preços
+    dados['SEMH3'] = dict(next(iter(dados.values())))
+    dowtrend.save_data(dados)
+    return dowtrend
+
+def test_galeria_ignora_ticker_sem_historico_e_grava_o_manifesto(tmp_path):
+    dowtrend = dowtrend_com_resultados(tmp_path)
+    tabela = dowtrend.read_data('DataFrame')
+    diretorio = join(str(tmp_path), 'galeria')
+    graficos = Graficos(dowtrend)
+
+    renderizados = graficos.renderizar_galeria(tabela, 'mensal', diretorio, processos=1, dpi=20)
+    assert len(renderizados) == len(tabela)
+    assert not exists(join(diretorio, 'preco_SEMH3.png'))
+    with open(join(diretorio, '.galeria.json'), 'r') as json_file:
+        assert set(json.load(json_file)) == set(renderizados)
+    assert graficos.renderizar_galeria(tabela, 'mensal', diretorio, processos=1, dpi=20) == []
+
+def test_falha_de_um_grafico_nao_interrompe_a_galeria(tmp_path):
+    tarefa = {'tipo': 'preco', 'ticker': 'X', 'df': None, 'dados': {}, 'type_amostra': 'indice:SINT',
+              'dpi': 20, 'arquivo': join(str(tmp_path), 'preco_X.png')}
+    assert _renderizar(tarefa) is None
+
+def test_resultados_sao_relidos_quando_mudam(tmp_path):
+    dowtrend = dowtrend_com_resultados(tmp_path)
+    graficos = Graficos(dowtrend)
+    assert 'SEMH3' in graficos._obter_dados()
+    dados = dowtrend.read_data('json')
+    del dados['SEMH3']
+    dowtrend.save_data(dados)
+    # Garante um horário de modificação diferente mesmo em sistemas de arquivos com pouca resolução
+    modificado = os.path.getmtime(dowtrend.file_path) + 5
+    os.utime(dowtrend.file_path, (modificado, modificado))
+    assert 'SEMH3' not in graficos._obter_dados()
@@ -0,0 +1,30 @@
+from benchmark import gerar_mercado, FonteSintetica
+from historico import HistoricoPrecos
+
+
+def test_atualizar_lote_agrupa_por_inicio(tmp_path):
+    mercado = gerar_mercado(4, pregoes=60, lacunas=0, deslistados=0, semente=2)
+    datas = next(iter(mercado.values())).index
+    tickers = list(mercado)
+    fonte = FonteSintetica(mercado, corte=datas[-21])
+    requisicoes = []
+
+    def lote(simbolos, **kwargs):
+        requisicoes.append((sorted(simbolo[:-len('.SA')] for simbolo in simbolos), kwargs))
+        return fonte.lote(simbolos, **kwargs)
+
+    historico = HistoricoPrecos(str(tmp_path), fonte=fonte, fonte_lote=lote, espera_base=0)
+    historico.atualizar_lote(tickers)
+    # O primeiro ticker deixa de ser atualizado por alguns pregões
+    fonte.corte = datas[-11]
+    historico.atualizar_lote(tickers[1:])
+    fonte.corte = datas[-1]
+    requisicoes.clear()
+    resultado = historico.atualizar_lote(tickers)
+
+    assert sorted(requisicoes, key=lambda requisicao: requisicao[1]['start']) == [
+        ([tickers[0]], {'start': datas[-22].strftime('%Y-%m-%d')}),
+        (sorted(tickers[1:]), {'start': datas[-12].strftime('%Y-%m-%d')}),
+    ]
+    for ticker in tickers:
+        assert resultado[ticker].equals(mercado[ticker]['Adj Close'])
@@ -0,0 +1,39 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from incremental import RetornosIncrementais
+from retornos import calcular_retornos_serie
+from test_retornos import serie_aleatoria
+
+@pytest.mark.parametrize('semente', range(6))
+def test_aplicar_igual_ao_recalculo(semente):
+    rng = np.random.default_rng(semente)
+    serie = serie_aleatoria(semente, n=400)
+    carregados = int(rng.integers(0, 200))
+    incrementais = RetornosIncrementais()
+    if carregados:
+        incrementais.carregar('X', serie.iloc[:carregados])
+    for i in range(carregados, len(serie)):
+        data = serie.index[i]
+        # Cotação intradiária antes do fechamento do mesmo pregão
+        if rng.random() < 0.2:
+            incrementais.aplicar('X', data + pd.Timedelta(hours=11), serie.iloc[i] * 1.01)
+        incrementais.aplicar('X', data + pd.Timedelta(hours=17), serie.iloc[i])
+        # `json.dumps` compara os `nan` e distingue 0.0 de -0.0
+        assert json.dumps(incrementais.resultados(['X'])['X']) == json.dumps(calcular_retornos_serie(serie.iloc[:i + 1]))
+
+def test_aplicar_lote_retorna_apenas_as_linhas_alteradas():
+    serie = serie_aleatoria(0, n=300)
+    incrementais = RetornosIncrementais()
+    for ticker in ('A', 'B'):
+        incrementais.carregar(ticker, serie.iloc[:-1])
+    data = serie.index[-1]
+    alterados = incrementais.aplicar_lote([('A', data, serie.iloc[-1]), ('B', data, serie.iloc[-1])])
+    assert set(alterados) == {'A', 'B'}
+    # Repetir o mesmo preço não altera nada; cotações anteriores ao último pregão são ignoradas
+    assert incrementais.aplicar_lote([('A', data, serie.iloc[-1]), ('B', serie.index[0], 1.0)]) == {}
+    assert incrementais.aplicar('C', data, 10.0) is None
+    assert set(incrementais.resultados()) == {'A', 'B', 'C'}
@@ -0,0 +1,20 @@
+from metricas import Metricas
+
+def test_prometheus_exporta_gauges_sem_sufixo_total():
+    metricas = Metricas(rotulos={'amostra': 'indice:IDIV'})
+    with metricas.etapa('serie_temporal', 'PETR4'):
+        pass
+    metricas.contar('requisicoes', 2)
+    metricas.contar('bytes_memoria', 100)
+    texto = metricas.prometheus()
+    tipos = [linha for linha in texto.splitlines() if linha.startswith('# TYPE')]
+    assert tipos and all(linha.endswith(' gauge') for linha in tipos)
+    assert '_total' not in texto
+    assert 'dowtrend_requisicoes{amostra="indice:IDIV"} 2' in texto
+    assert 'dowtrend_etapa_chamadas{amostra="indice:IDIV",etapa="serie_temporal"} 1' in texto
+
+def test_desligada_nao_registra_nada():
+    metricas = Metricas(ativo=False)
+    with metricas.etapa('serie_temporal', 'PETR4'):
+        metricas.contar('erros')
+    assert metricas.resumo()['contadores'] == {} and metricas.mais_lentos() == []
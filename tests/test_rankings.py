@@ -0,0 +1,69 @@
+import os
+from os.path import join
+
+import numpy as np
+import pytest
+
+from dowtrend import Dowtrend
+from rankings import IndiceRankings
+from retornos import PERIODOS
+from snapshots import ArmazemResultados
+
+def resultados(semente, n=30, prefixo='T'):
+    """
+    Resultados aleatórios no formato do `Dowtrend`, com alguns retornos `nan` em cada período.
+    """
+    rng = np.random.default_rng(semente)
+    valores = rng.normal(0, 10, (n, len(PERIODOS)))
+    valores[rng.random(valores.shape) < 0.15] = np.nan
+    return {f'{prefixo}{i:02d}3': dict(zip(PERIODOS, linha)) for i, linha in enumerate(valores.tolist())}
+
+@pytest.fixture
+def indice(tmp_path):
+    ArmazemResultados(join(tmp_path, 'indice_AAAA')).salvar(resultados(1), '2024-01-02')
+    # A amostra B compartilha metade dos tickers da amostra A, com os mesmos valores
+    compartilhados = dict(list(resultados(1).items())[:15])
+    ArmazemResultados(join(tmp_path, 'indice_BBBB')).salvar({**compartilhados, **resultados(2, 15, 'U')}, '2024-01-02')
+    return IndiceRankings(str(tmp_path))
+
+@pytest.mark.parametrize('tipo', ['VALORIZAÇÃO', 'DESVALORIZAÇÃO'])
+@pytest.mark.parametrize('periodo', PERIODOS)
+def test_top_igual_a_obter_maximos(indice, periodo, tipo):
+    dados = ArmazemResultados(join(indice.diretorio, 'indice_AAAA')).ler()
+    esperado = Dowtrend(qtd_output=len(dados)).obter_maximos(dados, periodo, tipo)
+    top = indice.top('indice:AAAA', periodo, tipo, k=len(dados))
+    assert list(top.index) == list(esperado.index)
+    # Os tickers sem valor ficam ao final nos dois sentidos
+    validos = int(dados[periodo].notna().sum())
+    assert top[periodo].iloc[:validos].notna().all() and top[periodo].iloc[validos:].isna().all()
+
+@pytest.mark.parametrize('tipo', ['VALORIZAÇÃO', 'DESVALORIZAÇÃO'])
+def test_top_geral_sem_repeticoes(indice, tipo):
+    top = indice.top_geral('mensal', tipo, k=40)
+    assert top.index.is_unique
+    valores = list(top['mensal'])
+    assert valores == sorted(valores, reverse=tipo == 'VALORIZAÇÃO')
+    todos = [indice.top(amostra, 'mensal', tipo, k=100) for amostra in indice.amostras()]
+    esperado = sorted({ticker: valor for df in todos for ticker, valor in df['mensal'].dropna().items()}.items(),
+                      key=lambda item: item[1], reverse=tipo == 'VALORIZAÇÃO')
+    assert list(top.index) == [ticker for ticker, _ in esperado[:40]]
+
+@pytest.mark.parametrize('tipo', ['VALORIZAÇÃO', 'DESVALORIZAÇÃO'])
+def test_posicao(indice, tipo):
+    top = indice.top('indice:AAAA', 'anual', tipo, k=100)
+    for i, (ticker, valor) in enumerate(top['anual'].items()):
+        assert indice.posicao('indice:AAAA', 'anual', ticker, tipo) == (None if np.isnan(valor) else i + 1)
+    assert indice.posicao('indice:AAAA', 'anual', 'XXXX3', tipo) is None
+
+def test_recarrega_snapshot_novo(indice):
+    assert indice.top('indice:AAAA', 'semanal', 'VALORIZAÇÃO', k=1).index[0].startswith('T')
+    armazem = ArmazemResultados(join(indice.diretorio, 'indice_AAAA'))
+    armazem.salvar({**resultados(1), 'NOVO3': dict.fromkeys(PERIODOS, 1000.0)}, '2024-01-03')
+    assert list(indice.top('indice:AAAA', 'semanal', 'VALORIZAÇÃO', k=1).index) == ['NOVO3']
+
+    # Uma nova execução no mesmo dia substitui o snapshot do dia
+    caminho = armazem.salvar({**resultados(1), 'NOVO3': dict.fromkeys(PERIODOS, -1000.0)}, '2024-01-03')
+    modificado = os.path.getmtime(caminho) + 10
+    os.utime(caminho, (modificado, modificado))
+    assert list(indice.top('indice:AAAA', 'semanal', 'DESVALORIZAÇÃO', k=1).index) == ['NOVO3']
+    assert indice.posicao('indice:AAAA', 'semanal', 'NOVO3', 'DESVALORIZAÇÃO') == 1
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from retornos import PERIODOS, calcular_retornos_serie, calcular_retornos_painel
+
+def serie_aleatoria(semente: int, n: int = 600, inicio: str = '2019-12-20') -> pd.Series:
+    """
+    Série de preços com lacunas: `n` pregões sorteados entre `2 * n` dias úteis, inclusive semanas inteiras sem cotação.
+    """
+    rng = np.random.default_rng(semente)
+    datas = pd.bdate_range(inicio, periods=2 * n)
+    datas = datas[np.sort(rng.choice(len(datas), n, replace=False))]
+    return pd.Series(np.cumprod(1 + rng.normal(0, 0.02, n)) * 10, index=datas, name='Adj Close')
+
+def retornos_resample(serie: pd.Series) -> dict:
+    """
+    Cálculo original do `Dowtrend._calcular_retorno` seguido do `_obter_ultimo_valor`.
+
+    No pandas fixado em `requirements.txt` (2.2.3) o `pct_change()` preenche os períodos vazios com o
+    fechamento anterior (`fill_method='pad'`); o `ffill()` explícito reproduz esse comportamento no pandas 3.
+    """
+    resultado = {}
+    for periodo, regra in PERIODOS.items():
+        retornos = serie.resample(regra).last().ffill().pct_change().dropna() * 100
+        resultado[periodo] = float(round(retornos.iloc[-1], 2)) if not retornos.empty else np.nan
+    return resultado
+
+def iguais(a: dict, b: dict) -> bool:
+    return all((np.isnan(a[p]) and np.isnan(b[p])) or a[p] == b[p] for p in PERIODOS)
+
+@pytest.mark.parametrize('semente', range(8))
+def test_serie_igual_ao_resample(semente):
+    serie = serie_aleatoria(semente)
+    # Cada prefixo termina em um dia diferente da semana/quinzena/mês, cobrindo a ancoragem da regra '15D'
+    for fim in range(1, len(serie) + 1, 7):
+        assert iguais(calcular_retornos_serie(serie.iloc[:fim]), retornos_resample(serie.iloc[:fim]))
+
+def test_quinzenal_ancorado_no_primeiro_pregao():
+    serie = serie_aleatoria(0)
+    for deslocamento in range(15):
+        parcial = serie.iloc[deslocamento:]
+        assert calcular_retornos_serie(parcial)['quinzenal'] == retornos_resample(parcial)['quinzenal']
+
+def test_painel_igual_a_serie():
+    series = {f'T{semente}': serie_aleatoria(semente, inicio=f'2019-12-{10 + semente}').iloc[semente * 3:] for semente in range(10)}
+    series['VAZIO'] = pd.Series(dtype=float, index=pd.DatetimeIndex([]))
+    painel = pd.concat(series, axis=1, sort=True)
+    resultado = calcular_retornos_painel(painel)
+    for ticker, serie in series.items():
+        assert iguais(resultado[ticker], retornos_resample(serie) if not serie.empty else {p: np.nan for p in PERIODOS})
+
+def test_serie_vazia():
+    assert all(np.isnan(valor) for valor in calcular_retornos_serie(pd.Series(dtype=float, index=pd.DatetimeIndex([]))).values())
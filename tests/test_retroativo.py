@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from retornos import PERIODOS, calcular_retornos_serie, calcular_matriz_retornos
+from retroativo import AvaliacaoRetroativa
+from test_retornos import serie_aleatoria
+
+def painel_aleatorio() -> pd.DataFrame:
+    series = {f'T{semente}': serie_aleatoria(semente, n=300, inicio=f'2020-01-{1 + semente}').iloc[semente * 5:]
+              for semente in range(6)}
+    # Ticker deslistado no meio do painel
+    series['T0'] = series['T0'].iloc[:150]
+    return pd.concat(series, axis=1, sort=True)
+
+def test_matriz_igual_a_serie_em_cada_data():
+    painel = painel_aleatorio()
+    matrizes = calcular_matriz_retornos(painel)
+    for data in painel.index[::5]:
+        for ticker in painel.columns:
+            serie = painel[ticker].loc[:data].dropna()
+            esperado = calcular_retornos_serie(serie)
+            for periodo in PERIODOS:
+                valor = round(matrizes[periodo].at[data, ticker], 2)
+                assert (np.isnan(valor) and np.isnan(esperado[periodo])) or valor == esperado[periodo]
+
+def test_inicio_limita_as_linhas_sem_mudar_os_valores():
+    painel = painel_aleatorio()
+    completas = calcular_matriz_retornos(painel)
+    inicio = str(painel.index[200].date())
+    parciais = calcular_matriz_retornos(painel, inicio)
+    for periodo in PERIODOS:
+        assert parciais[periodo].index[0] == painel.index[200]
+        pd.testing.assert_frame_equal(parciais[periodo], completas[periodo].loc[inicio:])
+
+def test_avaliacao_usa_o_ultimo_pregao_ate_a_data():
+    painel = painel_aleatorio()
+    avaliacao = AvaliacaoRetroativa(painel)
+    data = painel.index[120]
+    # Um sábado depois do pregão retorna o mesmo resultado do pregão
+    sabado = data + pd.offsets.Week(weekday=5)
+    ultimo = painel.index[painel.index.searchsorted(sabado, side='right') - 1]
+    esperado = {ticker: calcular_retornos_serie(painel[ticker].loc[:ultimo].dropna()) for ticker in painel.columns}
+    tabela = avaliacao.resultados(str(sabado.date()))
+    for ticker in painel.columns:
+        for periodo in PERIODOS:
+            valor = tabela.at[ticker, periodo]
+            assert (np.isnan(valor) and np.isnan(esperado[ticker][periodo])) or valor == esperado[ticker][periodo]
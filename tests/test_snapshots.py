@@ -0,0 +1,27 @@
+import json
+import os
+
+from benchmark import gerar_mercado, FonteSintetica, _dowtrend_sintetico
+
+def test_read_data_prefere_o_json(tmp_path):
+    mercado = gerar_mercado(4, pregoes=50)
+    dowtrend = _dowtrend_sintetico(str(tmp_path), mercado, FonteSintetica(mercado))
+    antigos = {'AAAA3': {'semanal': 1.0, 'quinzenal': 1.0, 'mensal': 1.0, 'trimestral': 1.0, 'anual': 1.0}}
+    assert dowtrend.save_data(antigos)
+
+    # O JSON foi atualizado por fora (ex.: `git pull`) depois do snapshot local
+    novos = {'BBBB3': {'semanal': 2.0, 'quinzenal': 2.0, 'mensal': 2.0, 'trimestral': 2.0, 'anual': 2.0}}
+    with open(dowtrend.file_path, 'w') as json_file:
+        json.dump(novos, json_file)
+    modificado = dowtrend.resultados.modificado_em()
+    os.utime(dowtrend.file_path, (modificado + 10, modificado + 10))
+
+    assert dowtrend.read_data('json') == novos
+    assert dowtrend.read_data('json', colunas=['mensal']) == {'BBBB3': {'mensal': 2.0}}
+    # O snapshot continua disponível pela data
+    assert list(dowtrend.read_data('json', data='2999-01-01')) == ['AAAA3']
+
+    # Um snapshot gravado depois do JSON é usado na leitura de colunas
+    os.utime(dowtrend.file_path, (modificado - 10, modificado - 10))
+    assert dowtrend.read_data('json', colunas=['mensal']) == {'AAAA3': {'mensal': 1.0}}
+    assert dowtrend.read_data('json') == novos
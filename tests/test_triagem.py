@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from retornos import PERIODOS, calcular_retornos_painel
+from triagem import JANELA_MAXIMA, Triagem, calcular_indicadores
+from test_retornos import serie_aleatoria, iguais
+
+def painel_aleatorio() -> pd.DataFrame:
+    series = {f'T{semente}': serie_aleatoria(semente, n=400, inicio=f'2020-01-{1 + semente}').iloc[semente * 7:]
+              for semente in range(8)}
+    # Ticker deslistado no meio do painel e ticker com histórico curto
+    series['T0'] = series['T0'].iloc[:250]
+    series['T1'] = series['T1'].iloc[-40:]
+    series['VAZIO'] = pd.Series(dtype=float, index=pd.DatetimeIndex([]))
+    return pd.concat(series, axis=1, sort=True)
+
+def sequencia_resample(serie: pd.Series, regra: str) -> float:
+    """
+    Quedas consecutivas dos fechamentos de período até o último, contadas sobre `resample(regra).last()`.
+    """
+    fechamentos = serie.resample(regra).last().ffill().to_numpy()
+    if len(fechamentos) < 2:
+        return np.nan
+    quedas = 0
+    while quedas < len(fechamentos) - 1 and fechamentos[-1 - quedas] < fechamentos[-2 - quedas]:
+        quedas += 1
+    return quedas
+
+def inclinacao_rolling(serie: pd.Series, media: int, passo: int) -> float:
+    medias = serie.dropna().rolling(media).mean()
+    if len(medias) < media + passo:
+        return np.nan
+    return (medias.iloc[-1] / medias.iloc[-1 - passo] - 1) * 100
+
+@pytest.fixture(scope='module')
+def painel():
+    return painel_aleatorio()
+
+@pytest.fixture(scope='module')
+def indicadores(painel):
+    return calcular_indicadores(painel)
+
+def test_retornos_iguais_ao_painel(painel, indicadores):
+    esperado = calcular_retornos_painel(painel)
+    for ticker in painel.columns:
+        assert iguais(indicadores.loc[ticker, list(PERIODOS)].astype(float).to_dict(), esperado[ticker])
+
+def test_drawdown_igual_a_maxima_de_52_semanas(painel, indicadores):
+    for ticker in painel.columns:
+        serie = painel[ticker].dropna()
+        if serie.empty:
+            assert np.isnan(indicadores.at[ticker, 'drawdown'])
+            continue
+        janela = serie[serie.index > serie.index[-1] - pd.Timedelta(days=JANELA_MAXIMA)]
+        assert indicadores.at[ticker, 'drawdown'] == round((1 - serie.iloc[-1] / janela.max()) * 100, 2)
+
+def test_sequencias_iguais_ao_resample(painel, indicadores):
+    for ticker in painel.columns:
+        serie = painel[ticker].dropna()
+        for periodo, regra in PERIODOS.items():
+            valor = indicadores.at[ticker, f'sequencia_{periodo}']
+            esperado = sequencia_resample(serie, regra) if not serie.empty else np.nan
+            assert (pd.isna(valor) and np.isnan(esperado)) or valor == esperado
+
+@pytest.mark.parametrize('media, passo', [(50, 20), (10, 3)])
+def test_inclinacao_igual_a_rolling(painel, media, passo):
+    indicadores = calcular_indicadores(painel, media, passo)
+    for ticker in painel.columns:
+        valor, esperado = indicadores.at[ticker, 'inclinacao_media'], inclinacao_rolling(painel[ticker], media, passo)
+        assert (np.isnan(valor) and np.isnan(esperado)) or valor == pytest.approx(esperado, abs=0.006)
+
+def test_indicadores_independentes_dos_demais_tickers(painel, indicadores):
+    for ticker in painel.columns:
+        sozinho = calcular_indicadores(painel[[ticker]].dropna(how='all'))
+        pd.testing.assert_frame_equal(sozinho, indicadores.loc[[ticker]])
+
+@pytest.fixture
+def triagem():
+    triagem = Triagem(pd.DataFrame(index=pd.DatetimeIndex([])))
+    triagem.indicadores = pd.DataFrame({
+        'mensal': [-5.0, 3.0, -1.0, -8.0, np.nan, -2.0],
+        'drawdown': [25.0, 30.0, 21.5, 40.0, 50.0, 25.0],
+        'sequencia_semanal': pd.array([1, 0, 3, 2, None, 4], dtype='Int64'),
+    }, index=['AAAA3', 'BBBB3', 'CCCC3', 'DDDD3', 'EEEE3', 'FFFF3'])
+    return triagem
+
+def test_filtrar_e_ordenar(triagem):
+    selecionados = triagem.filtrar('mensal < 0 and drawdown > 20%')
+    assert list(selecionados.index) == ['AAAA3', 'CCCC3', 'DDDD3', 'FFFF3']
+    assert list(triagem.ordenar(selecionados, '-drawdown, mensal').index) == ['DDDD3', 'AAAA3', 'FFFF3', 'CCCC3']
+    # Tickers sem valor ficam ao final
+    assert list(triagem.triar(ordem='mensal', k=6).index) == ['DDDD3', 'AAAA3', 'FFFF3', 'CCCC3', 'BBBB3', 'EEEE3']
+    assert list(triagem.triar('sequencia_semanal >= 3', '-sequencia_semanal').index) == ['FFFF3', 'CCCC3']
+
+@pytest.mark.parametrize('expressao', ['mensal <', 'volume > 10', 'mensal < "a"'])
+def test_filtro_invalido(triagem, expressao):
+    with pytest.raises(ValueError):
+        triagem.filtrar(expressao)
+
+def test_ordem_invalida(triagem):
+    with pytest.raises(ValueError):
+        triagem.ordenar(triagem.indicadores, '-volume')
@@ -0,0 +1,30 @@
+import pytest
+
+from universo import CacheUniverso
+
+class Resposta:
+    def __init__(self, status_code, text='', headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+def processar(texto):
+    linhas = texto.splitlines()
+    assert linhas[0] == 'Código'
+    return linhas[1:]
+
+def test_erro_http_mantem_o_cache(tmp_path):
+    respostas = [Resposta(200, 'Código\nPETR4\nVALE3', {'ETag': 'a'}), Resposta(500, '<html>erro</html>'),
+                 Resposta(200, '<html>pagina inesperada</html>'), Resposta(304)]
+    cache = CacheUniverso(str(tmp_path), ttl=0, fonte=lambda url, headers=None: respostas.pop(0))
+    assert cache.obter('indice_X', 'url', processar) == ['PETR4', 'VALE3']
+    assert cache.obter('indice_X', 'url', processar) == ['PETR4', 'VALE3']
+    assert cache.obter('indice_X', 'url', processar) == ['PETR4', 'VALE3']
+    # A ETag do cache continua sendo enviada, e o 304 revalida a composição
+    assert cache.obter('indice_X', 'url', processar) == ['PETR4', 'VALE3']
+    assert cache._ler('indice_X')['etag'] == 'a'
+
+def test_erro_http_sem_cache(tmp_path):
+    cache = CacheUniverso(str(tmp_path), fonte=lambda url, headers=None: Resposta(403, 'proibido'))
+    with pytest.raises(ValueError):
+        cache.obter('indice_X', 'url', processar)
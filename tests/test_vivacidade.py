@@ -0,0 +1,75 @@
+from pandas import DataFrame, MultiIndex, bdate_range
+from yfinance.exceptions import YFException, YFPricesMissingError, YFTzMissingError
+
+from historico import HistoricoPrecos
+from vivacidade import RegistroVivacidade
+
+
+def precos(simbolos):
+    """
+    Cotações no formato do `yfinance.download(..., group_by='column')`.
+    """
+    datas = bdate_range('2024-01-02', periods=5)
+    colunas = MultiIndex.from_product([['Adj Close'], simbolos])
+    return DataFrame(10.0, index=datas, columns=colunas)
+
+
+def historico(tmp_path, fonte, fonte_lote=None):
+    vivacidade = RegistroVivacidade(str(tmp_path / 'vivacidade.json'))
+    return HistoricoPrecos(str(tmp_path / 'historico'), fonte=fonte, fonte_lote=fonte_lote or fonte,
+                           tentativas=2, espera_base=0, vivacidade=vivacidade), vivacidade
+
+
+def test_resposta_vazia_registra_sem_cotacoes(tmp_path):
+    dados, vivacidade = historico(tmp_path, lambda simbolo, **kwargs: DataFrame())
+    assert dados.atualizar('XPTO3').empty
+    assert vivacidade.ignorar('XPTO3')
+
+
+def test_falta_de_cotacoes_persistente_registra(tmp_path):
+    chamadas = []
+
+    def fonte(simbolo, **kwargs):
+        chamadas.append(simbolo)
+        raise YFTzMissingError(simbolo)
+
+    dados, vivacidade = historico(tmp_path, fonte)
+    assert dados.atualizar('XPTO3').empty
+    assert len(chamadas) == 2
+    assert vivacidade.ignorar('XPTO3')
+
+
+def test_falta_de_cotacoes_transitoria_nao_registra(tmp_path):
+    respostas = [YFPricesMissingError('PETR4.SA', ''), precos(['PETR4.SA'])]
+
+    def fonte(simbolo, **kwargs):
+        resposta = respostas.pop(0)
+        if isinstance(resposta, Exception):
+            raise resposta
+        return resposta
+
+    dados, vivacidade = historico(tmp_path, fonte)
+    assert len(dados.atualizar('PETR4')) == 5
+    assert not vivacidade.ignorar('PETR4')
+
+
+def test_outras_falhas_nao_registram(tmp_path):
+    def fonte(simbolo, **kwargs):
+        raise YFException('Erro de rede')
+
+    dados, vivacidade = historico(tmp_path, fonte)
+    assert dados.atualizar('PETR4').empty
+    assert not vivacidade.ignorar('PETR4')
+
+
+def test_lote_confere_tickers_vazios_individualmente(tmp_path):
+    def fonte(simbolo, **kwargs):
+        raise ConnectionError('Erro de rede')
+
+    def fonte_lote(simbolos, **kwargs):
+        return precos(['PETR4.SA'])
+
+    dados, vivacidade = historico(tmp_path, fonte, fonte_lote)
+    series = dados.atualizar_lote(['PETR4', 'VALE3'])
+    assert len(series['PETR4']) == 5
+    assert not vivacidade.ignorar('VALE3')